@@ -25,6 +25,14 @@ from pycam.Geometry import number, INFINITE, epsilon
 from pycam.Geometry import IDGenerator
 from pycam.Geometry.intersection import intersect_cylinder_point, intersect_cylinder_line
 from pycam.Geometry.PointUtils import padd, pdot, psub
+from pycam.Geometry.TriangleArrays import dot
+import pycam.Geometry.intersection_batch
+
+try:
+    import numpy
+except ImportError:
+    # only required for the vectorized functions (e.g. "drop_batch")
+    pass
 
 
 class BaseCutter(IDGenerator):
@@ -126,6 +134,145 @@ class BaseCutter(IDGenerator):
 
         return self.intersect(BaseCutter.vertical, triangle, start=start)[0]
 
+    def intersect_batch(self, direction, triangles, indices, starts):
+        raise NotImplementedError("Inherited class of BaseCutter does not implement the "
+                                  "function 'intersect_batch'.")
+
+    def drop_batch(self, triangles, indices, starts):
+        """ vectorized version of "drop" for many pairs of triangles and start positions
+
+        @param triangles: packed triangles (see pycam.Geometry.TriangleArrays)
+        @param indices: numpy array of triangle indices (one for each start position)
+        @param starts: numpy array of start positions
+        @returns: numpy array of cutter locations (NaN for positions without collision)
+        """
+        t_minx = triangles.minx[indices]
+        t_maxx = triangles.maxx[indices]
+        t_miny = triangles.miny[indices]
+        t_maxy = triangles.maxy[indices]
+        # check bounding box collision
+        valid = ~((starts[:, 0] - self.distance_radius > t_maxx + epsilon)
+                  | (starts[:, 0] + self.distance_radius < t_minx - epsilon)
+                  | (starts[:, 1] - self.distance_radius > t_maxy + epsilon)
+                  | (starts[:, 1] + self.distance_radius < t_miny - epsilon))
+        # check bounding circle collision
+        c = triangles.middle[indices]
+        t_radius = triangles.radius[indices]
+        valid &= ((c[:, 0] - starts[:, 0]) ** 2 + (c[:, 1] - starts[:, 1]) ** 2
+                  <= (self.distance_radiussq + 2 * self.distance_radius * t_radius
+                      + triangles.radiussq[indices]) + epsilon)
+        result = numpy.full((len(indices), 3), numpy.nan)
+        if numpy.any(valid):
+            result[valid] = self.intersect_batch(BaseCutter.vertical, triangles, indices[valid],
+                                                 starts[valid])[0]
+        return result
+
+    def _get_reach(self):
+        """ return the maximum distance between the axis and any point of the cutter """
+        return self.distance_radius
+
+    def push_batch(self, direction, triangles, indices, start):
+        """ vectorized version of "intersect" for one start position and many triangles
+
+        The triangles are rejected early, if their bounding circle (projected
+        onto the xy plane) does not reach the stripe covered by the cutter
+        moving along the direction. Triangles below the cutter are rejected
+        for horizontal directions.
+        @param direction: direction of the movement (along the whole line)
+        @param indices: numpy array of triangle indices
+        @returns: numpy arrays of cutter locations (NaN for triangles without collision)
+            and distances (INFINITE for triangles without collision)
+        """
+        c = triangles.middle[indices]
+        dx = c[:, 0] - start[0]
+        dy = c[:, 1] - start[1]
+        length = (direction[0] ** 2 + direction[1] ** 2) ** 0.5
+        if length == 0:
+            distance = numpy.sqrt(dx * dx + dy * dy)
+        else:
+            distance = numpy.abs(dx * direction[1] - dy * direction[0]) / length
+        valid = distance <= self._get_reach() + triangles.radius[indices] + epsilon
+        if direction[2] == 0:
+            valid &= (triangles.maxz[indices]
+                      >= start[2] - self.get_required_distance() - epsilon)
+        cl = numpy.full((len(indices), 3), numpy.nan)
+        d = numpy.full(len(indices), INFINITE, dtype=float)
+        # "intersect_batch" is called even without candidates: unsupported directions should
+        # always raise NotImplementedError
+        starts = numpy.tile(numpy.asarray(start[:3], dtype=float), (numpy.sum(valid), 1))
+        cl[valid], d[valid] = self.intersect_batch(direction, triangles, indices[valid], starts)
+        return cl, d
+
+    def get_profile_heights(self, distances):
+        """ return the height of the lowest point of the cutter (including the required
+        distance) above its location for the given horizontal distances from its axis
+
+        @param distances: numpy array of distances (up to "distance_radius")
+        """
+        raise NotImplementedError("Inherited class of BaseCutter does not implement the "
+                                  "function 'get_profile_heights'.")
+
+    @staticmethod
+    def _get_closest_batch(collisions, previous=None):
+        """ pick the collision with the lowest distance for every row
+
+        The first collision wins in case of equal distances (like the sequence
+        of comparisons in "intersect").
+        If a previous result (cutter locations and distances) is given, then
+        rows with a collision in this result are kept unchanged. This reflects
+        the early return in "intersect" for vertical directions.
+        """
+        cl, d = collisions[0]
+        for cl_other, d_other in collisions[1:]:
+            better = d_other < d
+            cl = numpy.where(better[:, None], cl_other, cl)
+            d = numpy.where(better, d_other, d)
+        if previous is not None:
+            finished = previous[1] < INFINITE
+            cl = numpy.where(finished[:, None], previous[0], cl)
+            d = numpy.where(finished, previous[1], d)
+        return numpy.where((d < INFINITE)[:, None], cl, numpy.nan), d
+
+    def _get_center_batch(self, starts):
+        return (starts - self.location[:3]) + self.center[:3]
+
+    @staticmethod
+    def _check_edge_batch(collision, triangles, indices, edge_index, cp):
+        """ discard collisions with contact points beyond the ends of the edge """
+        cl, d = collision
+        m = dot(cp - triangles.edge_p1[indices, edge_index],
+                triangles.edge_dir[indices, edge_index])
+        valid = (m >= -epsilon) & (m <= triangles.edge_len[indices, edge_index] + epsilon)
+        return numpy.where(valid[:, None], cl, numpy.nan), numpy.where(valid, d, INFINITE)
+
+    def _intersect_cylinder_batch(self, direction, triangles, indices, starts):
+        """ vectorized version of "intersect_cylinder_vertex" and "intersect_cylinder_edge"
+        for all vertices and edges
+
+        @returns: a list of collisions (cutter locations and distances) - the
+            vertices are followed by the edges
+        """
+        batch = pycam.Geometry.intersection_batch
+        center = self._get_center_batch(starts)
+        collisions = []
+        for point in (triangles.p1[indices], triangles.p2[indices], triangles.p3[indices]):
+            ccp, cp, l = batch.intersect_cylinder_point(center, self.axis, self.distance_radius,
+                                                        self.distance_radiussq, direction, point)
+            # ignore collisions below the cutter
+            valid = ~(ccp[:, 2] < center[:, 2])
+            collisions.append((numpy.where(valid[:, None], cp + (starts - ccp), numpy.nan),
+                               numpy.where(valid, l, INFINITE)))
+        for edge_index in range(3):
+            ccp, cp, l = batch.intersect_cylinder_line(
+                center, self.axis, self.distance_radius, self.distance_radiussq, direction,
+                triangles.edge_p1[indices, edge_index], triangles.edge_dir[indices, edge_index])
+            valid = ~(ccp[:, 2] < center[:, 2])
+            collision = self._check_edge_batch(
+                (numpy.where(valid[:, None], cp + (starts - ccp), numpy.nan),
+                 numpy.where(valid, l, INFINITE)), triangles, indices, edge_index, cp)
+            collisions.append(collision)
+        return collisions
+
     def intersect_circle_triangle(self, direction, triangle, start=None):
         (cl, ccp, cp, d) = self.intersect_circle_plane(direction, triangle, start=start)
         if cp and triangle.is_point_inside(cp):
@@ -24,6 +24,13 @@ from pycam.Cutters.BaseCutter import BaseCutter
 from pycam.Geometry.intersection import intersect_circle_plane, intersect_circle_point, \
         intersect_circle_line
 from pycam.Geometry.PointUtils import padd, psub
+import pycam.Geometry.intersection_batch
+
+try:
+    import numpy
+except ImportError:
+    # only required for "intersect_batch"
+    pass
 
 
 try:
@@ -172,3 +179,35 @@ class CylindricalCutter(BaseCutter):
                 cl = cl_e3
                 cp = cp_e3
         return (cl, d, cp)
+
+    def get_profile_heights(self, distances):
+        return numpy.full(numpy.shape(distances), -self.get_required_distance(), dtype=float)
+
+    def intersect_batch(self, direction, triangles, indices, starts):
+        """ vectorized version of "intersect" """
+        vertical = (direction[0] == 0) and (direction[1] == 0)
+        batch = pycam.Geometry.intersection_batch
+        center = self._get_center_batch(starts)
+        ccp, cp, d = batch.intersect_circle_plane(center, self.distance_radius, direction,
+                                                  triangles, indices)
+        inside = triangles.is_point_inside(cp, indices)
+        result = (cp + (starts - ccp), numpy.where(inside, d, INFINITE))
+        edges = []
+        for edge_index in range(3):
+            ccp, cp, l = batch.intersect_circle_line(
+                center, self.axis, self.distance_radius, self.distance_radiussq, direction,
+                triangles.edge_p1[indices, edge_index], triangles.edge_p2[indices, edge_index],
+                triangles.edge_dir[indices, edge_index])
+            edges.append(self._check_edge_batch((cp + (starts - ccp), l), triangles, indices,
+                                                edge_index, cp))
+        # the early returns of "intersect" are only relevant for vertical directions
+        result = self._get_closest_batch([result] + edges, previous=result if vertical else None)
+        vertices = []
+        for point in (triangles.p1[indices], triangles.p2[indices], triangles.p3[indices]):
+            ccp, cp, l = batch.intersect_circle_point(center, self.axis, self.distance_radius,
+                                                      self.distance_radiussq, direction, point)
+            vertices.append((cp + (starts - ccp), l))
+        if vertical:
+            return self._get_closest_batch([result] + vertices, previous=result)
+        collisions = self._intersect_cylinder_batch(direction, triangles, indices, starts)
+        return self._get_closest_batch([result] + vertices + collisions)
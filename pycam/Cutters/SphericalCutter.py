@@ -24,6 +24,14 @@ from pycam.Cutters.BaseCutter import BaseCutter
 from pycam.Geometry.intersection import intersect_sphere_plane, intersect_sphere_point, \
         intersect_sphere_line
 from pycam.Geometry.PointUtils import padd, pdot, pmul, pnormsq, psub
+import pycam.Geometry.intersection_batch
+from pycam.Geometry.TriangleArrays import dot
+
+try:
+    import numpy
+except ImportError:
+    # only required for "intersect_batch"
+    pass
 
 
 try:
@@ -197,3 +205,36 @@ class SphericalCutter(BaseCutter):
                 cl = cl_e3
                 cp = cp_e3
         return (cl, d, cp)
+
+    def get_profile_heights(self, distances):
+        return self.radius - numpy.sqrt(numpy.maximum(self.distance_radiussq - distances ** 2, 0))
+
+    def intersect_batch(self, direction, triangles, indices, starts):
+        """ vectorized version of "intersect" """
+        vertical = (direction[0] == 0) and (direction[1] == 0)
+        batch = pycam.Geometry.intersection_batch
+        center = self._get_center_batch(starts)
+        ccp, cp, d = batch.intersect_sphere_plane(center, self.distance_radius, direction,
+                                                  triangles, indices)
+        inside = triangles.is_point_inside(cp, indices)
+        result = (cp + (starts - ccp), numpy.where(inside, d, INFINITE))
+        collisions = []
+        for edge_index in range(3):
+            edge_p1 = triangles.edge_p1[indices, edge_index]
+            ccp, cp, l = batch.intersect_sphere_line(center, self.distance_radius,
+                                                     self.distance_radiussq, direction, edge_p1,
+                                                     triangles.edge_dir[indices, edge_index])
+            # check if the contact point is between the endpoints
+            edge_vector = triangles.edge_p2[indices, edge_index] - edge_p1
+            m = dot(cp - edge_p1, edge_vector)
+            valid = (m >= -epsilon) & (m <= dot(edge_vector, edge_vector) + epsilon)
+            collisions.append((numpy.where(valid[:, None], cp - (ccp - starts), numpy.nan),
+                               numpy.where(valid, l, INFINITE)))
+        for point in (triangles.p1[indices], triangles.p2[indices], triangles.p3[indices]):
+            ccp, cp, l = batch.intersect_sphere_point(center, self.distance_radius,
+                                                      self.distance_radiussq, direction, point)
+            collisions.append((starts + numpy.multiply(direction, l[:, None]), l))
+        if vertical:
+            return self._get_closest_batch([result] + collisions, previous=result)
+        collisions.extend(self._intersect_cylinder_batch(direction, triangles, indices, starts))
+        return self._get_closest_batch([result] + collisions)
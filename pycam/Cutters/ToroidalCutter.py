@@ -24,7 +24,14 @@ from pycam.Cutters.BaseCutter import BaseCutter
 from pycam.Geometry.intersection import intersect_torus_plane, intersect_torus_point, \
         intersect_circle_plane, intersect_circle_point, intersect_cylinder_point, \
         intersect_cylinder_line, intersect_circle_line
-from pycam.Geometry.PointUtils import padd, pdot, pmul, psub
+from pycam.Geometry.PointUtils import padd, pmul, psub
+import pycam.Geometry.intersection_batch
+
+try:
+    import numpy
+except ImportError:
+    # only required for "intersect_batch"
+    pass
 
 
 try:
@@ -165,6 +172,43 @@ class ToroidalCutter(BaseCutter):
                 min_cp = cp
         return (min_cl, min_l, min_cp)
 
+    def _intersect_torus_edge_batch(self, direction, center, starts, edge_p1, edge_dir,
+                                    edge_len):
+        """ vectorized version of "intersect_torus_edge" """
+        def get_collisions(rows, m):
+            points = edge_p1[rows] + edge_dir[rows] * (m * edge_len[rows])[:, None]
+            ccp, cp, l = pycam.Geometry.intersection_batch.intersect_torus_point(
+                center[rows], self.axis, self.distance_majorradius, self.distance_minorradius,
+                self.distance_majorradiussq, self.distance_minorradiussq, direction, points)
+            return points + (starts[rows] - ccp), l
+
+        count = len(edge_p1)
+        scale = numpy.maximum(3, numpy.floor(edge_len / self.distance_minorradius * 2))
+        # sample each edge at "scale + 1" equidistant points
+        sample_counts = scale.astype(int) + 1
+        rows = numpy.repeat(numpy.arange(count), sample_counts)
+        offsets = numpy.cumsum(sample_counts) - sample_counts
+        m = (numpy.arange(len(rows)) - offsets[rows]) / scale[rows]
+        cl, l = get_collisions(rows, m)
+        # pick the first sample with the lowest distance
+        min_l = numpy.minimum.reduceat(l, offsets)
+        sample_indices = numpy.where(l == min_l[rows], numpy.arange(len(rows)), len(rows))
+        first = numpy.minimum.reduceat(sample_indices, offsets)
+        hit = min_l < INFINITE
+        first = numpy.where(hit, first, offsets)
+        min_m = m[first]
+        min_cl = cl[first]
+        # refine the result around the best sample
+        scale2 = 10
+        all_rows = numpy.arange(count)
+        for i in range(1, scale2 + 1):
+            m = min_m + ((float(i) / scale2) * 2 - 1) / scale
+            cl, l = get_collisions(all_rows, m)
+            better = hit & (m >= -epsilon) & (m <= 1 + epsilon) & (l < min_l)
+            min_l = numpy.where(better, l, min_l)
+            min_cl = numpy.where(better[:, None], cl, min_cl)
+        return numpy.where(hit[:, None], min_cl, numpy.nan), numpy.where(hit, min_l, INFINITE)
+
     def intersect_cylinder_point(self, direction, point, start=None):
         if start is None:
             start = self.location
@@ -189,16 +233,6 @@ class ToroidalCutter(BaseCutter):
             return (cl, ccp, cp, l)
         return (None, None, None, INFINITE)
 
-    def intersect_cylinder_edge(self, direction, edge, start=None):
-        (cl, ccp, cp, l) = self.intersect_cylinder_line(direction, edge, start=start)
-        if ccp and ccp[2] < self.center[2]:
-            return (None, INFINITE, None)
-        if ccp:
-            m = pdot(psub(cp, edge.p1), edge.dir)
-            if (m < -epsilon) or (m > edge.len + epsilon):
-                return (None, INFINITE, None)
-        return (cl, l, cp)
-
     def intersect_circle_plane(self, direction, triangle, start=None):
         if start is None:
             start = self.location
@@ -338,3 +372,55 @@ class ToroidalCutter(BaseCutter):
                 cl = cl_e3
                 cp = cp_e3
         return (cl, d, cp)
+
+    def get_profile_heights(self, distances):
+        # the flat bottom (within the major radius) and the rounded edge
+        outside = numpy.maximum(distances - self.majorradius, 0)
+        return self.minorradius - numpy.sqrt(numpy.maximum(
+            self.distance_minorradiussq - outside ** 2, 0))
+
+    def _get_reach(self):
+        # the required distance is added to both radii
+        return self.distance_majorradius + self.distance_minorradius
+
+    def intersect_batch(self, direction, triangles, indices, starts):
+        """ vectorized version of "intersect" """
+        batch = pycam.Geometry.intersection_batch
+        center = self._get_center_batch(starts)
+        points = (triangles.p1[indices], triangles.p2[indices], triangles.p3[indices])
+        collisions = []
+        ccp, cp, d = batch.intersect_torus_plane(center, self.axis, self.distance_majorradius,
+                                                 self.distance_minorradius, direction, triangles,
+                                                 indices)
+        inside = triangles.is_point_inside(cp, indices)
+        collisions.append((cp + (starts - ccp), numpy.where(inside, d, INFINITE)))
+        for edge_index in range(3):
+            collisions.append(self._intersect_torus_edge_batch(
+                direction, center, starts, triangles.edge_p1[indices, edge_index],
+                triangles.edge_dir[indices, edge_index], triangles.edge_len[indices, edge_index]))
+        for point in points:
+            ccp, cp, l = batch.intersect_torus_point(
+                center, self.axis, self.distance_majorradius, self.distance_minorradius,
+                self.distance_majorradiussq, self.distance_minorradiussq, direction, point)
+            collisions.append((point + (starts - ccp), l))
+        ccp, cp, d = batch.intersect_circle_plane(starts, self.distance_majorradius, direction,
+                                                  triangles, indices)
+        inside = triangles.is_point_inside(cp, indices)
+        collisions.append((cp - (ccp - starts), numpy.where(inside, d, INFINITE)))
+        for point in points:
+            ccp, cp, l = batch.intersect_circle_point(starts, self.axis,
+                                                      self.distance_majorradius,
+                                                      self.distance_majorradiussq, direction,
+                                                      point)
+            collisions.append((cp - (ccp - starts), l))
+        for edge_index in range(3):
+            ccp, cp, l = batch.intersect_circle_line(
+                starts, self.axis, self.distance_majorradius, self.distance_majorradiussq,
+                direction, triangles.edge_p1[indices, edge_index],
+                triangles.edge_p2[indices, edge_index], triangles.edge_dir[indices, edge_index])
+            collisions.append(self._check_edge_batch((cp - (ccp - starts), l), triangles,
+                                                     indices, edge_index, cp))
+        if (direction[0] != 0) or (direction[1] != 0):
+            collisions.extend(self._intersect_cylinder_batch(direction, triangles, indices,
+                                                             starts))
+        return self._get_closest_batch(collisions)
@@ -32,6 +32,8 @@ DEFAULT_HEADER = (("G40", "disable tool radius compensation"),
 
 DEFAULT_DIGITS = 6
 
+MOVE_AXES = "XYZABCUVW"
+
 
 def _render_number(number):
     if int(number) == number:
@@ -40,8 +42,29 @@ def _render_number(number):
         return ("%%.%df" % DEFAULT_DIGITS) % number
 
 
+def _get_move_template(prefix, changed_axes):
+    """ return the format string of a move or an empty string (if there is nothing to write)
+
+    @param changed_axes: for each axis (in the order of "MOVE_AXES"): True if its position changed
+    """
+    components = [prefix]
+    for axis, is_changed in zip(MOVE_AXES, changed_axes):
+        if is_changed:
+            components.append("%s%%.6f" % axis)
+    command = " ".join(components)
+    if command.strip():
+        return command + os.linesep
+    else:
+        return ""
+
+
 class LinuxCNC(pycam.Exporters.GCode.BaseGenerator):
 
+    def __init__(self, *args, **kwargs):
+        # format strings of moves indexed by the prefix and the changed axes (see "add_move")
+        self._move_templates = {}
+        super(LinuxCNC, self).__init__(*args, **kwargs)
+
     def add_header(self):
         for command, comment in DEFAULT_HEADER:
             self.add_command(command, comment=comment)
@@ -58,32 +81,37 @@ class LinuxCNC(pycam.Exporters.GCode.BaseGenerator):
         self.add_command("; %s" % comment)
 
     def add_command(self, command, comment=None):
-        self.destination.write(command)
+        self.write(command)
         if comment:
-            self.destination.write("\t")
+            self.write("\t")
             self.add_comment(comment)
         else:
-            self.destination.write(os.linesep)
+            self.write(os.linesep)
 
     def add_move(self, coordinates, is_rapid=False):
-        components = []
         # the cached value may be:
         #   True: the last move was G0
         #   False: the last move was G1
         #   None: some non-move happened before
-        if self._get_cache("rapid_move", None) != is_rapid:
-            components.append("G0" if is_rapid else "G1")
+        if self._cache.get("rapid_move", None) != is_rapid:
+            prefix = "G0" if is_rapid else "G1"
         else:
             # improve gcode style
-            components.append(" ")
-        axes = [axis for axis in "XYZABCUVW"]
-        previous = self._get_cache("position", [None] * len(coordinates))
-        for (axis, value, last) in zip(axes, coordinates, previous):
-            if (last is None) or (last != value):
-                components.append("%s%.6f" % (axis, value))
-        command = " ".join(components)
-        if command.strip():
-            self.add_command(command)
+            prefix = " "
+        previous = self._cache.get("position", None)
+        if previous is None:
+            changed = (True, ) * len(coordinates)
+        else:
+            changed = tuple([(last is None) or (last != value)
+                             for last, value in zip(previous, coordinates)])
+        try:
+            template = self._move_templates[(prefix, changed)]
+        except KeyError:
+            template = _get_move_template(prefix, changed)
+            self._move_templates[(prefix, changed)] = template
+        if template:
+            self.write(template % tuple([value for value, is_changed in zip(coordinates, changed)
+                                         if is_changed]))
 
     def command_feedrate(self, feedrate):
         self.add_command("F%s" % _render_number(feedrate), "set feedrate")
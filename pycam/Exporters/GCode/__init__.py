@@ -27,6 +27,9 @@ _log = pycam.Utils.log.get_logger()
 
 class BaseGenerator(object):
 
+    # the output is collected and written in chunks of (roughly) this number of characters
+    WRITE_BUFFER_SIZE = 1024 * 1024
+
     def __init__(self, destination):
         if hasattr(destination, "write"):
             # assume that "destination" is something like a StringIO instance or an open file
@@ -39,6 +42,8 @@ class BaseGenerator(object):
             self._close_stream_on_exit = True
         self._filters = []
         self._cache = {}
+        self._write_buffer = []
+        self._write_buffer_size = 0
         self.add_header()
 
     def _get_cache(self, key, default_value):
@@ -48,6 +53,20 @@ class BaseGenerator(object):
         self._filters.extend(filters)
         self._filters.sort()
 
+    def write(self, text):
+        """ add text to the output (see "flush") """
+        self._write_buffer.append(text)
+        self._write_buffer_size += len(text)
+        if self._write_buffer_size >= self.WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """ write the buffered output to the destination """
+        if self._write_buffer:
+            self.destination.write("".join(self._write_buffer))
+            self._write_buffer = []
+            self._write_buffer_size = 0
+
     def add_comment(self, comment):
         raise NotImplementedError("someone forgot to implement 'add_comment'")
 
@@ -62,6 +81,7 @@ class BaseGenerator(object):
 
     def finish(self):
         self.add_footer()
+        self.flush()
         if self._close_stream_on_exit:
             self.destination.close()
 
@@ -70,13 +90,16 @@ class BaseGenerator(object):
         all_filters = list(self._filters)
         if filters:
             all_filters.extend(filters)
-        filtered_moves = pycam.Toolpath.Filters.get_filtered_moves(moves, all_filters)
+        filtered_moves = pycam.Toolpath.Filters.iter_filtered_moves(moves, all_filters)
+        # local references for the (usually) long sequence of moves
+        add_move = self.add_move
+        cache = self._cache
         for step in filtered_moves:
             if step.action in MOVES_LIST:
                 is_rapid = step.action == MOVE_STRAIGHT_RAPID
-                self.add_move(step.position, is_rapid)
-                self._cache["position"] = step.position
-                self._cache["rapid_move"] = is_rapid
+                add_move(step.position, is_rapid)
+                cache["position"] = step.position
+                cache["rapid_move"] = is_rapid
             elif step.action == COMMENT:
                 self.add_comment(step.text)
             elif step.action == MACHINE_SETTING:
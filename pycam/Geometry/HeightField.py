@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+from pycam.Geometry import epsilon
+from pycam.Geometry.Model import CompositeModel
+
+try:
+    import numpy
+    numpy_enabled = True
+except ImportError:
+    numpy_enabled = False
+
+
+# maximum number of (triangle, grid node) pairs to be processed at once
+RASTER_CHUNK_SIZE = 1000000
+# widening of the cutter profile for the cutter locations (in grid cells): the diagonal of a
+# cell covers the distance between a position and its enclosing nodes as well as the
+# distance between a point of the surface and its nearest node
+DILATION_MARGIN = math.sqrt(2)
+# maximum number of grid nodes (8 bytes each) - the dilation requires about three such grids
+MAX_NODES = 25000000
+
+
+def get_minimum_resolution(sizex, sizey, max_nodes=None):
+    """ return the smallest resolution of a height field of the given size within the limit
+
+    @param max_nodes: the maximum number of grid nodes (default: MAX_NODES)
+    """
+    if max_nodes is None:
+        max_nodes = MAX_NODES
+    # solve: (sizex / res + 2) * (sizey / res + 2) = max_nodes
+    count = max_nodes - 4
+    resolution = ((sizex + sizey) + math.sqrt((sizex + sizey) ** 2 + count * sizex * sizey)) \
+        / count
+    # compensate rounding errors of "ceil"
+    while _get_node_count(sizex, sizey, resolution) > max_nodes:
+        resolution *= 1.001
+    return resolution
+
+
+def _get_node_count(sizex, sizey, resolution):
+    return ((int(math.ceil(sizex / resolution)) + 1)
+            * (int(math.ceil(sizey / resolution)) + 1))
+
+
+class HeightField(object):
+    """ regular grid of heights (z-map) in the xy plane
+
+    The grid nodes are located at "minx + i * resolution" and
+    "miny + j * resolution". Nodes without any height are set to -inf.
+    The heights are stored in a numpy array "heights" (indexed by [j, i]).
+    The number of nodes is limited by "max_nodes" (see "get_minimum_resolution").
+    """
+
+    def __init__(self, minx, maxx, miny, maxy, resolution, max_nodes=None):
+        if not numpy_enabled:
+            raise ImportError("The 'numpy' module is required for height fields.")
+        if resolution <= 0:
+            raise ValueError("The resolution of a height field must be positive: %s"
+                             % str(resolution))
+        if max_nodes is None:
+            max_nodes = MAX_NODES
+        node_count = _get_node_count(maxx - minx, maxy - miny, resolution)
+        if node_count > max_nodes:
+            raise ValueError("The height field (%d nodes) exceeds the limit of %d nodes - the "
+                             "resolution should be at least %g."
+                             % (node_count, max_nodes,
+                                get_minimum_resolution(maxx - minx, maxy - miny, max_nodes)))
+        self.minx = minx
+        self.miny = miny
+        self.resolution = resolution
+        self.width = int(math.ceil((maxx - minx) / resolution)) + 1
+        self.height = int(math.ceil((maxy - miny) / resolution)) + 1
+        self.heights = numpy.full((self.height, self.width), -numpy.inf)
+
+    @property
+    def maxx(self):
+        return self.minx + (self.width - 1) * self.resolution
+
+    @property
+    def maxy(self):
+        return self.miny + (self.height - 1) * self.resolution
+
+    def _copy_empty(self):
+        result = HeightField.__new__(HeightField)
+        result.__dict__.update(self.__dict__)
+        result.heights = numpy.full((self.height, self.width), -numpy.inf)
+        return result
+
+    def add_model(self, model, callback=None):
+        """ raise the heights to the surface of the triangles of the model
+
+        The surface of each triangle is sampled at the grid nodes within its
+        xy projection. Additionally the edges are sampled along their length
+        (snapped to the nearest node) - this covers vertical faces and
+        triangles smaller than the grid resolution.
+        @param model: Model or CompositeModel
+        @param callback: called with the progress ("percent") after each chunk of triangles -
+            the rasterization is aborted, if it returns True
+        @returns: False if the rasterization was aborted, otherwise True
+        """
+        models = model.models if isinstance(model, CompositeModel) else [model]
+        models = [one_model for one_model in models if len(one_model) > 0]
+        for index, one_model in enumerate(models):
+            if callback:
+                model_callback = (lambda percent, index=index: callback(
+                    percent=100.0 * (index + percent / 100.0) / len(models)))
+            else:
+                model_callback = None
+            triangles = one_model.get_triangle_arrays()
+            if not self._add_triangle_surfaces(triangles, callback=model_callback):
+                return False
+            self._add_triangle_edges(triangles)
+        return True
+
+    def _add_triangle_surfaces(self, triangles, callback=None):
+        res = self.resolution
+        first_x = numpy.maximum(numpy.ceil((triangles.minx - self.minx) / res), 0).astype(int)
+        last_x = numpy.minimum(numpy.floor((triangles.maxx - self.minx) / res),
+                               self.width - 1).astype(int)
+        first_y = numpy.maximum(numpy.ceil((triangles.miny - self.miny) / res), 0).astype(int)
+        last_y = numpy.minimum(numpy.floor((triangles.maxy - self.miny) / res),
+                               self.height - 1).astype(int)
+        count_x = numpy.maximum(last_x - first_x + 1, 0)
+        count_y = numpy.maximum(last_y - first_y + 1, 0)
+        counts = count_x * count_y
+        # barycentric coordinates in the xy plane
+        p1 = triangles.p1
+        v0 = triangles.p3[:, :2] - p1[:, :2]
+        v1 = triangles.p2[:, :2] - p1[:, :2]
+        dot00 = (v0 * v0).sum(axis=1)
+        dot01 = (v0 * v1).sum(axis=1)
+        dot11 = (v1 * v1).sum(axis=1)
+        denom = dot00 * dot11 - dot01 * dot01
+        flat = self.heights.ravel()
+        indices = numpy.nonzero(counts)[0]
+        chunk_start = 0
+        while chunk_start < len(indices):
+            # limit the number of (triangle, node) pairs for each step
+            chunk_counts = numpy.cumsum(counts[indices[chunk_start:]])
+            chunk_end = chunk_start + max(1, numpy.searchsorted(chunk_counts, RASTER_CHUNK_SIZE))
+            chunk = indices[chunk_start:chunk_end]
+            chunk_start = chunk_end
+            pairs = numpy.repeat(chunk, counts[chunk])
+            offsets = (numpy.arange(len(pairs))
+                       - numpy.repeat(numpy.cumsum(counts[chunk]) - counts[chunk], counts[chunk]))
+            node_x = first_x[pairs] + offsets % count_x[pairs]
+            node_y = first_y[pairs] + offsets // count_x[pairs]
+            v2x = self.minx + node_x * res - p1[pairs, 0]
+            v2y = self.miny + node_y * res - p1[pairs, 1]
+            dot02 = v0[pairs, 0] * v2x + v0[pairs, 1] * v2y
+            dot12 = v1[pairs, 0] * v2x + v1[pairs, 1] * v2y
+            with numpy.errstate(invalid="ignore", divide="ignore"):
+                u = (dot11[pairs] * dot02 - dot01[pairs] * dot12) / denom[pairs]
+                v = (dot00[pairs] * dot12 - dot01[pairs] * dot02) / denom[pairs]
+                inside = (u >= -epsilon) & (v >= -epsilon) & (u + v <= 1 + epsilon)
+            pairs = pairs[inside]
+            u = u[inside]
+            v = v[inside]
+            z = (p1[pairs, 2] + u * (triangles.p3[pairs, 2] - p1[pairs, 2])
+                 + v * (triangles.p2[pairs, 2] - p1[pairs, 2]))
+            numpy.maximum.at(flat, node_y[inside] * self.width + node_x[inside], z)
+            if callback and callback(percent=100.0 * chunk_start / len(indices)):
+                return False
+        return True
+
+    def _add_triangle_edges(self, triangles):
+        starts = triangles.edge_p1.reshape((-1, 3))
+        ends = triangles.edge_p2.reshape((-1, 3))
+        lengths = numpy.hypot(ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1])
+        counts = numpy.ceil(lengths / self.resolution).astype(int) + 1
+        edges = numpy.repeat(numpy.arange(len(starts)), counts)
+        steps = numpy.arange(len(edges)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        ratios = steps / numpy.maximum(counts[edges] - 1, 1)
+        points = starts[edges] + (ends[edges] - starts[edges]) * ratios[:, None]
+        node_x = numpy.rint((points[:, 0] - self.minx) / self.resolution).astype(int)
+        node_y = numpy.rint((points[:, 1] - self.miny) / self.resolution).astype(int)
+        valid = ((node_x >= 0) & (node_x < self.width)
+                 & (node_y >= 0) & (node_y < self.height))
+        numpy.maximum.at(self.heights.ravel(), node_y[valid] * self.width + node_x[valid],
+                         points[valid, 2])
+
+    def get_cutter_locations(self, cutter, callback=None):
+        """ calculate the lowest possible heights of the cutter around the grid nodes
+
+        The result is a new HeightField: the morphological dilation of the
+        heights with the profile of the cutter (see
+        BaseCutter.get_profile_heights). The profile is widened by
+        "DILATION_MARGIN" grid cells: the height of a node is not below the
+        cutter location at any position within this distance. Thus the
+        result is never too low (apart from the sampling of steep
+        triangles), but it may be too high - similar to a cutter with a
+        radius enlarged by up to twice the margin.
+        @param callback: called with the progress ("percent") after each offset of the
+            profile - the calculation is aborted (returning None), if it returns True
+        """
+        res = self.resolution
+        margin = DILATION_MARGIN * res
+        radius = cutter.distance_radius + margin
+        steps = int(math.floor(radius / res))
+        result = self._copy_empty()
+        padded = numpy.full((self.height + 2 * steps, self.width + 2 * steps), -numpy.inf)
+        padded[steps:steps + self.height, steps:steps + self.width] = self.heights
+        offsets = numpy.arange(-steps, steps + 1)
+        offset_x, offset_y = numpy.meshgrid(offsets, offsets)
+        distances = numpy.hypot(offset_x, offset_y) * res
+        inside = distances <= radius + epsilon
+        profile = cutter.get_profile_heights(numpy.clip(distances[inside] - margin, 0,
+                                                        cutter.distance_radius))
+        offsets = list(zip(offset_x[inside], offset_y[inside], profile))
+        for index, (dx, dy, dz) in enumerate(offsets):
+            numpy.maximum(result.heights,
+                          padded[steps + dy:steps + dy + self.height,
+                                 steps + dx:steps + dx + self.width] - dz,
+                          out=result.heights)
+            if callback and callback(percent=100.0 * (index + 1) / len(offsets)):
+                return None
+        return result
+
+    def get_heights(self, xs, ys, default):
+        """ return the maximum height of the grid nodes enclosing the given positions
+
+        The result is not lower than the height of any of these nodes. Thus
+        it is never too low for cutter locations (see "get_cutter_locations").
+        @param default: the height of empty grid nodes and positions outside of the grid
+        """
+        grid = numpy.pad(numpy.maximum(self.heights, default), 1, constant_values=default)
+        # positions relative to the padded grid
+        fx = numpy.clip((numpy.asarray(xs, dtype=float) - self.minx) / self.resolution + 1,
+                        0, self.width + 1)
+        fy = numpy.clip((numpy.asarray(ys, dtype=float) - self.miny) / self.resolution + 1,
+                        0, self.height + 1)
+        # positions on a grid line (within a tiny tolerance) use only the nodes on this line
+        low_x = numpy.floor(fx + epsilon).astype(int)
+        high_x = numpy.maximum(numpy.ceil(fx - epsilon).astype(int), low_x)
+        low_y = numpy.floor(fy + epsilon).astype(int)
+        high_y = numpy.maximum(numpy.ceil(fy - epsilon).astype(int), low_y)
+        low_x, high_x, low_y, high_y = [numpy.minimum(indices, limit) for indices, limit in (
+            (low_x, self.width + 1), (high_x, self.width + 1), (low_y, self.height + 1),
+            (high_y, self.height + 1))]
+        return numpy.maximum(numpy.maximum(grid[low_y, low_x], grid[low_y, high_x]),
+                             numpy.maximum(grid[high_y, low_x], grid[high_y, high_x]))
@@ -29,6 +29,9 @@ from pycam.Geometry.Plane import Plane
 from pycam.Geometry.Polygon import Polygon
 from pycam.Geometry.PointUtils import pcross, pdist, pnorm, pnormalized, psub
 from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import TriangleArrays
+import pycam.Geometry.TriangleBVH
+from pycam.Geometry.TriangleBVH import TriangleBVH
 from pycam.Geometry.TriangleKdtree import TriangleKdtree
 from pycam.Toolpath import Bounds
 from pycam.Utils import ProgressCounter
@@ -59,10 +62,20 @@ def get_combined_bounds(models):
 
 
 def get_combined_model(models):
+    """ combine the given models into one
+
+    A single model is returned unchanged. Multiple triangle models are combined
+    into a CompositeModel (without copying their triangles). Other types of
+    models are merged into a copy of the first model.
+    """
     # remove all "None" models
     models = [model for model in models if model is not None]
     if not models:
         return None
+    if len(models) == 1:
+        return models[0]
+    if all(isinstance(model, Model) for model in models):
+        return CompositeModel(models)
     result = models.pop(0).copy()
     while models:
         result += models.pop(0)
@@ -203,18 +216,35 @@ class BaseModel(IDGenerator, TransformableContainer):
 
 class Model(BaseModel):
 
-    def __init__(self, use_kdtree=True):
+    def __init__(self, use_kdtree=True, mesh=None):
+        """
+        @param use_kdtree: use a spatial index for the "triangles" function
+        @param mesh: optional TriangleMesh used as the storage of the triangles
+            (instead of a list of Triangle objects)
+        """
         import pycam.Exporters.STLExporter
         super(Model, self).__init__()
-        self._triangles = []
+        self._mesh = mesh
+        if mesh is None:
+            self._triangles = []
+        else:
+            # the mesh behaves like a list of triangles
+            self._triangles = mesh
         self._item_groups.append(self._triangles)
         self._export_function = pycam.Exporters.STLExporter.STLExporter
-        # marker for state of kdtree and uuid
+        # marker for state of uuid and packed triangles
         self._dirty = True
         # enable/disable kdtree
         self._use_kdtree = use_kdtree
         self._t_kdtree = None
+        self._t_index = None
+        # number of triangles in the spatial index (followed by the overflow triangles)
+        self._index_size = 0
+        self._overflow_checks = 0
+        self._triangle_arrays = None
         self.__uuid = None
+        if mesh is not None:
+            self._update_mesh_limits()
 
     def __len__(self):
         """ Return the number of available items in the model.
@@ -223,11 +253,44 @@ class Model(BaseModel):
         return len(self._triangles)
 
     def copy(self):
+        if self._mesh is not None:
+            return self.__class__(use_kdtree=self._use_kdtree, mesh=self._mesh.copy())
         result = self.__class__(use_kdtree=self._use_kdtree)
         for triangle in self.triangles():
             result.append(triangle.copy())
         return result
 
+    @property
+    def mesh(self):
+        """ the array-based storage of the triangles (None for a list of triangles) """
+        return self._mesh
+
+    def get_children_count(self):
+        if self._mesh is not None:
+            # all vertices are transformed in a single step (see "transform_by_matrix")
+            return 1
+        return super(Model, self).get_children_count()
+
+    def transform_by_matrix(self, matrix, transformed_list=None, callback=None):
+        if self._mesh is None:
+            super(Model, self).transform_by_matrix(matrix, transformed_list=transformed_list,
+                                                   callback=callback)
+        else:
+            # transform all vertices at once
+            self._mesh.transform_by_matrix(matrix)
+            if callback:
+                callback()
+            self.reset_cache()
+
+    def _update_mesh_limits(self):
+        bounds = self._mesh.get_bounds()
+        if bounds is None:
+            self.minx = self.miny = self.minz = None
+            self.maxx = self.maxy = self.maxz = None
+        else:
+            self.minx, self.miny, self.minz, self.maxx, self.maxy, self.maxz = \
+                [float(value) for value in bounds]
+
     @property
     def uuid(self):
         if (self.__uuid is None) or self._dirty:
@@ -238,33 +301,130 @@ class Model(BaseModel):
         super(Model, self).append(item)
         if isinstance(item, Triangle):
             self._triangles.append(item)
-            # we assume, that the kdtree needs to be rebuilt again
+            # the spatial index is updated lazily (see "_update_index")
             self._dirty = True
 
     def reset_cache(self):
-        super(Model, self).reset_cache()
-        # the triangle kdtree needs to be reset after transforming the model
+        if self._mesh is None:
+            super(Model, self).reset_cache()
+        else:
+            self._update_mesh_limits()
+        # the order of the triangles did not change (e.g. after a transformation)
+        self._refit_index()
         self._update_caches()
 
     def _update_caches(self):
-        if self._use_kdtree:
-            self._t_kdtree = TriangleKdtree(self.triangles())
+        # the packed triangles are created on demand
+        self._triangle_arrays = None
         self.__uuid = str(uuid.uuid4())
-        # the kdtree is up-to-date again
         self._dirty = False
 
+    def _get_triangle_bounds(self, start=0, end=None):
+        """ return the limits (minx, maxx, miny, maxy) of a range of triangles """
+        if end is None:
+            end = len(self._triangles)
+        if self._mesh is None:
+            triangles = self._triangles[start:end]
+            return ([t.minx for t in triangles], [t.maxx for t in triangles],
+                    [t.miny for t in triangles], [t.maxy for t in triangles])
+        else:
+            # accessing "faces" merges the pending triangles of the mesh
+            self._mesh.faces
+            return (self._mesh.minx[start:end], self._mesh.maxx[start:end],
+                    self._mesh.miny[start:end], self._mesh.maxy[start:end])
+
+    def _rebuild_index(self):
+        if pycam.Geometry.TriangleBVH.numpy_enabled:
+            # the array-based index returns the indices of the triangles
+            self._t_index = TriangleBVH(*self._get_triangle_bounds())
+            self._t_kdtree = None
+        else:
+            self._t_index = None
+            self._t_kdtree = TriangleKdtree(list(self._triangles))
+        self._index_size = len(self._triangles)
+        self._overflow_checks = 0
+
+    def _refit_index(self):
+        """ update the limits of the nodes of the index after the triangles were modified """
+        if self._t_index is not None:
+            self._t_index.refit(*self._get_triangle_bounds(end=self._index_size))
+        elif self._t_kdtree is not None:
+            # the legacy kdtree stores the limits of the triangles in its nodes
+            self._rebuild_index()
+
+    def _update_index(self, merge=False):
+        """ merge the triangles appended since the last build of the index (if necessary)
+
+        Triangles appended to the model are not added to the index immediately.
+        Instead they are checked separately by every query (overflow buffer).
+        The index is rebuilt as soon as the accumulated cost of checking the
+        overflow triangles exceeds the cost of rebuilding the index.
+        """
+        overflow = len(self._triangles) - self._index_size
+        if ((self._t_index is None) and (self._t_kdtree is None)) or merge:
+            if overflow or (self._index_size == 0):
+                self._rebuild_index()
+        elif overflow > 0:
+            self._overflow_checks += overflow
+            if (overflow > self._index_size) or (self._overflow_checks > len(self._triangles)):
+                self._rebuild_index()
+
     def triangles(self, minx=-INFINITE, miny=-INFINITE, minz=-INFINITE, maxx=+INFINITE,
                   maxy=+INFINITE, maxz=+INFINITE):
         if (minx == miny == minz == -INFINITE) and (maxx == maxy == maxz == +INFINITE):
             return self._triangles
         if self._use_kdtree:
-            # update the kdtree, if new triangles were added meanwhile
             if self._dirty:
                 self._update_caches()
-            return self._t_kdtree.Search(minx, maxx, miny, maxy)
+            self._update_index()
+            if self._t_index is not None:
+                result = [self._triangles[index]
+                          for index in self._t_index.search(minx, maxx, miny, maxy)]
+            else:
+                result = self._t_kdtree.Search(minx, maxx, miny, maxy)
+            # check the triangles that were appended after building the index
+            for index in range(self._index_size, len(self._triangles)):
+                t = self._triangles[index]
+                if not ((t.minx > maxx) or (t.maxx < minx) or (t.miny > maxy)
+                        or (t.maxy < miny)):
+                    result.append(t)
+            return result
         return self._triangles
 
+    def get_triangle_index(self):
+        """ return the array-based spatial index of the triangles (see TriangleBVH)
+
+        The index is not available without numpy or if the kdtree is disabled.
+        The positions of the triangles in "triangles()" are used as indices.
+        All triangles of the model are part of the returned index.
+        """
+        if not self._use_kdtree:
+            return None
+        if self._dirty:
+            self._update_caches()
+        self._update_index(merge=True)
+        return self._t_index
+
+    def get_triangle_arrays(self):
+        """ return the triangles of the model packed into numpy arrays
+
+        This representation is used by vectorized collision functions (see
+        pycam.Geometry.intersection_batch).
+        """
+        if self._dirty:
+            self._update_caches()
+        if self._triangle_arrays is None:
+            if self._mesh is None:
+                self._triangle_arrays = TriangleArrays(self._triangles)
+            else:
+                self._triangle_arrays = TriangleArrays.from_mesh(self._mesh)
+        return self._triangle_arrays
+
     def get_waterline_contour(self, plane, callback=None):
+        if plane.n == (0, 0, 1, 'v'):
+            # horizontal planes are handled by the multi-layer slicer
+            contours = self.get_waterline_contours([plane.p[2]], callback=callback)
+            return contours[0] if contours else None
         collision_lines = []
         progress_max = 2 * len(self._triangles)
         counter = 0
@@ -288,6 +448,175 @@ class Model(BaseModel):
                   [len(p.get_lines()) for p in contour.get_polygons()])
         return contour
 
+    def get_waterline_contours(self, z_levels, callback=None):
+        """ return the waterline contours (ContourModel) of all given z levels
+
+        The triangles are sorted by their lower z limit once. The levels are
+        processed in ascending order, while a set of the "active" triangles
+        (spanning the current level) is updated incrementally. Thus only the
+        triangles crossing a level are intersected with its plane.
+        The result is a list of contours in the order of the given levels.
+        The progress is reported after each level (the last one reports 100%).
+        """
+        entries = sorted(((t.minz, t.maxz, t) for t in self._triangles),
+                         key=lambda entry: entry[0])
+        levels = sorted(range(len(z_levels)), key=lambda index: z_levels[index])
+        result = [None] * len(z_levels)
+        active = []
+        next_entry = 0
+        for counter, index in enumerate(levels):
+            z = z_levels[index]
+            while (next_entry < len(entries)) and (entries[next_entry][0] <= z + epsilon):
+                active.append(entries[next_entry])
+                next_entry += 1
+            active = [entry for entry in active if entry[1] >= z - epsilon]
+            plane = Plane((0, 0, z), (0, 0, 1, 'v'))
+            collision_lines = []
+            for minz, maxz, t in active:
+                collision_line = plane.intersect_triangle(t, counter_clockwise=True)
+                if (collision_line is not None) and (collision_line.len >= epsilon):
+                    collision_lines.append(collision_line)
+            contour = ContourModel(plane=plane)
+            for polygon in _link_waterline_segments(collision_lines, plane):
+                contour.append(polygon)
+            log.debug("Waterline: %f - %d - %s", z, len(contour.get_polygons()),
+                      [len(p.get_lines()) for p in contour.get_polygons()])
+            result[index] = contour
+            if callback and callback(percent=100.0 * (counter + 1) / len(levels)):
+                return
+        return result
+
+
+def _get_point_key(point):
+    """ quantize a point for the lookup of connected segments """
+    return (int(round(point[0] / epsilon)), int(round(point[1] / epsilon)),
+            int(round(point[2] / epsilon)))
+
+
+def _link_waterline_segments(lines, plane):
+    """ combine directed line segments into polygons
+
+    Segments are connected if the end of one segment matches the start of
+    another one (based on quantized coordinates). Each segment is visited
+    only once.
+    """
+    starts = {}
+    ends = {}
+    for index, line in enumerate(lines):
+        starts.setdefault(_get_point_key(line.p1), []).append(index)
+        ends.setdefault(_get_point_key(line.p2), []).append(index)
+    used = [False] * len(lines)
+
+    def pop_unused(lookup, key):
+        candidates = lookup.get(key, [])
+        while candidates:
+            index = candidates.pop()
+            if not used[index]:
+                used[index] = True
+                return lines[index]
+        return None
+
+    polygons = []
+    for index, line in enumerate(lines):
+        if used[index]:
+            continue
+        used[index] = True
+        first_key = _get_point_key(line.p1)
+        points = [line.p1, line.p2]
+        is_closed = False
+        # follow the chain forward
+        while True:
+            key = _get_point_key(points[-1])
+            if key == first_key:
+                is_closed = True
+                points.pop(-1)
+                break
+            following = pop_unused(starts, key)
+            if following is None:
+                break
+            points.append(following.p2)
+        if not is_closed:
+            # extend the open chain backward
+            preceding_points = []
+            while True:
+                preceding = pop_unused(ends, _get_point_key(
+                    preceding_points[-1] if preceding_points else points[0]))
+                if preceding is None:
+                    break
+                preceding_points.append(preceding.p1)
+            preceding_points.reverse()
+            points = preceding_points + points
+        else:
+            # start the loop at a corner - collinear points are merged by the polygon
+            for corner in range(len(points)):
+                p1, p2, p3 = points[corner - 1], points[corner], points[(corner + 1) % len(points)]
+                if pnormalized(psub(p2, p1)) != pnormalized(psub(p3, p2)):
+                    points = points[corner:] + points[:corner]
+                    break
+        polygon = Polygon(plane=plane)
+        previous = points[0]
+        # skip tiny segments (e.g. caused by the quantization)
+        for point in points[1:]:
+            if pdist(previous, point) >= epsilon:
+                polygon.append(Line(previous, point))
+                previous = point
+        if is_closed and (pdist(previous, points[0]) >= epsilon):
+            polygon.append(Line(previous, points[0]))
+        if len(polygon) > 1:
+            polygons.append(polygon)
+    return polygons
+
+
+class CompositeModel(object):
+    """ read-only view of multiple triangle models (see "get_combined_model")
+
+    The triangles of the models are not copied. Range queries are passed to
+    the spatial index of each model and the results are concatenated.
+    The models should not be changed while the view is in use.
+    """
+
+    def __init__(self, models):
+        self.models = list(models)
+        self.reset_cache()
+
+    def __len__(self):
+        return sum(len(model) for model in self.models)
+
+    def reset_cache(self):
+        """ update the limits after changing the models """
+        box = get_combined_bounds(self.models)
+        if box is None:
+            self.minx = self.miny = self.minz = None
+            self.maxx = self.maxy = self.maxz = None
+        else:
+            self.minx, self.miny, self.minz = box.lower
+            self.maxx, self.maxy, self.maxz = box.upper
+
+    @property
+    def uuid(self):
+        # the combination changes along with any of the models
+        return str(uuid.uuid5(uuid.NAMESPACE_OID,
+                              " ".join(model.uuid for model in self.models)))
+
+    def get_bounds(self):
+        return Bounds(Bounds.TYPE_CUSTOM, Box3D(Point3D(self.minx, self.miny, self.minz),
+                                                Point3D(self.maxx, self.maxy, self.maxz)))
+
+    def copy(self):
+        """ return a new Model containing copies of all triangles """
+        result = Model()
+        for model in self.models:
+            for triangle in model.triangles():
+                result.append(triangle.copy())
+        return result
+
+    def triangles(self, minx=-INFINITE, miny=-INFINITE, minz=-INFINITE, maxx=+INFINITE,
+                  maxy=+INFINITE, maxz=+INFINITE):
+        result = []
+        for model in self.models:
+            result.extend(model.triangles(minx, miny, minz, maxx, maxy, maxz))
+        return result
+
 
 class ContourModel(BaseModel):
 
@@ -305,6 +634,10 @@ class ContourModel(BaseModel):
         self._plane_groups = [self._plane]
         self._item_groups.append(self._plane_groups)
         self._export_function = pycam.Exporters.SVGExporter.SVGExporterContourModel
+        # the index of the open polygons (see "_get_endpoint_index")
+        self._endpoint_index = None
+        self._group_order = {}
+        self._group_counter = 0
 
     def __len__(self):
         """ Return the number of available items in the model.
@@ -318,6 +651,91 @@ class ContourModel(BaseModel):
             result.append(polygon.copy())
         return result
 
+    def reset_cache(self):
+        # the points of the polygons may have changed (e.g. by a transformation)
+        self._endpoint_index = None
+        super(ContourModel, self).reset_cache()
+
+    def _get_endpoint_index(self):
+        """ return the index of the first and last points of all open polygons
+
+        The keys are the quantized points (see "_get_point_key"). Each value is
+        a list of polygons starting or ending at this point. The index is
+        updated by "append" and "_merge_polygon_if_possible". Entries of
+        polygons that were changed or removed afterwards are skipped (and
+        discarded) by "_get_connectable_groups".
+        The order of the polygons within "_line_groups" is stored separately.
+        """
+        if self._endpoint_index is None:
+            self._endpoint_index = {}
+            self._group_order = {}
+            for polygon in self._line_groups:
+                self._add_to_endpoint_index(polygon)
+        return self._endpoint_index
+
+    def _add_to_endpoint_index(self, polygon):
+        index = self._get_endpoint_index()
+        if id(polygon) not in self._group_order:
+            self._group_counter += 1
+            self._group_order[id(polygon)] = (self._group_counter, polygon)
+        points = polygon.get_points()
+        if polygon.is_closed or not points:
+            return
+        for point in (points[0], points[-1]):
+            bucket = index.setdefault(_get_point_key(point), [])
+            if not [True for item in bucket if item is polygon]:
+                bucket.append(polygon)
+
+    def _remove_line_group(self, polygon):
+        # The order of the polygons in "_line_groups" matches their stored order:
+        # locate the polygon via bisection instead of a linear search.
+        order = self._group_order[id(polygon)][0]
+        low, high = 0, len(self._line_groups)
+        try:
+            while low < high:
+                middle = (low + high) // 2
+                if self._group_order[id(self._line_groups[middle])][0] < order:
+                    low = middle + 1
+                else:
+                    high = middle
+        except KeyError:
+            # the list was changed without updating the index
+            low = None
+        if (low is not None) and (low < len(self._line_groups)) \
+                and (self._line_groups[low] is polygon):
+            del self._line_groups[low]
+        else:
+            self._line_groups.remove(polygon)
+        del self._group_order[id(polygon)]
+
+    def _get_connectable_groups(self, items, exclude=None):
+        """ return the polygons that can be connected to any of the given lines or points
+
+        The polygons are returned in the order of "_line_groups".
+        """
+        index = self._get_endpoint_index()
+        result = {}
+        for item in items:
+            if isinstance(item, Line):
+                points = (item.p1, item.p2)
+            else:
+                points = (item, )
+            for point in points:
+                bucket = index.get(_get_point_key(point))
+                if not bucket:
+                    continue
+                # discard the entries of removed polygons and outdated endpoints
+                key = _get_point_key(point)
+                bucket[:] = [polygon for polygon in bucket
+                             if (self._group_order.get(id(polygon), (None, None))[1] is polygon)
+                             and not polygon.is_closed
+                             and key in (_get_point_key(polygon.get_points()[0]),
+                                         _get_point_key(polygon.get_points()[-1]))]
+                for polygon in bucket:
+                    if (polygon is not exclude) and polygon.is_connectable(item):
+                        result[id(polygon)] = polygon
+        return sorted(result.values(), key=lambda polygon: self._group_order[id(polygon)][0])
+
     def _merge_polygon_if_possible(self, other_polygon, allow_reverse=False):
         """ Check if the given 'other_polygon' can be connected to another
         polygon of the the current model. Both polygons are merged if possible.
@@ -330,14 +748,7 @@ class ContourModel(BaseModel):
         connectors.append(other_polygon.get_points()[0])
         connectors.append(other_polygon.get_points()[-1])
         # filter all polygons that can be combined with 'other_polygon'
-        connectables = []
-        for lg in self._line_groups:
-            if lg is other_polygon:
-                continue
-            for connector in connectors:
-                if lg.is_connectable(connector):
-                    connectables.append(lg)
-                    break
+        connectables = self._get_connectable_groups(connectors, exclude=other_polygon)
         # merge 'other_polygon' with all other connectable polygons
         for polygon in connectables:
             # check again, if the polygon is still connectable
@@ -352,7 +763,7 @@ class ContourModel(BaseModel):
                     if other_polygon.is_closed:
                         return
                     other_polygon.append(line)
-                self._line_groups.remove(polygon)
+                self._remove_line_group(polygon)
             elif other_polygon.get_points()[0] == polygon.get_points()[-1]:
                 lines = polygon.get_lines()
                 lines.reverse()
@@ -360,7 +771,7 @@ class ContourModel(BaseModel):
                     if other_polygon.is_closed:
                         return
                     other_polygon.append(line)
-                self._line_groups.remove(polygon)
+                self._remove_line_group(polygon)
             elif allow_reverse:
                 if other_polygon.get_points()[-1] == polygon.get_points()[-1]:
                     polygon.reverse_direction()
@@ -368,7 +779,7 @@ class ContourModel(BaseModel):
                         if other_polygon.is_closed:
                             return
                         other_polygon.append(line)
-                    self._line_groups.remove(polygon)
+                    self._remove_line_group(polygon)
                 elif other_polygon.get_points()[0] == polygon.get_points()[0]:
                     polygon.reverse_direction()
                     lines = polygon.get_lines()
@@ -377,7 +788,7 @@ class ContourModel(BaseModel):
                         if other_polygon.is_closed:
                             return
                         other_polygon.append(line)
-                    self._line_groups.remove(polygon)
+                    self._remove_line_group(polygon)
                 else:
                     pass
             else:
@@ -392,30 +803,27 @@ class ContourModel(BaseModel):
             item_list = [item]
             if allow_reverse:
                 item_list.append(Line(item.p2, item.p1))
-            found = False
-            # Going back from the end to start. The last line_group always has
-            # the highest chance of being suitable for the next line.
-            line_group_indexes = range(len(self._line_groups) - 1, -1, -1)
-            for line_group_index in line_group_indexes:
-                line_group = self._line_groups[line_group_index]
+            # The most recent line_group always has the highest chance of being
+            # suitable for the next line.
+            connectables = self._get_connectable_groups(item_list)
+            if connectables:
+                line_group = connectables[-1]
                 for candidate in item_list:
                     if line_group.is_connectable(candidate):
                         line_group.append(candidate)
                         self._merge_polygon_if_possible(line_group, allow_reverse=allow_reverse)
-                        found = True
+                        self._add_to_endpoint_index(line_group)
                         break
-                if found:
-                    break
             else:
                 # add a single line as part of a new group
                 new_line_group = Polygon(plane=self._plane)
                 new_line_group.append(item)
                 self._line_groups.append(new_line_group)
+                self._add_to_endpoint_index(new_line_group)
         elif isinstance(item, Polygon):
             if not unify_overlaps or (len(self._line_groups) == 0):
                 self._line_groups.append(item)
-                for subitem in next(item):
-                    self._update_limits(subitem)
+                self._add_to_endpoint_index(item)
             else:
                 # go through all polygons and check if they can be combined
                 is_outer = item.is_outer()
@@ -494,6 +902,7 @@ class ContourModel(BaseModel):
         # try to connect all open polygons
         for poly in open_polygons:
             self._line_groups.remove(poly)
+        self._endpoint_index = None
         poly_open_before = len(open_polygons)
         for poly in open_polygons:
             for line in poly.get_lines():
@@ -18,6 +18,9 @@ You should have received a copy of the GNU General Public License
 along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import bisect
+import heapq
+
 from pycam.Geometry import epsilon, number, TransformableContainer, IDGenerator
 from pycam.Geometry.Line import Line
 from pycam.Geometry.Plane import Plane
@@ -827,95 +830,6 @@ class Polygon(TransformableContainer):
         return result_polygons
 
     def get_offset_polygons(self, offset, callback=None):
-        def simplify_polygon_intersections(lines):
-            new_group = lines[:]
-            # remove all non-adjacent intersecting lines (this splits the group)
-            if len(new_group) > 0:
-                group_starts = []
-                index1 = 0
-                while index1 < len(new_group):
-                    index2 = 0
-                    while index2 < len(new_group):
-                        index_distance = min(abs(index2 - index1),
-                                             abs(len(new_group) - (index2 - index1)))
-                        # skip neighbours
-                        if index_distance > 1:
-                            line1 = new_group[index1]
-                            line2 = new_group[index2]
-                            intersection, factor = line1.get_intersection(line2)
-                            if intersection and (pdist(intersection, line1.p1) > epsilon) \
-                                    and (pdist(intersection, line1.p2) > epsilon):
-                                del new_group[index1]
-                                new_group.insert(index1, Line(line1.p1, intersection))
-                                new_group.insert(index1 + 1, Line(intersection, line1.p2))
-                                # Shift all items in "group_starts" by one if
-                                # they reference a line whose index changed.
-                                for i in range(len(group_starts)):
-                                    if group_starts[i] > index1:
-                                        group_starts[i] += 1
-                                if index1 + 1 not in group_starts:
-                                    group_starts.append(index1 + 1)
-                                # don't update index2 -> maybe there are other hits
-                            elif intersection and (pdist(intersection, line1.p1) < epsilon):
-                                if index1 not in group_starts:
-                                    group_starts.append(index1)
-                                index2 += 1
-                            else:
-                                index2 += 1
-                        else:
-                            index2 += 1
-                    index1 += 1
-                # The lines intersect each other
-                # We need to split the group.
-                if len(group_starts) > 0:
-                    group_starts.sort()
-                    groups = []
-                    last_start = 0
-                    for group_start in group_starts:
-                        transfer_group = new_group[last_start:group_start]
-                        # add only non-empty groups
-                        if transfer_group:
-                            groups.append(transfer_group)
-                        last_start = group_start
-
-                    # Add the remaining lines to the first group or as a new
-                    # group.
-                    if groups[0][0].p1 == new_group[-1].p2:
-                        groups[0] = new_group[last_start:] + groups[0]
-                    else:
-                        groups.append(new_group[last_start:])
-                    # try to find open groups that can be combined
-                    combined_groups = []
-                    for index, current_group in enumerate(groups):
-                        # Check if the group is not closed: try to add it to
-                        # other non-closed groups.
-                        if current_group[0].p1 == current_group[-1].p2:
-                            # a closed group
-                            combined_groups.append(current_group)
-                        else:
-                            # the current group is open
-                            for other_group in groups[index + 1:]:
-                                if other_group[0].p1 != other_group[-1].p2:
-                                    # This group is also open - a candidate
-                                    # for merging?
-                                    if other_group[0].p1 == current_group[-1].p2:
-                                        current_group.reverse()
-                                        for line in current_group:
-                                            other_group.insert(0, line)
-                                        break
-                                    if other_group[-1].p2 == current_group[0].p1:
-                                        other_group.extend(current_group)
-                                        break
-                            else:
-                                # not suitable open group found
-                                combined_groups.append(current_group)
-                    return combined_groups
-                else:
-                    # just return one group without intersections
-                    return [new_group]
-            else:
-                return None
-
         offset = number(offset)
         if offset == 0:
             return [self]
@@ -941,7 +855,7 @@ class Polygon(TransformableContainer):
             new_lines.append(Line(points[-1], points[0]))
         if callback and callback():
             return None
-        cleaned_line_groups = simplify_polygon_intersections(new_lines)
+        cleaned_line_groups = _split_at_intersections(new_lines)
         if cleaned_line_groups is None:
             log.debug("Skipping offset polygon: intersections could not be "
                       "simplified")
@@ -1130,3 +1044,350 @@ class Polygon(TransformableContainer):
                 else:
                     outer.append(new_line)
         return (inner, outer)
+
+
+def _get_line_bounds(line):
+    """ return the limits (minx, maxx, miny, maxy) of a line and its tolerance
+
+    The bounding box of the line is widened by the tolerance of
+    Line.get_intersection (relative to the length of the line). Lines whose
+    boxes do not overlap cannot intersect.
+    """
+    margin = 2 * epsilon * (1 + line.len)
+    return (min(line.p1[0], line.p2[0]) - margin, max(line.p1[0], line.p2[0]) + margin,
+            min(line.p1[1], line.p2[1]) - margin, max(line.p1[1], line.p2[1]) + margin), margin
+
+
+def _get_overlapping_pairs(lines):
+    """ return all pairs of lines (by index) that may intersect each other
+
+    The pieces of a line (split at intersections) are within the bounding
+    box of the line, as well (see "_get_line_bounds").
+    The lines are swept along the x axis in the order of their lower x limit.
+    Only the lines overlapping the current x position (the "active" set) are
+    compared. Thus the number of comparisons is usually proportional to the
+    number of lines (plus the number of intersections) - instead of being
+    quadratic.
+    """
+    bounds = [_get_line_bounds(line)[0] for line in lines]
+    order = sorted(range(len(lines)), key=lambda index: bounds[index][0])
+    active = set()
+    # the active lines ordered by their upper x limit
+    active_ends = []
+    pairs = []
+    for index in order:
+        minx, maxx, miny, maxy = bounds[index]
+        # remove the lines that ended before the current position
+        while active_ends and (active_ends[0][0] < minx):
+            active.remove(heapq.heappop(active_ends)[1])
+        for other in active:
+            if (bounds[other][2] <= maxy) and (bounds[other][3] >= miny):
+                pairs.append((min(index, other), max(index, other)))
+        active.add(index)
+        heapq.heappush(active_ends, (maxx, index))
+    pairs.sort()
+    return pairs
+
+
+class _PieceCounter(object):
+    """ number of pieces of each line of a chain (a Fenwick tree)
+
+    The position of the first piece of a line within the chain (the sum of
+    the pieces of all previous lines) is calculated in logarithmic time.
+    """
+
+    def __init__(self, count):
+        # one piece per line
+        self._tree = [0] + [index & -index for index in range(1, count + 1)]
+
+    def add_piece(self, index):
+        index += 1
+        while index < len(self._tree):
+            self._tree[index] += 1
+            index += index & -index
+
+    def get_position(self, index):
+        result = 0
+        while index > 0:
+            result += self._tree[index]
+            index -= index & -index
+        return result
+
+
+class _SplitLine(object):
+    """ the pieces of a line split at intersections
+
+    The pieces are ordered along the line. They are located by their
+    distance from the start of the line.
+    """
+
+    def __init__(self, line):
+        self.line = line
+        self.bounds, self.margin = _get_line_bounds(line)
+        self.direction = line.dir if line.len > 0 else None
+        self.pieces = [line]
+        self.starts = [0]
+
+    def get_distance(self, point):
+        return pdot(psub(point, self.line.p1), self.direction)
+
+    def get_distances(self, bounds):
+        """ return the range of distances along the line covered by a box """
+        minx, maxx, miny, maxy = bounds
+        z = self.line.p1[2]
+        distances = [self.get_distance((x, y, z)) for x in (minx, maxx) for y in (miny, maxy)]
+        return min(distances) - self.margin, max(distances) + self.margin
+
+    def get_pieces(self, bounds):
+        """ return the indices of the pieces that may reach into a box """
+        if self.direction is None:
+            return range(len(self.pieces))
+        low, high = self.get_distances(bounds)
+        return range(max(0, bisect.bisect_right(self.starts, low) - 1),
+                     bisect.bisect_right(self.starts, high))
+
+    def split(self, index, point):
+        piece = self.pieces[index]
+        self.pieces[index:index + 1] = [Line(piece.p1, point), Line(point, piece.p2)]
+        self.starts.insert(index + 1, self.get_distance(point))
+
+
+class _Candidates(object):
+    """ the pieces that may intersect the current piece: (position, line, piece)
+
+    The candidates are ordered by their position within the chain. The
+    positions of the candidates after the current piece increase by one for
+    every split of the current piece. This shift is applied on access - thus
+    the effort of a split does not depend on the number of candidates.
+    """
+
+    def __init__(self, candidates, index, origin, piece):
+        self.index = index
+        self.origin = origin
+        self.piece = piece
+        self._before = [candidate for candidate in candidates if candidate[0] <= index]
+        # reversed order: the new pieces are added next to the current piece
+        self._after = [candidate for candidate in reversed(candidates) if candidate[0] > index]
+        self._shift = 0
+
+    def __len__(self):
+        return len(self._before) + len(self._after)
+
+    def __getitem__(self, position):
+        if position < len(self._before):
+            return self._before[position]
+        index, origin, piece = self._after[len(self) - 1 - position]
+        if origin == self.origin:
+            piece += self._shift
+        return index + self._shift, origin, piece
+
+    def split(self):
+        """ add the second part of the split current piece """
+        self._shift += 1
+        self._after.append((self.index + 1 - self._shift, self.origin,
+                            self.piece + 1 - self._shift))
+
+    def find(self, index):
+        """ return the first position of a candidate at or after the given index """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle][0] < index:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+def _get_piece_bounds(split_line, index):
+    """ return the limits of a piece widened by the tolerance of the original line """
+    minx, maxx, miny, maxy = _get_line_bounds(split_line.pieces[index])[0]
+    margin = split_line.margin
+    return (minx - margin, maxx + margin, miny - margin, maxy + margin)
+
+
+def _split_at_intersections(lines):
+    """ split a chain of lines at its self-intersections
+
+    Every line is compared with all non-adjacent lines (including the pieces
+    of lines split before). It is split at the first point of intersection
+    that is not one of its ends - the first part is compared again. The
+    chain is divided into groups of lines starting at these intersections.
+    Groups are merged again, if their ends fit together.
+    Only the pieces with overlapping bounding boxes are compared - all
+    other pieces cannot intersect:
+      - pairs of lines: see "_get_overlapping_pairs"
+      - lines along the current line: the related lines are swept in the
+        order of their projection onto the current line
+      - pieces of a line: see "_SplitLine.get_pieces"
+    The pieces are stored for each original line. Thus the effort of a split
+    does not depend on the length of the chain.
+    The result is a list of groups (lists of lines) or None for an empty
+    chain.
+    """
+    if not lines:
+        return None
+    related = [[index] for index in range(len(lines))]
+    for index1, index2 in _get_overlapping_pairs(lines):
+        related[index1].append(index2)
+        related[index2].append(index1)
+    split_lines = [_SplitLine(line) for line in lines]
+    # the pieces starting a group (by id)
+    group_starts = {}
+    piece_counter = _PieceCounter(len(lines))
+    total_count = len(lines)
+    # position of the current piece within the chain of all pieces
+    index1 = 0
+    for origin1, split_line1 in enumerate(split_lines):
+        if split_line1.direction is None:
+            others = [(0, 0, origin2) for origin2 in related[origin1]]
+        else:
+            others = sorted(split_line1.get_distances(split_lines[origin2].bounds) + (origin2,)
+                            for origin2 in related[origin1])
+        heapq.heapify(others)
+        active = set()
+        # the active lines ordered by their projected end
+        active_ends = []
+        piece1 = 0
+        while piece1 < len(split_line1.pieces):
+            bounds = _get_piece_bounds(split_line1, piece1)
+            if split_line1.direction is None:
+                low, high = 0, 0
+            else:
+                low, high = split_line1.get_distances(bounds)
+            added = []
+            while others and (others[0][0] <= high):
+                other = heapq.heappop(others)
+                added.append(other)
+                active.add(other[2])
+                heapq.heappush(active_ends, other[1:])
+            while active_ends and (active_ends[0][0] < low):
+                active.discard(heapq.heappop(active_ends)[1])
+            candidates = []
+            for origin2 in sorted(active):
+                split_line2 = split_lines[origin2]
+                minx, maxx, miny, maxy = split_line2.bounds
+                if (minx > bounds[1]) or (maxx < bounds[0]) or (miny > bounds[3]) \
+                        or (maxy < bounds[2]):
+                    continue
+                start = piece_counter.get_position(origin2)
+                candidates.extend((start + piece2, origin2, piece2)
+                                  for piece2 in split_line2.get_pieces(bounds))
+            candidates = _Candidates(candidates, index1, origin1, piece1)
+            position = 0
+            while position < len(candidates):
+                index2, origin2, piece2 = candidates[position]
+                index_distance = min(abs(index2 - index1), abs(total_count - (index2 - index1)))
+                # skip neighbours
+                if index_distance > 1:
+                    line1 = split_line1.pieces[piece1]
+                    line2 = split_lines[origin2].pieces[piece2]
+                    intersection, factor = line1.get_intersection(line2)
+                    if intersection and (pdist(intersection, line1.p1) > epsilon) \
+                            and (pdist(intersection, line1.p2) > epsilon):
+                        split_line1.split(piece1, intersection)
+                        piece_counter.add_piece(origin1)
+                        total_count += 1
+                        candidates.split()
+                        if id(line1) in group_starts:
+                            del group_starts[id(line1)]
+                            first_part = split_line1.pieces[piece1]
+                            group_starts[id(first_part)] = first_part
+                        second_part = split_line1.pieces[piece1 + 1]
+                        group_starts[id(second_part)] = second_part
+                        # Don't advance to the next candidate -> maybe there are other hits.
+                        # The same position may refer to a different piece now.
+                        position = candidates.find(index2)
+                        continue
+                    elif intersection and (pdist(intersection, line1.p1) < epsilon):
+                        group_starts[id(line1)] = line1
+                position += 1
+            if added and (split_line1.direction is not None):
+                # The current piece was split: the lines beyond its final end are compared
+                # with the following pieces.
+                high = split_line1.get_distances(_get_piece_bounds(split_line1, piece1))[1]
+                for other in added:
+                    if other[0] > high:
+                        active.discard(other[2])
+                        heapq.heappush(others, other)
+            piece1 += 1
+            index1 += 1
+    new_group = []
+    for split_line in split_lines:
+        new_group.extend(split_line.pieces)
+    start_positions = [position for position, line in enumerate(new_group)
+                       if id(line) in group_starts]
+    return _get_intersection_groups(new_group, start_positions)
+
+
+def _get_intersection_groups(new_group, group_starts):
+    """ divide the lines into groups at the given positions and combine open groups """
+    if len(group_starts) > 0:
+        # The lines intersect each other
+        # We need to split the group.
+        group_starts.sort()
+        groups = []
+        last_start = 0
+        for group_start in group_starts:
+            transfer_group = new_group[last_start:group_start]
+            # add only non-empty groups
+            if transfer_group:
+                groups.append(transfer_group)
+            last_start = group_start
+
+        # Add the remaining lines to the first group or as a new
+        # group.
+        if groups[0][0].p1 == new_group[-1].p2:
+            groups[0] = new_group[last_start:] + groups[0]
+        else:
+            groups.append(new_group[last_start:])
+        # try to find open groups that can be combined
+        # the indices of the groups by their first and their last point
+        group_firsts = {}
+        group_lasts = {}
+        for index, current_group in enumerate(groups):
+            group_firsts.setdefault(current_group[0].p1, []).append(index)
+            group_lasts.setdefault(current_group[-1].p2, []).append(index)
+
+        def find_group(table, point, index, get_point):
+            """ return the first open group after "index" with the given point (or None) """
+            indices = table.get(point, [])
+            position = bisect.bisect_right(indices, index)
+            while position < len(indices):
+                other = indices[position]
+                other_group = groups[other]
+                if (other_group[0].p1 != other_group[-1].p2) \
+                        and (get_point(other_group) == point):
+                    return other
+                # the group was closed or extended meanwhile
+                del indices[position]
+            return None
+
+        combined_groups = []
+        for index, current_group in enumerate(groups):
+            # Check if the group is not closed: try to add it to
+            # other non-closed groups.
+            if current_group[0].p1 == current_group[-1].p2:
+                # a closed group
+                combined_groups.append(current_group)
+                continue
+            # the current group is open: find the first open group that fits
+            before = find_group(group_firsts, current_group[-1].p2, index,
+                                lambda group: group[0].p1)
+            after = find_group(group_lasts, current_group[0].p1, index,
+                               lambda group: group[-1].p2)
+            if (before is not None) and ((after is None) or (before <= after)):
+                other_group = groups[before]
+                other_group[:0] = current_group
+                bisect.insort(group_firsts.setdefault(other_group[0].p1, []), before)
+            elif after is not None:
+                other_group = groups[after]
+                other_group.extend(current_group)
+                bisect.insort(group_lasts.setdefault(other_group[-1].p2, []), after)
+            else:
+                # not suitable open group found
+                combined_groups.append(current_group)
+        return combined_groups
+    else:
+        # just return one group without intersections
+        return [new_group]
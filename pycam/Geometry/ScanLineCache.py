@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import math
+
+from pycam.Geometry import epsilon, INFINITE
+
+
+class ScanLineCache(object):
+    """ candidate triangles for positions of a cutter along a straight line
+
+    The triangles within the strip covered by the cutter (moving from "start"
+    to "end") are queried only once. They are sorted by the start of their
+    extent along the line. The triangles that can overlap the cutter at the
+    current position (the "active" set) are updated incrementally, while the
+    position moves along the line.
+    The result for a position is exactly the result of the query of the model
+    for the box around the cutter (e.g. see "get_max_height_triangles"): all
+    triangles whose bounding box overlaps the box in the order of the model.
+    Positions outside of the line are answered by a separate query of the
+    model. These are counted as "misses" - all other requests are "hits".
+    """
+
+    # the sum of the counters of all instances within this process (see "get_statistics")
+    total_hits = 0
+    total_misses = 0
+
+    def __init__(self, model, start, end, margin):
+        """
+        @param margin: the distance between a position and the sides of its box (e.g. the
+            radius of the cutter)
+        """
+        self.model = model
+        self.margin = margin
+        self.origin = (start[0], start[1])
+        dx = end[0] - start[0]
+        dy = end[1] - start[1]
+        self.length = math.sqrt(dx * dx + dy * dy)
+        if self.length > 0:
+            self.direction = (dx / self.length, dy / self.length)
+        else:
+            self.direction = (1.0, 0.0)
+        # the extent of a box (along and across the line) around its position
+        self.extent = margin * (abs(self.direction[0]) + abs(self.direction[1])) + epsilon
+        self.hits = 0
+        self.misses = 0
+        entries = []
+        # the order of the query is kept for the results
+        for order, t in enumerate(model.triangles(
+                min(start[0], end[0]) - margin - epsilon, min(start[1], end[1]) - margin - epsilon,
+                -INFINITE, max(start[0], end[0]) + margin + epsilon,
+                max(start[1], end[1]) + margin + epsilon, INFINITE)):
+            along, across = zip(*[self._get_line_coordinates(p)
+                                  for p in ((t.minx, t.miny), (t.minx, t.maxy),
+                                            (t.maxx, t.miny), (t.maxx, t.maxy))])
+            # skip the triangles that are too far away from the line
+            if (min(across) <= self.extent) and (max(across) >= -self.extent):
+                entries.append((min(along), max(along), order, t, t.minx, t.maxx, t.miny,
+                                t.maxy))
+        entries.sort(key=lambda entry: entry[0])
+        self._starts = [entry[0] for entry in entries]
+        self._entries = entries
+        self._reset()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _reset(self):
+        # index of the next entry to be activated
+        self._next = 0
+        self._active = []
+        # the furthest position since the last reset
+        self._position = None
+        # the position of the last removal of passed triangles
+        self._evicted = -INFINITE
+
+    def _get_line_coordinates(self, point):
+        """ return the distance along the line and the (signed) distance from the line """
+        dx = point[0] - self.origin[0]
+        dy = point[1] - self.origin[1]
+        return (dx * self.direction[0] + dy * self.direction[1],
+                dy * self.direction[0] - dx * self.direction[1])
+
+    def _is_on_line(self, along, across):
+        return (abs(across) <= epsilon) and (-epsilon <= along <= self.length + epsilon)
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+            ScanLineCache.total_hits += 1
+        else:
+            self.misses += 1
+            ScanLineCache.total_misses += 1
+
+    @staticmethod
+    def _get_overlapping(entries, minx, miny, maxx, maxy):
+        """ return the triangles whose bounding box overlaps the given box (see Model.triangles)
+        """
+        result = [(order, t) for _, _, order, t, t_minx, t_maxx, t_miny, t_maxy in entries
+                  if not ((t_minx > maxx) or (t_maxx < minx) or (t_miny > maxy)
+                          or (t_maxy < miny))]
+        result.sort()
+        return [t for _, t in result]
+
+    def get_triangles(self, x, y):
+        """ return the triangles that could collide with the cutter at the given position
+
+        Subsequent positions should move forward along the line. Small steps
+        backwards (up to the extent of the box) are handled without a reset of
+        the active set.
+        """
+        along, across = self._get_line_coordinates((x, y))
+        if not self._is_on_line(along, across):
+            self._count(False)
+            return self.model.triangles(x - self.margin, y - self.margin, -INFINITE,
+                                        x + self.margin, y + self.margin, INFINITE)
+        self._count(True)
+        if (self._position is not None) and (along < self._position - self.extent):
+            # we moved too far backwards - the active set is incomplete
+            self._reset()
+        if (self._position is None) or (along > self._position):
+            self._position = along
+        if self._position > self._evicted + self.extent:
+            # Remove the passed triangles from time to time. Keep the recently passed triangles
+            # (within the extent) for small steps backwards.
+            self._evicted = self._position
+            self._active = [entry for entry in self._active
+                            if entry[1] >= self._position - 2 * self.extent]
+        while (self._next < len(self._entries)) \
+                and (self._starts[self._next] <= along + self.extent):
+            self._active.append(self._entries[self._next])
+            self._next += 1
+        return self._get_overlapping(self._active, x - self.margin, y - self.margin,
+                                     x + self.margin, y + self.margin)
+
+    def get_segment_triangles(self, p1, p2):
+        """ return the triangles that could collide with the cutter moving between two points
+
+        The result does not depend on the previous requests. It is the result of the query of
+        the model for the box around the move - except for the triangles outside of the strip
+        along the line, if the line is not parallel to an axis. The cutter cannot collide with
+        these triangles.
+        """
+        along1, across1 = self._get_line_coordinates(p1)
+        along2, across2 = self._get_line_coordinates(p2)
+        minx, maxx = min(p1[0], p2[0]) - self.margin, max(p1[0], p2[0]) + self.margin
+        miny, maxy = min(p1[1], p2[1]) - self.margin, max(p1[1], p2[1]) + self.margin
+        if not (self._is_on_line(along1, across1) and self._is_on_line(along2, across2)):
+            self._count(False)
+            return self.model.triangles(minx, miny, -INFINITE, maxx, maxy, INFINITE)
+        self._count(True)
+        low, high = min(along1, along2) - self.extent, max(along1, along2) + self.extent
+        last = bisect.bisect_right(self._starts, high)
+        return self._get_overlapping([entry for entry in self._entries[:last] if entry[1] >= low],
+                                     minx, miny, maxx, maxy)
+
+    @classmethod
+    def get_statistics(cls):
+        """ return the sum of the hits and misses of all instances within this process
+
+        The counters of worker processes are collected along with the results
+        of their tasks (see pycam.Utils.threading.get_task_statistics).
+        """
+        return {"hits": cls.total_hits, "misses": cls.total_misses}
+
+    @classmethod
+    def reset_statistics(cls):
+        cls.total_hits = 0
+        cls.total_misses = 0
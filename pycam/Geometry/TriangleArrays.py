@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+try:
+    import numpy
+    numpy_enabled = True
+except ImportError:
+    numpy_enabled = False
+
+
+class TriangleArrays(object):
+    """ packed (structure-of-arrays) representation of a list of triangles
+
+    All attributes are numpy arrays with one row per triangle. They contain
+    exactly the values of the cached attributes of the given Triangle objects
+    (e.g. the normal given by an STL file is retained). This allows the
+    vectorized collision functions to produce the same results as the
+    per-triangle functions.
+    """
+
+    def __init__(self, triangles):
+        if not numpy_enabled:
+            raise ImportError("The 'numpy' module is required for packed triangle arrays.")
+        self.triangles = list(triangles)
+        count = len(self.triangles)
+        self.p1 = numpy.empty((count, 3))
+        self.p2 = numpy.empty((count, 3))
+        self.p3 = numpy.empty((count, 3))
+        self.normal = numpy.empty((count, 3))
+        self.plane_point = numpy.empty((count, 3))
+        self.plane_normal = numpy.empty((count, 3))
+        self.middle = numpy.empty((count, 3))
+        self.radius = numpy.empty(count)
+        self.radiussq = numpy.empty(count)
+        for index, t in enumerate(self.triangles):
+            self.p1[index] = t.p1[:3]
+            self.p2[index] = t.p2[:3]
+            self.p3[index] = t.p3[:3]
+            self.normal[index] = t.normal[:3]
+            self.plane_point[index] = t.plane.p[:3]
+            self.plane_normal[index] = t.plane.n[:3]
+            self.middle[index] = t.middle[:3]
+            self.radius[index] = t.radius
+            self.radiussq[index] = t.radiussq
+        self.reset_cache()
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        """ pack the triangles of a TriangleMesh without creating Triangle objects
+
+        The values are calculated in the same way as in Triangle.reset_cache.
+        """
+        if not numpy_enabled:
+            raise ImportError("The 'numpy' module is required for packed triangle arrays.")
+        result = cls.__new__(cls)
+        result.triangles = mesh
+        p1, p2, p3 = mesh.get_points()
+        result.p1 = p1
+        result.p2 = p2
+        result.p3 = p3
+        result.normal = mesh.normals
+        result.plane_point = ((p1 + p2) + p3) / 3
+        result.plane_normal = mesh.normals
+        # circumcircle
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            denom = norm(cross(p2 - p1, p3 - p2))
+            result.radius = (norm(p2 - p1) * norm(p3 - p2) * norm(p3 - p1)) / (2 * denom)
+            result.radiussq = result.radius ** 2
+            denom2 = 2 * denom * denom
+            alpha = dot(p3 - p2, p3 - p2) * dot(p1 - p2, p1 - p3) / denom2
+            beta = dot(p1 - p3, p1 - p3) * dot(p2 - p1, p2 - p3) / denom2
+            gamma = dot(p1 - p2, p1 - p2) * dot(p3 - p1, p3 - p2) / denom2
+        result.middle = (p1 * alpha[:, None] + p2 * beta[:, None]) + p3 * gamma[:, None]
+        result.reset_cache()
+        return result
+
+    def __len__(self):
+        return len(self.p1)
+
+    def reset_cache(self):
+        """ calculate all values derived from the vertices """
+        points = (self.p1, self.p2, self.p3)
+        self.minx = numpy.minimum(numpy.minimum(self.p1[:, 0], self.p2[:, 0]), self.p3[:, 0])
+        self.miny = numpy.minimum(numpy.minimum(self.p1[:, 1], self.p2[:, 1]), self.p3[:, 1])
+        self.minz = numpy.minimum(numpy.minimum(self.p1[:, 2], self.p2[:, 2]), self.p3[:, 2])
+        self.maxx = numpy.maximum(numpy.maximum(self.p1[:, 0], self.p2[:, 0]), self.p3[:, 0])
+        self.maxy = numpy.maximum(numpy.maximum(self.p1[:, 1], self.p2[:, 1]), self.p3[:, 1])
+        self.maxz = numpy.maximum(numpy.maximum(self.p1[:, 2], self.p2[:, 2]), self.p3[:, 2])
+        # edges (e1, e2, e3) are stored along the second axis: p1->p2, p2->p3, p3->p1
+        self.edge_p1 = numpy.stack(points, axis=1)
+        self.edge_p2 = numpy.stack((self.p2, self.p3, self.p1), axis=1)
+        vector = self.edge_p2 - self.edge_p1
+        self.edge_len = numpy.sqrt(dot(vector, vector))
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            self.edge_dir = vector / self.edge_len[..., None]
+        # precalculated values for "is_point_inside" (see Triangle.is_point_inside)
+        self._v0 = self.p3 - self.p1
+        self._v1 = self.p2 - self.p1
+        self._dot00 = dot(self._v0, self._v0)
+        self._dot01 = dot(self._v0, self._v1)
+        self._dot11 = dot(self._v1, self._v1)
+        self._denom = self._dot00 * self._dot11 - self._dot01 * self._dot01
+
+    def is_point_inside(self, points, indices):
+        """ vectorized version of Triangle.is_point_inside
+
+        @param points: array of points (one row per index)
+        @param indices: indices of the triangles to be checked
+        """
+        v2 = points - self.p1[indices]
+        dot00 = self._dot00[indices]
+        dot01 = self._dot01[indices]
+        dot11 = self._dot11[indices]
+        dot02 = dot(self._v0[indices], v2)
+        dot12 = dot(self._v1[indices], v2)
+        denom = self._denom[indices]
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            inv_denom = 1.0 / denom
+            u = (dot11 * dot02 - dot01 * dot12) * inv_denom
+            v = (dot00 * dot12 - dot01 * dot02) * inv_denom
+            return (denom != 0) & (u > 0) & (v > 0) & (u + v < 1)
+
+
+def dot(a, b):
+    """ row-wise dot product of vectors (same order of operations as "pdot") """
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
+def cross(a, b):
+    """ row-wise cross product of vectors (same order of operations as "pcross") """
+    return numpy.stack((a[..., 1] * b[..., 2] - b[..., 1] * a[..., 2],
+                        b[..., 0] * a[..., 2] - a[..., 0] * b[..., 2],
+                        a[..., 0] * b[..., 1] - b[..., 0] * a[..., 1]), axis=-1)
+
+
+def norm(a):
+    return numpy.sqrt(dot(a, a))
+
+
+def normalized(a):
+    """ row-wise normalization - zero-length vectors are turned into NaN """
+    length = norm(a)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where((length == 0)[..., None], numpy.nan, a / length[..., None])
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+try:
+    import numpy
+    numpy_enabled = True
+except ImportError:
+    numpy_enabled = False
+
+
+# number of bits per axis for the morton code of the triangle centers
+MORTON_BITS = 16
+
+
+def _spread_bits(values):
+    """ insert a zero bit between all bits of 16 bit integers """
+    values = values.astype(numpy.uint32)
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    values = (values | (values << 1)) & 0x55555555
+    return values
+
+
+class TriangleBVH(object):
+    """ bounding volume hierarchy for range queries of triangles in the xy plane
+
+    The tree is stored in flat arrays: the triangles are sorted along a
+    z-order curve (morton code of their centers) and split into leaves of
+    "leaf_size" triangles. The nodes form a complete binary tree (heap
+    layout: the children of node "i" are "2i+1" and "2i+2").
+    The result of a query contains all triangles overlapping the given box
+    (similar to TriangleKdtree.Search).
+    """
+
+    def __init__(self, minx, maxx, miny, maxy, leaf_size=8):
+        """
+        @param minx, maxx, miny, maxy: sequences of the bounding box limits of
+            the triangles (the index of a triangle is its position)
+        """
+        if not numpy_enabled:
+            raise ImportError("The 'numpy' module is required for the array-based triangle "
+                              "index.")
+        minx = numpy.asarray(minx, dtype=float)
+        maxx = numpy.asarray(maxx, dtype=float)
+        miny = numpy.asarray(miny, dtype=float)
+        maxy = numpy.asarray(maxy, dtype=float)
+        self.size = len(minx)
+        self.leaf_size = leaf_size
+        self.leaf_count = max(1, -(-self.size // leaf_size))
+        # number of leaves of the complete tree
+        padded_leaf_count = 1
+        self.depth = 0
+        while padded_leaf_count < self.leaf_count:
+            padded_leaf_count *= 2
+            self.depth += 1
+        self.first_leaf = padded_leaf_count - 1
+        # sort the triangles along the z-order curve
+        if self.size > 0:
+            center_x = (minx + maxx) / 2
+            center_y = (miny + maxy) / 2
+            scale = (1 << MORTON_BITS) - 1
+            width = max(center_x.max() - center_x.min(), 1e-12)
+            height = max(center_y.max() - center_y.min(), 1e-12)
+            codes = (_spread_bits((center_x - center_x.min()) / width * scale)
+                     | (_spread_bits((center_y - center_y.min()) / height * scale) << 1))
+            self.permutation = numpy.argsort(codes, kind="stable")
+        else:
+            self.permutation = numpy.zeros(0, dtype=numpy.intp)
+        self.node_count = 2 * padded_leaf_count - 1
+        self._update_nodes(minx, maxx, miny, maxy)
+
+    def __len__(self):
+        return self.size
+
+    def refit(self, minx, maxx, miny, maxy):
+        """ update the limits of the triangles without changing the tree structure
+
+        This is suitable for transformed triangles (e.g. shifted or scaled). The
+        query results are correct for any changes of the limits, but the queries
+        get slower if the triangles are moved around randomly.
+        """
+        if len(minx) != self.size:
+            raise ValueError("The number of triangles of the index (%d) cannot be changed (%d)"
+                             % (self.size, len(minx)))
+        self._update_nodes(numpy.asarray(minx, dtype=float), numpy.asarray(maxx, dtype=float),
+                           numpy.asarray(miny, dtype=float), numpy.asarray(maxy, dtype=float))
+
+    def _update_nodes(self, minx, maxx, miny, maxy):
+        self.minx = minx[self.permutation]
+        self.maxx = maxx[self.permutation]
+        self.miny = miny[self.permutation]
+        self.maxy = maxy[self.permutation]
+        # the boxes of the leaves (empty leaves never overlap)
+        self.node_minx = numpy.full(self.node_count, numpy.inf)
+        self.node_maxx = numpy.full(self.node_count, -numpy.inf)
+        self.node_miny = numpy.full(self.node_count, numpy.inf)
+        self.node_maxy = numpy.full(self.node_count, -numpy.inf)
+        if self.size > 0:
+            starts = numpy.arange(0, self.size, self.leaf_size)
+            leaves = slice(self.first_leaf, self.first_leaf + len(starts))
+            self.node_minx[leaves] = numpy.minimum.reduceat(self.minx, starts)
+            self.node_maxx[leaves] = numpy.maximum.reduceat(self.maxx, starts)
+            self.node_miny[leaves] = numpy.minimum.reduceat(self.miny, starts)
+            self.node_maxy[leaves] = numpy.maximum.reduceat(self.maxy, starts)
+        # combine the boxes of the children (level by level)
+        level_start = self.first_leaf
+        while level_start > 0:
+            parent_start = (level_start - 1) // 2
+            children = numpy.arange(level_start, 2 * level_start + 1)
+            parents = slice(parent_start, level_start)
+            for values, func in ((self.node_minx, numpy.minimum), (self.node_maxx, numpy.maximum),
+                                 (self.node_miny, numpy.minimum), (self.node_maxy, numpy.maximum)):
+                values[parents] = func(values[children[0::2]], values[children[1::2]])
+            level_start = parent_start
+        # lists are faster than arrays for the single queries (see "search")
+        self._lists = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_lists"] = None
+        return state
+
+    def _get_lists(self):
+        if self._lists is None:
+            self._lists = (self.node_minx.tolist(), self.node_maxx.tolist(),
+                           self.node_miny.tolist(), self.node_maxy.tolist(),
+                           self.minx.tolist(), self.maxx.tolist(), self.miny.tolist(),
+                           self.maxy.tolist(), self.permutation.tolist())
+        return self._lists
+
+    def search(self, minx, maxx, miny, maxy):
+        """ return the sorted indices of all triangles overlapping the given box """
+        (node_minx, node_maxx, node_miny, node_maxy, t_minx, t_maxx, t_miny, t_maxy,
+         permutation) = self._get_lists()
+        first_leaf = self.first_leaf
+        leaf_size = self.leaf_size
+        result = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if ((node_minx[node] > maxx) or (node_maxx[node] < minx)
+                    or (node_miny[node] > maxy) or (node_maxy[node] < miny)):
+                continue
+            if node >= first_leaf:
+                start = (node - first_leaf) * leaf_size
+                for index in range(start, min(start + leaf_size, self.size)):
+                    if not ((t_minx[index] > maxx) or (t_maxx[index] < minx)
+                            or (t_miny[index] > maxy) or (t_maxy[index] < miny)):
+                        result.append(permutation[index])
+            else:
+                stack.append(2 * node + 2)
+                stack.append(2 * node + 1)
+        result.sort()
+        return result
+
+    def search_many(self, minx, maxx, miny, maxy):
+        """ search the triangles overlapping each of the given boxes at once
+
+        @param minx, maxx, miny, maxy: arrays of the limits of the boxes
+        @returns: tuple of two index arrays: box indices and triangle indices
+            (sorted by box and triangle)
+        """
+        minx = numpy.asarray(minx, dtype=float)
+        maxx = numpy.asarray(maxx, dtype=float)
+        miny = numpy.asarray(miny, dtype=float)
+        maxy = numpy.asarray(maxy, dtype=float)
+        queries = numpy.arange(len(minx))
+        nodes = numpy.zeros(len(minx), dtype=numpy.intp)
+        for level in range(self.depth + 1):
+            overlap = ~((self.node_minx[nodes] > maxx[queries])
+                        | (self.node_maxx[nodes] < minx[queries])
+                        | (self.node_miny[nodes] > maxy[queries])
+                        | (self.node_maxy[nodes] < miny[queries]))
+            queries = queries[overlap]
+            nodes = nodes[overlap]
+            if level < self.depth:
+                # continue with both children
+                queries = numpy.repeat(queries, 2)
+                nodes = (2 * numpy.repeat(nodes, 2) + 1) + numpy.tile((0, 1), len(nodes))
+        # expand the leaves to the positions of their triangles
+        starts = (nodes - self.first_leaf) * self.leaf_size
+        ends = numpy.minimum(starts + self.leaf_size, self.size)
+        counts = numpy.maximum(ends - starts, 0)
+        queries = numpy.repeat(queries, counts)
+        offsets = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        positions = numpy.repeat(starts, counts) + offsets
+        overlap = ~((self.minx[positions] > maxx[queries])
+                    | (self.maxx[positions] < minx[queries])
+                    | (self.miny[positions] > maxy[queries])
+                    | (self.maxy[positions] < miny[queries]))
+        queries = queries[overlap]
+        triangles = self.permutation[positions[overlap]]
+        order = numpy.lexsort((triangles, queries))
+        return queries[order], triangles[order]
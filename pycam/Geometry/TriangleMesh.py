@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import cross, normalized
+
+try:
+    import numpy
+    numpy_enabled = True
+except ImportError:
+    numpy_enabled = False
+
+
+class TriangleMesh(object):
+    """ compact storage of triangles: shared vertices and faces (vertex indices)
+
+    The mesh behaves like a list of Triangle objects (len, indexing, iteration
+    and "append"). The Triangle objects are created only on demand and they
+    are kept afterwards - thus the identity of a triangle does not change as
+    long as the mesh is not transformed.
+    Triangles added via "append" are kept in a list and merged into the
+    arrays with the next access of the arrays.
+
+    Attributes (numpy arrays):
+        vertices: coordinates of all vertices (V x 3)
+        faces: vertex indices of each triangle in clockwise order (F x 3)
+        normals: normal of each triangle (F x 3)
+        minx, miny, minz, maxx, maxy, maxz: bounding box of each triangle (F)
+    """
+
+    def __init__(self, vertices, faces, normals=None):
+        """
+        @param vertices: sequence of vertex coordinates
+        @param faces: sequence of three vertex indices for every triangle
+            (clockwise order - see Triangle)
+        @param normals: optional sequence of normals for every triangle - missing
+            normals (None or NaN) are calculated like in Triangle.reset_cache
+        """
+        if not numpy_enabled:
+            raise ImportError("The 'numpy' module is required for array-based meshes.")
+        self._vertices = numpy.array(vertices, dtype=float).reshape((-1, 3))
+        self._faces = numpy.array(faces, dtype=numpy.intp).reshape((-1, 3))
+        if normals is None:
+            self._normals = numpy.full(self._faces.shape, numpy.nan)
+        else:
+            self._normals = numpy.array(normals, dtype=float).reshape((-1, 3))
+        self._pending = []
+        self._triangle_cache = [None] * len(self._faces)
+        self.reset_cache()
+
+    @classmethod
+    def from_triangles(cls, triangles):
+        """ pack existing Triangle objects into a new mesh (identical points are shared) """
+        vertex_map = {}
+        vertices = []
+        faces = []
+        normals = []
+        for triangle in triangles:
+            face = []
+            for point in (triangle.p1, triangle.p2, triangle.p3):
+                point = tuple(point[:3])
+                if point not in vertex_map:
+                    vertex_map[point] = len(vertices)
+                    vertices.append(point)
+                face.append(vertex_map[point])
+            faces.append(face)
+            normals.append(triangle.normal[:3])
+        return cls(vertices, faces, normals)
+
+    def __len__(self):
+        return len(self._faces) + len(self._pending)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[one_index] for one_index in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index >= len(self._faces):
+            return self._pending[index - len(self._faces)]
+        triangle = self._triangle_cache[index]
+        if triangle is None:
+            triangle = self._create_triangle(index)
+            self._triangle_cache[index] = triangle
+        return triangle
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getstate__(self):
+        # transfer only the arrays (e.g. for multiprocessing)
+        self._merge_pending()
+        state = self.__dict__.copy()
+        state["_triangle_cache"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._triangle_cache = [None] * len(self._faces)
+
+    def _create_triangle(self, index):
+        p1, p2, p3 = [tuple(point) for point in self._vertices[self._faces[index]].tolist()]
+        normal = self._normals[index].tolist()
+        return Triangle(p1, p2, p3, tuple(normal) + ('v', ))
+
+    @property
+    def vertices(self):
+        self._merge_pending()
+        return self._vertices
+
+    @property
+    def faces(self):
+        self._merge_pending()
+        return self._faces
+
+    @property
+    def normals(self):
+        self._merge_pending()
+        return self._normals
+
+    def get_points(self, indices=None):
+        """ return the three points of the given triangles (each: F x 3) """
+        faces = self.faces if indices is None else self.faces[indices]
+        return (self._vertices[faces[:, 0]], self._vertices[faces[:, 1]],
+                self._vertices[faces[:, 2]])
+
+    def append(self, triangle):
+        self._pending.append(triangle)
+
+    def extend(self, triangles):
+        self._pending.extend(triangles)
+
+    def _merge_pending(self):
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        offset = len(self._vertices)
+        new_vertices = [tuple(point[:3]) for triangle in pending
+                        for point in (triangle.p1, triangle.p2, triangle.p3)]
+        self._vertices = numpy.concatenate((self._vertices,
+                                            numpy.array(new_vertices, dtype=float)))
+        new_faces = numpy.arange(offset, offset + len(new_vertices)).reshape((-1, 3))
+        self._faces = numpy.concatenate((self._faces, new_faces))
+        self._normals = numpy.concatenate((self._normals,
+                                           numpy.array([t.normal[:3] for t in pending],
+                                                       dtype=float)))
+        # keep the existing Triangle objects
+        self._triangle_cache.extend(pending)
+        self.reset_cache()
+
+    def reset_cache(self):
+        """ calculate missing normals and the bounding boxes of the triangles """
+        p1, p2, p3 = self.get_points()
+        missing = numpy.isnan(self._normals[:, 0])
+        if numpy.any(missing):
+            # see Triangle.reset_cache
+            self._normals[missing] = normalized(cross(p3[missing] - p1[missing],
+                                                      p2[missing] - p1[missing]))
+        self.minx = numpy.minimum(numpy.minimum(p1[:, 0], p2[:, 0]), p3[:, 0])
+        self.miny = numpy.minimum(numpy.minimum(p1[:, 1], p2[:, 1]), p3[:, 1])
+        self.minz = numpy.minimum(numpy.minimum(p1[:, 2], p2[:, 2]), p3[:, 2])
+        self.maxx = numpy.maximum(numpy.maximum(p1[:, 0], p2[:, 0]), p3[:, 0])
+        self.maxy = numpy.maximum(numpy.maximum(p1[:, 1], p2[:, 1]), p3[:, 1])
+        self.maxz = numpy.maximum(numpy.maximum(p1[:, 2], p2[:, 2]), p3[:, 2])
+
+    def get_bounds(self):
+        """ return the limits of the mesh: (minx, miny, minz, maxx, maxy, maxz) or None """
+        if len(self.faces) == 0:
+            return None
+        # use the referenced vertices only (the welded vertex array may contain more)
+        return (self.minx.min(), self.miny.min(), self.minz.min(),
+                self.maxx.max(), self.maxy.max(), self.maxz.max())
+
+    def copy(self):
+        return self.__class__(self.vertices, self.faces, self.normals)
+
+    def transform_by_matrix(self, matrix):
+        """ transform all vertices and normals (see ptransform_by_matrix)
+
+        Previously created Triangle objects are discarded.
+        """
+        self._merge_pending()
+        self._vertices = _transform_array(self._vertices, matrix, with_offset=True)
+        self._normals = _transform_array(self._normals, matrix, with_offset=False)
+        self._triangle_cache = [None] * len(self._faces)
+        self.reset_cache()
+
+
+def _transform_array(values, matrix, with_offset):
+    # same order of operations as "ptransform_by_matrix"
+    result = numpy.empty_like(values)
+    for axis, row in enumerate(matrix):
+        result[:, axis] = values[:, 0] * row[0] + values[:, 1] * row[1] + values[:, 2] * row[2]
+        if with_offset and (len(row) > 3):
+            result[:, axis] += row[3]
+    return result
+
+
+def weld_vertices(points, distance):
+    """ merge points that are closer than "distance" (quantized to a grid of this size)
+
+    Points within the same cell of the grid are merged into the first one of
+    them. This is an approximation of a nearest-neighbour search: very close
+    points in adjacent cells are not merged.
+
+    @param points: numpy array of points (N x 3)
+    @returns: tuple of the unique points (M x 3) and the index of the unique
+        point for each input point (N)
+    """
+    if len(points) == 0:
+        return points.reshape((0, 3)), numpy.zeros(0, dtype=numpy.intp)
+    keys = numpy.floor(points / distance + 0.5).astype(numpy.int64)
+    keys -= keys.min(axis=0)
+    spans = [int(value) + 1 for value in keys.max(axis=0)]
+    # sort-based unique of the rows
+    if spans[0] * spans[1] * spans[2] < 2 ** 62:
+        # combine the three keys into one (sorting a single column is much faster)
+        keys = (keys[:, 0] * spans[1] + keys[:, 1]) * spans[2] + keys[:, 2]
+        order = numpy.argsort(keys)
+        sorted_keys = keys[order]
+        is_new = numpy.ones(len(points), dtype=bool)
+        is_new[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    else:
+        order = numpy.lexsort((keys[:, 2], keys[:, 1], keys[:, 0]))
+        sorted_keys = keys[order]
+        is_new = numpy.ones(len(points), dtype=bool)
+        is_new[1:] = numpy.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    group_of_sorted = numpy.cumsum(is_new) - 1
+    # use the first point (in input order) of each group as its representative
+    group_starts = numpy.nonzero(is_new)[0]
+    first_index = numpy.minimum.reduceat(order, group_starts)
+    inverse = numpy.empty(len(points), dtype=numpy.intp)
+    inverse[order] = group_of_sorted
+    # keep the order of first appearance
+    appearance = numpy.argsort(first_index, kind="stable")
+    renumber = numpy.empty_like(appearance)
+    renumber[appearance] = numpy.arange(len(appearance))
+    return points[first_index[appearance]], renumber[inverse]
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+
+Vectorized counterparts of the functions in pycam.Geometry.intersection.
+
+Every function processes many collision candidates at once. Points and
+vectors are numpy arrays with one row per candidate (or a single constant
+vector, e.g. the direction). The order of arithmetic operations follows the
+scalar functions closely - thus the results are identical within floating
+point precision.
+Missing collisions are marked with NaN points and a distance of INFINITE.
+"""
+
+from pycam.Geometry import INFINITE, epsilon
+from pycam.Geometry.TriangleArrays import cross, dot, norm, normalized
+from pycam.Utils.polynomials import poly4_roots_batch
+
+try:
+    import numpy
+except ImportError:
+    # the caller is responsible for checking "TriangleArrays.numpy_enabled"
+    pass
+
+
+def _vector(value):
+    return numpy.asarray(value[:3], dtype=float)
+
+
+def _unit_direction(direction):
+    # see Plane.intersect_point: the direction needs to be a unit vector
+    length = norm(direction)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where((length != 1)[..., None], direction / length[..., None], direction)
+
+
+def _missing(valid, *values):
+    """ replace the items of all invalid rows with NaN (points) or INFINITE (distances) """
+    result = []
+    for value in values:
+        if value.ndim > valid.ndim:
+            result.append(numpy.where(valid[..., None], value, numpy.nan))
+        else:
+            result.append(numpy.where(valid, value, INFINITE))
+    return result
+
+
+def _hit(points):
+    """ rows with a valid point (intersections may be further away than INFINITE) """
+    return ~numpy.isnan(points[..., 0])
+
+
+def intersect_plane_point(plane_point, plane_normal, direction, point):
+    """ vectorized version of Plane.intersect_point """
+    direction = _unit_direction(direction)
+    denom = dot(plane_normal, direction)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        l = -(dot(plane_normal, point) - dot(plane_normal, plane_point)) / denom
+        cp = point + direction * l[..., None]
+    return _missing(denom != 0, cp, l)
+
+
+def intersect_cylinder_point(center, axis, radius, radiussq, direction, point):
+    direction = _vector(direction)
+    axis = _vector(axis)
+    # take a plane along direction and axis
+    n = normalized(cross(direction, axis))
+    # distance of the point to this plane
+    d = dot(n, point) - dot(n, center)
+    valid = _hit(n) & ~(numpy.abs(d) > radius - epsilon)
+    # ccl is on cylinder
+    with numpy.errstate(invalid="ignore"):
+        d2 = numpy.sqrt(radiussq - d * d)
+    ccl = (center + n * d[..., None]) + direction * d2[..., None]
+    # intersect point with the plane through ccl and axis
+    ccp, l = intersect_plane_point(ccl, direction, direction, point)
+    return _missing(valid & _hit(ccp), ccp, point, -l)
+
+
+def intersect_cylinder_line(center, axis, radius, radiussq, direction, edge_p1, edge_dir):
+    direction = _vector(direction)
+    axis = _vector(axis)
+    d = edge_dir
+    # take a plane throught the line and along the cylinder axis (1)
+    n = normalized(cross(d, axis))
+    # the contact line between the cylinder and this plane (1)
+    ccl = numpy.where((dot(n, direction) < 0)[..., None], center - n * radius,
+                      center + n * radius)
+    # now extrude the contact line along the direction, this is a plane (2)
+    n2 = normalized(cross(direction, axis))
+    # intersect this plane with the line, this gives us the contact point
+    cp, l = intersect_plane_point(ccl, n2, d, edge_p1)
+    # the intersection of a plane through the contact line (perpendicular to the direction)
+    # with the line through the contact point gives us the cutter contact point
+    ccp, l = intersect_plane_point(ccl, direction, direction, cp)
+    cp = ccp + direction * -l[..., None]
+    return _missing(_hit(n) & _hit(n2) & _hit(ccp), ccp, cp, -l)
+
+
+def intersect_circle_plane(center, radius, direction, triangles, indices):
+    direction = _vector(direction)
+    n = triangles.normal[indices]
+    plane_point = triangles.plane_point[indices]
+    plane_normal = triangles.plane_normal[indices]
+    # project onto z=0
+    n2 = n * (1, 1, 0)
+    flat = norm(n2) == 0
+    # horizontal planes
+    cp_flat, d_flat = intersect_plane_point(plane_point, plane_normal, direction, center)
+    ccp_flat = cp_flat - direction * d_flat[:, None]
+    # the cutter contact point is on the circle, where the surface normal is n
+    ccp = center + normalized(n2) * -radius
+    cp, d = intersect_plane_point(plane_point, plane_normal, direction, ccp)
+    ccp = numpy.where(flat[:, None], ccp_flat, ccp)
+    cp = numpy.where(flat[:, None], cp_flat, cp)
+    d = numpy.where(flat, d_flat, d)
+    valid = (dot(n, direction) != 0) & _hit(cp)
+    return _missing(valid, ccp, cp, d)
+
+
+def intersect_circle_point(center, axis, radius, radiussq, direction, point):
+    direction = _vector(direction)
+    axis = _vector(axis)
+    # take a plane through the base
+    ccp, l = intersect_plane_point(center, axis, direction, point)
+    # check if inside circle
+    diff = center - ccp
+    valid = _hit(ccp) & (dot(diff, diff) < radiussq - epsilon)
+    return _missing(valid, ccp, point, -l)
+
+
+def intersect_circle_line(center, axis, radius, radiussq, direction, edge_p1, edge_p2,
+                          edge_dir):
+    direction = _vector(direction)
+    axis = _vector(axis)
+    d = edge_dir
+    horizontal = dot(d, axis) == 0
+    # edges that are perpendicular to the axis
+    if dot(direction, axis) == 0:
+        valid_horizontal = numpy.zeros(len(d), dtype=bool)
+        ccp_h = cp_h = numpy.full((len(d), 3), numpy.nan)
+        l_h = numpy.full(len(d), INFINITE)
+    else:
+        p1, l = intersect_plane_point(center, axis, direction, edge_p1)
+        p2, l = intersect_plane_point(center, axis, direction, edge_p2)
+        # see Line.closest_point
+        v = normalized(p2 - p1)
+        zero_length = numpy.isnan(v[:, 0])
+        pc = p1 - v * (dot(p1, v) - dot(center, v))[:, None]
+        pc = numpy.where(zero_length[:, None], p1, pc)
+        diff = pc - center
+        d_sq = dot(diff, diff)
+        valid_horizontal = d_sq < radiussq
+        with numpy.errstate(invalid="ignore"):
+            a = numpy.sqrt(radiussq - d_sq)
+        d1 = dot(p1 - pc, d)
+        d2 = dot(p2 - pc, d)
+        use_p1 = numpy.abs(d1) < a - epsilon
+        use_p2 = ~use_p1 & (numpy.abs(d2) < a - epsilon)
+        use_pc = ~use_p1 & ~use_p2 & (((d1 < -a + epsilon) & (d2 > a - epsilon))
+                                      | ((d2 < -a + epsilon) & (d1 > a - epsilon)))
+        valid_horizontal &= use_p1 | use_p2 | use_pc
+        ccp_h = numpy.where(use_p1[:, None], p1, numpy.where(use_p2[:, None], p2, pc))
+        cp_h = ccp_h - direction * l[:, None]
+        l_h = -l
+    # all other edges: make a plane by sliding the line along the direction
+    n = normalized(cross(d, direction))
+    # take a plane through the base and intersect it with the line
+    lp, l = intersect_plane_point(center, axis, d, edge_p1)
+    # intersection of 2 planes: lp + \lambda v
+    v = normalized(cross(axis, n))
+    # take plane through intersection line and parallel to axis
+    n2 = normalized(cross(v, axis))
+    # distance from center to this plane
+    dist = dot(n2, center) - dot(n2, lp)
+    distsq = dist * dist
+    valid = _hit(n2) & _hit(lp) & (distsq <= radiussq - epsilon)
+    # must be on circle
+    with numpy.errstate(invalid="ignore"):
+        dist2 = numpy.sqrt(radiussq - distsq)
+    dist2 = numpy.where(dot(d, axis) < 0, -dist2, dist2)
+    ccp = center - (n2 * dist[:, None] - v * dist2[:, None])
+    cp, l = intersect_plane_point(edge_p1, cross(cross(d, direction), d), direction, ccp)
+    valid &= _hit(cp)
+    ccp = numpy.where(horizontal[:, None], ccp_h, ccp)
+    cp = numpy.where(horizontal[:, None], cp_h, cp)
+    l = numpy.where(horizontal, l_h, l)
+    valid = numpy.where(horizontal, valid_horizontal, valid)
+    return _missing(valid, ccp, cp, l)
+
+
+def intersect_sphere_plane(center, radius, direction, triangles, indices):
+    direction = _vector(direction)
+    n = triangles.normal[indices]
+    n_dir = dot(n, direction)
+    # the cutter contact point is on the sphere, where the surface normal is n
+    ccp = numpy.where((n_dir < 0)[:, None], center - n * radius, center + n * radius)
+    # intersect the plane with a line through the contact point
+    cp, d = intersect_plane_point(triangles.plane_point[indices],
+                                  triangles.plane_normal[indices], direction, ccp)
+    return _missing((n_dir != 0) & _hit(cp), ccp, cp, d)
+
+
+def intersect_sphere_point(center, radius, radiussq, direction, point):
+    direction = _vector(direction)
+    # see intersect_sphere_point: a quadratic equation in \lambda
+    p0_x0 = center - point
+    a = dot(direction, direction)
+    b = 2 * dot(p0_x0, direction)
+    c = dot(p0_x0, p0_x0) - radiussq
+    d = b * b - 4 * a * c
+    with numpy.errstate(invalid="ignore"):
+        if a < 0:
+            l = (-b + numpy.sqrt(d)) / (2 * a)
+        else:
+            l = (-b - numpy.sqrt(d)) / (2 * a)
+    # cutter contact point
+    ccp = point + direction * -l[:, None]
+    return _missing(d >= 0, ccp, point, l)
+
+
+def intersect_sphere_line(center, radius, radiussq, direction, edge_p1, edge_dir):
+    direction = _vector(direction)
+    d = edge_dir
+    # make a plane by sliding the line along the direction
+    n = normalized(cross(d, direction))
+    # calculate the distance from the sphere center to the plane
+    dist = -dot(center, n) + dot(edge_p1, n)
+    valid = _hit(n) & (numpy.abs(dist) <= radius - epsilon)
+    n2 = normalized(cross(n, d))
+    # the contact point is on a big circle through the sphere
+    with numpy.errstate(invalid="ignore"):
+        dist2 = numpy.sqrt(radiussq - dist * dist)
+    ccp = center + (n * dist[:, None] + n2 * dist2[:, None])
+    # now intersect a line through this point with the plane through the edge
+    cp, l = intersect_plane_point(edge_p1, n2, direction, ccp)
+    return _missing(valid & _hit(cp), ccp, cp, l)
+
+
+def intersect_torus_plane(center, axis, majorradius, minorradius, direction, triangles,
+                          indices):
+    direction = _vector(direction)
+    z = _vector(axis)
+    n = triangles.normal[indices]
+    # find place on torus where surface normal is n
+    b = n * -1.0
+    a = b - z * dot(z, b)[:, None]
+    a_sq = dot(a, a)
+    valid = (dot(n, direction) != 0) & (dot(n, z) != 1) & (a_sq > 0)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        a = a / numpy.sqrt(a_sq)[:, None]
+    ccp = (center + a * majorradius) + b * minorradius
+    # find intersection with plane
+    cp, l = intersect_plane_point(triangles.plane_point[indices],
+                                  triangles.plane_normal[indices], direction, ccp)
+    return _missing(valid & _hit(cp), ccp, cp, l)
+
+
+def intersect_torus_point(center, axis, majorradius, minorradius, majorradiussq, minorradiussq,
+                          direction, point):
+    direction = _vector(direction)
+    if (direction[0] == 0) and (direction[1] == 0):
+        # drop
+        minlsq = (majorradius - minorradius) ** 2
+        maxlsq = (majorradius + minorradius) ** 2
+        l_sq = (point[:, 0] - center[:, 0]) ** 2 + (point[:, 1] - center[:, 1]) ** 2
+        valid = (l_sq >= minlsq + epsilon) & (l_sq <= maxlsq - epsilon)
+        l = numpy.sqrt(l_sq)
+        z_sq = minorradiussq - (majorradius - l) ** 2
+        valid &= z_sq >= 0
+        with numpy.errstate(invalid="ignore"):
+            z = numpy.sqrt(z_sq)
+        ccp = numpy.stack((point[:, 0], point[:, 1], center[:, 2] - z), axis=1)
+        dist = ccp[:, 2] - point[:, 2]
+    elif direction[2] == 0:
+        # push
+        z = point[:, 2] - center[:, 2]
+        valid = ~(numpy.abs(z) > minorradius - epsilon)
+        with numpy.errstate(invalid="ignore"):
+            l = majorradius + numpy.sqrt(minorradiussq - z * z)
+        n = cross(_vector(axis), direction)
+        d = dot(n, point) - dot(n, center)
+        valid &= ~(numpy.abs(d) > l - epsilon)
+        with numpy.errstate(invalid="ignore"):
+            a = numpy.sqrt(l * l - d * d)
+        ccp = (center + n * d[:, None]) + direction * a[:, None]
+        ccp[:, 2] = point[:, 2]
+        dist = dot(point - ccp, direction)
+    else:
+        # general case: the smallest root of a quartic equation
+        x = point - center
+        v = direction * -1
+        x_x = dot(x, x)
+        x_v = dot(x, v)
+        x1 = x * (1, 1, 0)
+        v1 = v * (1, 1, 0)
+        x1_x1 = dot(x1, x1)
+        x1_v1 = dot(x1, v1)
+        v1_v1 = dot(v1, v1)
+        R2 = majorradiussq
+        r2 = minorradiussq
+        a = 1.0
+        b = 4 * x_v
+        c = 2 * (x_x + 2 * x_v ** 2 + (R2 - r2) - 2 * R2 * v1_v1)
+        d = 4 * (x_x * x_v + x_v * (R2 - r2) - 2 * R2 * x1_v1)
+        e = (x_x) ** 2 + 2 * x_x * (R2 - r2) + (R2 - r2) ** 2 - 4 * R2 * x1_x1
+        dist = numpy.fmin.reduce(poly4_roots_batch(a, b, c, d, e), axis=-1)
+        valid = ~numpy.isnan(dist)
+        ccp = point + direction * -dist[:, None]
+    return _missing(valid, ccp, point, dist)
@@ -19,6 +19,7 @@ You should have received a copy of the GNU General Public License
 along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import mmap
 import re
 try:
     # Python2 (load first - due to incompatible interface)
@@ -28,15 +29,28 @@ except ImportError:
     from io import BufferedReader, BytesIO, TextIOWrapper
 from struct import unpack
 
-from pycam.Geometry import epsilon
+from pycam.Geometry import epsilon, sqrt
 from pycam.Geometry.Model import Model
 from pycam.Geometry.PointKdtree import PointKdtree
 from pycam.Geometry.PointUtils import pcross, pdot, pnormalized, psub
 from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import cross, dot
+from pycam.Geometry.TriangleMesh import TriangleMesh, weld_vertices
 import pycam.Utils.log
 import pycam.Utils
 log = pycam.Utils.log.get_logger()
 
+try:
+    import numpy
+    # the binary format is decoded at once (see "_import_binary_mesh")
+    numpy_enabled = True
+    BINARY_FACET_DTYPE = numpy.dtype([("normal", "<f4", (3, )), ("vertices", "<f4", (3, 3)),
+                                      ("attributes", "<u2")])
+    # number of facets to be decoded at once
+    BINARY_CHUNK_SIZE = 2 ** 20
+except ImportError:
+    numpy_enabled = False
+
 
 vertices = 0
 edges = 0
@@ -70,8 +84,17 @@ def get_facet_count_if_binary_format(source):
     available for remote sources (e.g. via http). Thus we stick to the simple check.
     """
     # read data (without consuming it)
-    raw_header_data = source.peek(400)
+    return _get_facet_count_from_header(source.peek(400))
+
+
+def _get_facet_count_from_header(raw_header_data, data_length=None):
+    if len(raw_header_data) < 84:
+        # too short for the binary format
+        return None
     facet_count = unpack("<I", raw_header_data[80:84])[0]
+    if (data_length is not None) and (data_length == 84 + 50 * facet_count):
+        # the length of the data matches the binary format exactly
+        return facet_count
     try:
         header_data = raw_header_data.decode("utf-8")
     except UnicodeDecodeError:
@@ -84,7 +107,15 @@ def get_facet_count_if_binary_format(source):
         return facet_count
 
 
-def ImportModel(filename, use_kdtree=True, callback=None, **kwargs):
+def ImportModel(filename, use_kdtree=True, callback=None, memory_map=True, bounds=None,
+                **kwargs):
+    """ import a binary or text STL file
+
+    @param memory_map: map local binary files into memory instead of reading
+        them (this requires numpy)
+    @param bounds: optional Box3D - all triangles outside of these bounds are
+        skipped (only used for memory mapped files)
+    """
     global vertices, edges, kdtree
     vertices = 0
     edges = 0
@@ -92,6 +123,23 @@ def ImportModel(filename, use_kdtree=True, callback=None, **kwargs):
 
     normal_conflict_warning_seen = False
 
+    if memory_map and numpy_enabled and not hasattr(filename, "read"):
+        uri = pycam.Utils.URIHandler(filename)
+        if uri.is_local():
+            mapping, facet_count = _get_binary_memory_map(uri.get_local_path())
+            if mapping is not None:
+                try:
+                    return _import_binary_mesh(mapping, facet_count, filename,
+                                               use_kdtree=use_kdtree, callback=callback,
+                                               bounds=bounds)
+                finally:
+                    try:
+                        mapping.close()
+                    except BufferError:
+                        # the mapping is released as soon as the last array referring
+                        # to it is gone (e.g. in a traceback)
+                        pass
+
     if hasattr(filename, "read"):
         # make sure that the input stream can seek and has ".len"
         f = BufferedReader(filename)
@@ -112,6 +160,10 @@ def ImportModel(filename, use_kdtree=True, callback=None, **kwargs):
     facet_count = get_facet_count_if_binary_format(f)
     is_binary = (facet_count is not None)
 
+    if is_binary and numpy_enabled:
+        return _import_binary_mesh(f.read(), facet_count, filename, use_kdtree=use_kdtree,
+                                   callback=callback)
+
     if use_kdtree:
         kdtree = PointKdtree([], 3, 1, epsilon)
     model = Model(use_kdtree)
@@ -122,6 +174,8 @@ def ImportModel(filename, use_kdtree=True, callback=None, **kwargs):
     p3 = None
 
     if is_binary:
+        # skip the header (80 bytes) and the facet count
+        f.read(84)
         for i in range(1, facet_count + 1):
             if callback and callback():
                 log.warn("STLImporter: load model operation cancelled")
@@ -291,3 +345,124 @@ def ImportModel(filename, use_kdtree=True, callback=None, **kwargs):
         return None
     else:
         return model
+
+
+def _get_binary_memory_map(path):
+    """ map a local binary STL file into memory
+
+    @returns: tuple of the read-only mapping and the number of facets or
+        (None, None) for text files (or if the file cannot be mapped)
+    """
+    try:
+        with open(path, "rb") as in_file:
+            # the mapping keeps its own reference to the file
+            mapping = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, ValueError) as err_msg:
+        # e.g. empty files cannot be mapped
+        log.debug("STLImporter: Failed to map file '%s' into memory: %s", path, err_msg)
+        return None, None
+    facet_count = _get_facet_count_from_header(mapping[:400], data_length=len(mapping))
+    if facet_count is None:
+        mapping.close()
+        return None, None
+    if hasattr(mapping, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        # the facets are decoded in a single pass
+        mapping.madvise(mmap.MADV_SEQUENTIAL)
+    return mapping, facet_count
+
+
+def _decode_binary_facets(data, facet_count, bounds=None, callback=None):
+    """ decode the points and normals of the facets in chunks
+
+    Only the facets overlapping the given bounds (Box3D) are kept. Thus only
+    one chunk of the data (e.g. a memory mapped file) needs to be held in
+    memory at once.
+
+    @returns: tuple of points (3 * F x 3) and normals (F x 3) or None (cancelled)
+    """
+    # the chunks are copied into the final arrays - thus no intermediate copies are kept
+    all_points = numpy.empty((facet_count, 3, 3))
+    all_normals = numpy.empty((facet_count, 3))
+    filled = 0
+    for start in range(0, facet_count, BINARY_CHUNK_SIZE):
+        count = min(BINARY_CHUNK_SIZE, facet_count - start)
+        facets = numpy.frombuffer(data, dtype=BINARY_FACET_DTYPE, count=count,
+                                  offset=84 + BINARY_FACET_DTYPE.itemsize * start)
+        points = facets["vertices"]
+        normals = facets["normal"]
+        if bounds is not None:
+            low, high = bounds
+            inside = numpy.ones(count, dtype=bool)
+            for axis in range(3):
+                inside &= ((points[:, :, axis].max(axis=1) >= low[axis])
+                           & (points[:, :, axis].min(axis=1) <= high[axis]))
+            points = points[inside]
+            normals = normals[inside]
+        all_points[filled:filled + len(points)] = points
+        all_normals[filled:filled + len(normals)] = normals
+        filled += len(points)
+        # release the references to the data
+        del facets, points, normals
+        if callback and callback():
+            return None
+    if filled < facet_count:
+        # shrink the arrays (in place) to the facets within the bounds
+        all_points.resize((filled, 3, 3))
+        all_normals.resize((filled, 3))
+    return all_points.reshape((-1, 3)), all_normals
+
+
+def _import_binary_mesh(data, facet_count, filename, use_kdtree=True, callback=None,
+                        bounds=None):
+    """ decode the facets of a binary STL file at once and create a mesh-based model
+
+    The result is equivalent to the facet-by-facet import: vertices are welded
+    (with the tolerance of the PointKdtree) and the orientation of every
+    triangle is checked against the normal given in the file.
+    The normals of the triangles are calculated from their vertices.
+
+    @param data: content of the file (any object supporting the buffer protocol)
+    @param bounds: optional Box3D - triangles outside of these bounds are skipped
+    """
+    if len(data) < 84 + 50 * facet_count:
+        log.error("STLImporter: The file '%s' is too short for %d facets", filename,
+                  facet_count)
+        return None
+    decoded = _decode_binary_facets(data, facet_count, bounds=bounds, callback=callback)
+    if decoded is None:
+        log.warn("STLImporter: load model operation cancelled")
+        return None
+    points, normals = decoded
+    if use_kdtree:
+        # PointKdtree compares the squared distance with the tolerance
+        vertices, faces = weld_vertices(points, sqrt(epsilon))
+        faces = faces.reshape((-1, 3))
+    else:
+        vertices = points
+        faces = numpy.arange(len(points)).reshape((-1, 3))
+    if callback and callback():
+        log.warn("STLImporter: load model operation cancelled")
+        return None
+    p1, p2, p3 = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+    vertex_cross = cross(p2 - p1, p3 - p1)
+    without_normal = numpy.all(normals == 0, axis=1)
+    dotcross = numpy.where(without_normal, vertex_cross[:, 2], dot(normals, vertex_cross))
+    conflicts = numpy.nonzero((dotcross < 0) & ~without_normal)[0]
+    if len(conflicts) > 0:
+        log.warn("Inconsistent normal/vertices found in facet definition %d of '%s'. Please "
+                 "validate the STL file!", conflicts[0] + 1, filename)
+    invalid_count = numpy.count_nonzero(dotcross == 0)
+    if invalid_count > 0:
+        # the three points are in a line - or two points are identical
+        log.warn("Skipping %d invalid triangles (maybe the resolution of the model is too "
+                 "high?)", invalid_count)
+    # Triangle expects the vertices in clockwise order
+    clockwise = dotcross > 0
+    faces[clockwise] = faces[clockwise][:, (0, 2, 1)]
+    faces = faces[dotcross != 0]
+    log.info("Imported STL model: %d vertices, %d edges, %d triangles",
+             len(vertices), 0, len(faces))
+    if len(faces) == 0:
+        # no valid items added to the model
+        return None
+    return Model(use_kdtree, mesh=TriangleMesh(vertices, faces))
@@ -27,9 +27,10 @@ from pycam.Geometry import ceil, epsilon, sqrt
 from pycam.Geometry.Line import Line
 from pycam.Geometry.Plane import Plane
 from pycam.Geometry.PointUtils import padd, pcross, pdot, pmul, pnorm, pnormalized, psub
+import pycam.Geometry.TriangleArrays
 from pycam.PathGenerators import get_free_paths_triangles
 from pycam.Utils import ProgressCounter
-from pycam.Utils.threading import run_in_parallel
+from pycam.Utils.threading import get_number_of_processes, run_in_parallel
 import pycam.Utils.log
 
 _DEBUG_DISABLE_COLLISION_CHECK = False
@@ -40,25 +41,24 @@ _DEBUG_DISBALE_WATERLINE_SHIFT = False
 log = pycam.Utils.log.get_logger()
 
 
-# We need to use a global function here - otherwise it does not work with
-# the multiprocessing Pool.
-def _process_one_triangle(extra_args):
-    model, cutter, up_vector, triangle, z = extra_args
+def _process_one_triangle(model, cutter, up_vector, triangle, z, batch):
+    """ return the waterline collisions of a triangle and a flag for triangles to be skipped """
     result = []
     # ignore triangles below the z level
     if triangle.maxz < z:
         # Case 1a
-        return result, None
+        return result, False
     # ignore triangles pointing upwards or downwards
     if pnorm(pcross(triangle.normal, up_vector)) == 0:
         # Case 1b
-        return result, None
-    edge_collisions = get_collision_waterline_of_triangle(model, cutter, up_vector, triangle, z)
+        return result, False
+    edge_collisions = get_collision_waterline_of_triangle(model, cutter, up_vector, triangle, z,
+                                                          batch=batch)
     if edge_collisions is None:
         # don't try to use this edge again
-        return result, [id(triangle)]
+        return result, True
     elif len(edge_collisions) == 0:
-        return result, None
+        return result, False
     else:
         for cutter_location, edge in edge_collisions:
             shifted_edge = get_shifted_waterline(up_vector, edge, cutter_location)
@@ -67,7 +67,63 @@ def _process_one_triangle(extra_args):
                     result.append((edge, edge))
                 else:
                     result.append((edge, shifted_edge))
-        return result, None
+        return result, False
+
+
+# We need to use a global function here - otherwise it does not work with
+# the multiprocessing Pool.
+def _process_one_tile(extra_args):
+    """ return the waterline collisions of the triangles of a tile for all layers
+
+    The triangles are given by their position within the triangles of the
+    model. The model (and the cutter) is transferred only once to each worker
+    (see run_in_parallel). The layers are processed in the given order.
+    Triangles that need no further evaluation in one layer are skipped in the
+    following layers.
+    The collisions of each layer are returned together with the position of
+    their triangle.
+    """
+    model, cutter, up_vector, triangle_ids, z_steps, batch = extra_args
+    all_triangles = model.triangles()
+    triangles = [all_triangles[index] for index in triangle_ids]
+    rejected = set()
+    result = []
+    for z in z_steps:
+        layer_result = []
+        for triangle_id, triangle in zip(triangle_ids, triangles):
+            if triangle_id in rejected:
+                continue
+            collisions, is_rejected = _process_one_triangle(model, cutter, up_vector, triangle,
+                                                            z, batch)
+            if is_rejected:
+                rejected.add(triangle_id)
+            if collisions:
+                layer_result.append((triangle_id, collisions))
+        result.append(layer_result)
+    return result
+
+
+def _get_tiles(model, minx, maxx, miny, maxy, num_of_tiles):
+    """ distribute the triangles within the given area to tiles of the xy plane
+
+    Each triangle belongs to the tile containing the center of its bounding box.
+    The result is a list of tiles (the positions of their triangles within
+    the triangles of the model). Empty tiles are omitted.
+    """
+    columns = max(1, int(ceil(sqrt(num_of_tiles))))
+    rows = max(1, int(ceil(num_of_tiles / float(columns))))
+    width = (maxx - minx) / columns
+    height = (maxy - miny) / rows
+    tiles = [[] for _ in range(columns * rows)]
+    for index, t in enumerate(model.triangles()):
+        if (t.minx > maxx) or (t.maxx < minx) or (t.miny > maxy) or (t.maxy < miny):
+            continue
+        column = int(((t.minx + t.maxx) / 2 - minx) / width) if width > 0 else 0
+        row = int(((t.miny + t.maxy) / 2 - miny) / height) if height > 0 else 0
+        column = min(columns - 1, max(0, column))
+        row = min(rows - 1, max(0, row))
+        tiles[row * columns + column].append(index)
+    return [tile for tile in tiles if tile]
 
 
 class CollisionPaths(object):
@@ -107,7 +163,7 @@ class CollisionPaths(object):
     def _get_groups(self):
         if len(self.waterlines) == 0:
             return []
-        queue = range(len(self.waterlines))
+        queue = list(range(len(self.waterlines)))
         current_group = [0]
         queue.pop(0)
         groups = [current_group]
@@ -191,18 +247,19 @@ class CollisionPaths(object):
 
 class ContourFollow(object):
 
-    def __init__(self, path_processor):
+    def __init__(self, path_processor, batch=False):
+        """
+        @param batch: use the vectorized collision functions (requires numpy)
+        """
         self.pa = path_processor
+        self.batch = batch and pycam.Geometry.TriangleArrays.numpy_enabled
         self._up_vector = (0, 0, 1, 'v')
-        self._processed_triangles = []
 
     def _get_free_paths(self, cutter, models, p1, p2):
-        return get_free_paths_triangles(models, cutter, p1, p2)
+        return get_free_paths_triangles(models, cutter, p1, p2, batch=self.batch)
 
     def GenerateToolPath(self, cutter, models, minx, maxx, miny, maxy, minz, maxz, dz,
                          draw_callback=None):
-        # reset the list of processed triangles
-        self._processed_triangles = []
         # calculate the number of steps
         # Sometimes there is a floating point accuracy issue: make sure
         # that only one layer is drawn, if maxz and minz are almost the same.
@@ -215,15 +272,18 @@ class ContourFollow(object):
 
         # only the first model is used for the contour-follow algorithm
         # TODO: should we combine all models?
-        num_of_triangles = len(models[0].triangles(minx=minx, miny=miny, maxx=maxx, maxy=maxy))
+        model = models[0]
+        tiles = self._get_tiles(model, minx, maxx, miny, maxy)
+        num_of_triangles = sum(len(tile) for tile in tiles)
         progress_counter = ProgressCounter(2 * num_of_layers * num_of_triangles, draw_callback)
 
         current_layer = 0
 
         z_steps = [(maxz - i * z_step) for i in range(num_of_layers)]
 
-        # collision handling function
-        for z in z_steps:
+        # the collisions of all layers are calculated at once
+        layers = self._get_collision_paths(cutter, model, tiles, z_steps, progress_counter)
+        for z, waterline_triangles in zip(z_steps, layers):
             # update the progress bar and check, if we should cancel the process
             if draw_callback:
                 if draw_callback(text=("ContourFollow: processing layer %d/%d"
@@ -231,8 +291,10 @@ class ContourFollow(object):
                     # cancel immediately
                     break
             self.pa.new_direction(0)
-            self.GenerateToolPathSlice(cutter, models[0], minx, maxx, miny, maxy, z, draw_callback,
-                                       progress_counter, num_of_triangles)
+            shifted_lines = self._get_cropped_lines(waterline_triangles, minx, maxx, miny, maxy,
+                                                    z)
+            self._add_contour_lines(cutter, model, shifted_lines, draw_callback,
+                                    progress_counter, num_of_triangles)
             self.pa.end_direction()
             self.pa.finish()
             current_layer += 1
@@ -242,6 +304,11 @@ class ContourFollow(object):
                               progress_counter=None, num_of_triangles=None):
         shifted_lines = self.get_potential_contour_lines(cutter, model, minx, maxx, miny, maxy, z,
                                                          progress_counter=progress_counter)
+        return self._add_contour_lines(cutter, model, shifted_lines, draw_callback,
+                                       progress_counter, num_of_triangles)
+
+    def _add_contour_lines(self, cutter, model, shifted_lines, draw_callback=None,
+                           progress_counter=None, num_of_triangles=None):
         if num_of_triangles is None:
             num_of_triangles = len(shifted_lines)
         last_position = None
@@ -250,7 +317,7 @@ class ContourFollow(object):
             if _DEBUG_DISABLE_COLLISION_CHECK:
                 points = (line.p1, line.p2)
             else:
-                points = self._get_free_paths(line.p1, line.p2)
+                points = self._get_free_paths(cutter, [model], line.p1, line.p2)
             if points:
                 if (last_position is not None) and (last_position != points[0]):
                     self.pa.end_scanline()
@@ -272,24 +339,40 @@ class ContourFollow(object):
         self.pa.end_scanline()
         return self.pa.paths
 
-    def get_potential_contour_lines(self, cutter, model, minx, maxx, miny, maxy, z,
-                                    progress_counter=None):
-        # use only the first model for the contour
-        follow_model = model
-        waterline_triangles = CollisionPaths()
-        triangles = follow_model.triangles(minx=minx, miny=miny, maxx=maxx, maxy=maxy)
-        args = [(follow_model, cutter, self._up_vector, t, z)
-                for t in triangles if id(t) not in self._processed_triangles]
-        results_iter = run_in_parallel(_process_one_triangle, args, unordered=True,
-                                       callback=progress_counter.update)
-        for result, ignore_triangle_id_list in results_iter:
-            if ignore_triangle_id_list:
-                self._processed_triangles.extend(ignore_triangle_id_list)
-            for edge, shifted_edge in result:
-                waterline_triangles.add(edge, shifted_edge)
-            if (progress_counter is not None) and (progress_counter.increment()):
+    def _get_tiles(self, model, minx, maxx, miny, maxy):
+        # a few tiles per process balance the load of the workers
+        return _get_tiles(model, minx, maxx, miny, maxy, 4 * get_number_of_processes())
+
+    def _get_collision_paths(self, cutter, model, tiles, z_steps, progress_counter=None):
+        """ return the waterline collisions (CollisionPaths) for each layer """
+        layer_collisions = [[] for z in z_steps]
+        args = [(model, cutter, self._up_vector, tile, z_steps, self.batch) for tile in tiles]
+        if progress_counter is None:
+            callback = None
+        else:
+            callback = progress_counter.update
+        # the order of the tiles is kept - thus the result does not depend on the workers
+        results_iter = run_in_parallel(_process_one_tile, args, callback=callback)
+        for tile, tile_result in zip(tiles, results_iter):
+            for collisions, layer_result in zip(layer_collisions, tile_result):
+                collisions.extend(layer_result)
+            if (progress_counter is not None) \
+                    and progress_counter.increment(len(tile) * len(z_steps)):
                 # quit requested
                 break
+        layers = []
+        for collisions in layer_collisions:
+            # The grouping of the waterlines depends on their order: keep the
+            # order of the triangles in the model (independent of the tiles).
+            collisions.sort(key=lambda item: item[0])
+            waterline_triangles = CollisionPaths()
+            for triangle_id, triangle_collisions in collisions:
+                for edge, shifted_edge in triangle_collisions:
+                    waterline_triangles.add(edge, shifted_edge)
+            layers.append(waterline_triangles)
+        return layers
+
+    def _get_cropped_lines(self, waterline_triangles, minx, maxx, miny, maxy, z):
         if not _DEBUG_DISABLE_EXTEND_LINES:
             waterline_triangles.extend_shifted_lines()
         result = []
@@ -299,8 +382,15 @@ class ContourFollow(object):
                 result.append(cropped_line)
         return result
 
+    def get_potential_contour_lines(self, cutter, model, minx, maxx, miny, maxy, z,
+                                    progress_counter=None):
+        tiles = self._get_tiles(model, minx, maxx, miny, maxy)
+        waterline_triangles = self._get_collision_paths(cutter, model, tiles, [z],
+                                                        progress_counter=progress_counter)[0]
+        return self._get_cropped_lines(waterline_triangles, minx, maxx, miny, maxy, z)
+
 
-def get_collision_waterline_of_triangle(model, cutter, up_vector, triangle, z):
+def get_collision_waterline_of_triangle(model, cutter, up_vector, triangle, z, batch=False):
     # TODO: there are problems with "material allowance > 0"
     plane = Plane((0, 0, z), up_vector)
     if triangle.minz >= z:
@@ -449,7 +539,7 @@ def get_collision_waterline_of_triangle(model, cutter, up_vector, triangle, z):
             # We need to use the triangle collision algorithm here - because we
             # need the point of collision in the triangle.
             collisions = get_free_paths_triangles([model], cutter, start, padd(start, direction),
-                                                  return_triangles=True)
+                                                  return_triangles=True, batch=batch)
             for index, coll in enumerate(collisions):
                 if ((index % 2 == 0) and (coll[1] is not None)
                         and (coll[2] is not None)
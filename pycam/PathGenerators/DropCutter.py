@@ -19,8 +19,14 @@ You should have received a copy of the GNU General Public License
 along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import enum
+
+from pycam.Geometry import epsilon
+import pycam.Geometry.HeightField
 import pycam.Geometry.Model
-from pycam.PathGenerators import get_max_height_dynamic
+import pycam.Geometry.TriangleArrays
+from pycam.PathGenerators import get_max_height_adaptive, get_max_height_batch, \
+        get_max_height_dynamic
 from pycam.Toolpath.Steps import MoveStraight, MoveSafety
 from pycam.Utils import ProgressCounter
 from pycam.Utils.threading import run_in_parallel
@@ -29,6 +35,22 @@ import pycam.Utils.log
 log = pycam.Utils.log.get_logger()
 
 
+class DropCutterEngine(enum.Enum):
+    # calculate the collisions for each position and each triangle separately
+    TRIANGLES = "triangles"
+    # calculate the collisions for many positions at once (requires numpy)
+    BATCH = "batch"
+    # sample a pre-calculated grid of cutter locations (requires numpy)
+    HEIGHTFIELD = "heightfield"
+
+
+# default resolution of the height field: fraction of the cutter radius
+HEIGHTFIELD_RESOLUTION_FACTOR = 0.1
+# number of positions to be compared with the exact result of the height field engine (a spot
+# check - see "DropCutter._check_deviation")
+HEIGHTFIELD_CHECKED_POSITIONS = 200
+
+
 # We need to use a global function here - otherwise it does not work with
 # the multiprocessing Pool.
 def _process_one_grid_line(extra_args):
@@ -36,17 +58,49 @@ def _process_one_grid_line(extra_args):
     Otherwise the dynamic over-sampling (in get_max_height_dynamic) is
     pointless.
     """
-    positions, minz, maxz, model, cutter = extra_args
-    return get_max_height_dynamic(model, cutter, positions, minz, maxz)
+    positions, minz, maxz, model, cutter, batch, tolerance = extra_args
+    if tolerance:
+        return get_max_height_adaptive(model, cutter, positions, minz, maxz, tolerance,
+                                       batch=batch)
+    else:
+        return get_max_height_dynamic(model, cutter, positions, minz, maxz, batch=batch)
 
 
 class DropCutter(object):
 
+    def __init__(self, engine=DropCutterEngine.TRIANGLES, resolution=None, tolerance=None):
+        """
+        @param resolution: grid size of the height field engine (default: a tenth of the
+            cutter radius)
+        @param tolerance: maximum chordal error of the adaptive resampling of the grid lines
+            (see "get_max_height_adaptive") - the fixed flatness criterion of
+            "get_max_height_dynamic" is used by default
+        """
+        if ((engine in (DropCutterEngine.BATCH, DropCutterEngine.HEIGHTFIELD))
+                and not pycam.Geometry.TriangleArrays.numpy_enabled):
+            log.warn("DropCutter: the %s engine requires the 'numpy' module - falling back "
+                     "to the per-triangle calculation", engine.value)
+            engine = DropCutterEngine.TRIANGLES
+        self.engine = engine
+        self.resolution = resolution
+        self.tolerance = tolerance
+        # the maximum deviation of the height field engine (see "_check_deviation")
+        self.max_deviation = None
+
     def GenerateToolPath(self, cutter, models, motion_grid, minz=None, maxz=None,
                          draw_callback=None):
         path = []
         quit_requested = False
         model = pycam.Geometry.Model.get_combined_model(models)
+        batch = (self.engine == DropCutterEngine.BATCH)
+        use_heightfield = (self.engine == DropCutterEngine.HEIGHTFIELD) and (model is not None)
+        if batch and (model is not None):
+            # pack the triangles once - the result is transferred to the workers with the model
+            if isinstance(model, pycam.Geometry.Model.CompositeModel):
+                for one_model in model.models:
+                    one_model.get_triangle_arrays()
+            else:
+                model.get_triangle_arrays()
 
         # Transfer the grid (a generator) into a list of lists and count the
         # items.
@@ -60,13 +114,22 @@ class DropCutter(object):
         progress_counter = ProgressCounter(len(lines), draw_callback)
         current_line = 0
 
-        args = []
-        for one_grid_line in lines:
-            # simplify the data (useful for remote processing)
-            xy_coords = [(pos[0], pos[1]) for pos in one_grid_line]
-            args.append((xy_coords, minz, maxz, model, cutter))
-        for points in run_in_parallel(_process_one_grid_line, args,
-                                      callback=progress_counter.update):
+        if use_heightfield:
+            lines = [[(pos[0], pos[1]) for pos in one_grid_line] for one_grid_line in lines]
+            line_results = self._get_heightfield_lines(model, cutter, lines, minz, maxz,
+                                                       callback=draw_callback)
+            if line_results is None:
+                # cancel requested
+                return path
+        else:
+            args = []
+            for one_grid_line in lines:
+                # simplify the data (useful for remote processing)
+                xy_coords = [(pos[0], pos[1]) for pos in one_grid_line]
+                args.append((xy_coords, minz, maxz, model, cutter, batch, self.tolerance))
+            line_results = run_in_parallel(_process_one_grid_line, args,
+                                           callback=progress_counter.update)
+        for points in line_results:
             if draw_callback and draw_callback(
                     text="DropCutter: processing line %d/%d" % (current_line + 1, num_of_lines)):
                 # cancel requested
@@ -90,3 +153,77 @@ class DropCutter(object):
             if quit_requested:
                 break
         return path
+
+    def _get_heightfield_lines(self, model, cutter, lines, minz, maxz, callback=None):
+        """ sample the cutter locations of all lines from a height field of the model
+
+        The resolution is coarsened automatically, if the height field would
+        exceed its size limit (see HeightField.MAX_NODES).
+        @param callback: receives the progress of the calculation of the height field - it
+            is aborted (returning None), if the callback returns True
+        The result is a list of point lists (see "get_max_height_batch").
+        """
+        resolution = self.resolution or (cutter.distance_radius * HEIGHTFIELD_RESOLUTION_FACTOR)
+        positions = [position for line in lines for position in line]
+        if not positions:
+            return lines
+        xs = [position[0] for position in positions]
+        ys = [position[1] for position in positions]
+        radius = cutter.distance_radius
+        minx, maxx = min(xs) - radius, max(xs) + radius
+        miny, maxy = min(ys) - radius, max(ys) + radius
+        min_resolution = pycam.Geometry.HeightField.get_minimum_resolution(maxx - minx,
+                                                                           maxy - miny)
+        if resolution < min_resolution:
+            log.warn("DropCutter: the resolution of the height field is too fine for the size "
+                     "of the model (%g) - using %g instead", resolution, min_resolution)
+            resolution = min_resolution
+        field = pycam.Geometry.HeightField.HeightField(minx, maxx, miny, maxy, resolution)
+        if callback:
+            # rasterizing the model and calculating the cutter locations take similar time
+            get_step_callback = lambda text, offset: (lambda percent: callback(
+                text="DropCutter: %s" % text, percent=offset + percent / 2))
+            raster_callback = get_step_callback("rasterizing the model", 0)
+            dilation_callback = get_step_callback("calculating the height field", 50)
+        else:
+            raster_callback = dilation_callback = None
+        if not field.add_model(model, callback=raster_callback):
+            return None
+        locations = field.get_cutter_locations(cutter, callback=dilation_callback)
+        if locations is None:
+            return None
+        heights = locations.get_heights(xs, ys, minz).tolist()
+        points = []
+        for (x, y), height in zip(positions, heights):
+            # see "get_max_height_triangles"
+            if height > maxz + epsilon:
+                points.append(None)
+            else:
+                points.append((x, y, max(height, minz)))
+        self._check_deviation(model, cutter, points, minz, maxz)
+        result = []
+        start = 0
+        for line in lines:
+            result.append(points[start:start + len(line)])
+            start += len(line)
+        return result
+
+    def _check_deviation(self, model, cutter, points, minz, maxz):
+        """ compare the cutter locations with the exact result for some positions
+
+        This is only a spot check of evenly distributed positions (see
+        HEIGHTFIELD_CHECKED_POSITIONS) - checking all positions would take as
+        long as the exact calculation. The cutter locations are never too
+        low by construction (see HeightField.get_cutter_locations), but the
+        deviation of the other positions may exceed the reported value.
+        The maximum deviation of the checked positions is stored in
+        "max_deviation" and reported.
+        """
+        step = max(1, len(points) // HEIGHTFIELD_CHECKED_POSITIONS)
+        checked = [point for point in points[::step] if point is not None]
+        exact = get_max_height_batch(model, cutter, [point[:2] for point in checked], minz, maxz)
+        deviations = [abs(point[2] - exact_point[2])
+                      for point, exact_point in zip(checked, exact) if exact_point is not None]
+        self.max_deviation = max(deviations) if deviations else 0
+        log.info("DropCutter: maximum deviation of the height field: %f (spot check of %d "
+                 "positions)", self.max_deviation, len(deviations))
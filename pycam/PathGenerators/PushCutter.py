@@ -19,6 +19,10 @@ You should have received a copy of the GNU General Public License
 along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import enum
+
+import pycam.Geometry.Model
+import pycam.Geometry.TriangleArrays
 from pycam.PathGenerators import get_free_paths_triangles
 import pycam.PathProcessors.ContourCutter
 from pycam.Utils.threading import run_in_parallel
@@ -30,19 +34,52 @@ from pycam.Toolpath.Steps import MoveStraight, MoveSafety
 log = pycam.Utils.log.get_logger()
 
 
+class PushCutterEngine(enum.Enum):
+    # calculate the collisions for each triangle separately
+    TRIANGLES = "triangles"
+    # calculate the collisions with many triangles at once (requires numpy)
+    BATCH = "batch"
+
+
 # We need to use a global function here - otherwise it does not work with
 # the multiprocessing Pool.
 def _process_one_line(extra_args):
-    p1, p2, models, cutter = extra_args
-    points = get_free_paths_triangles(models, cutter, p1, p2)
+    p1, p2, models, cutter, batch = extra_args
+    points = get_free_paths_triangles(models, cutter, p1, p2, batch=batch)
     return points
 
 
+def _process_one_waterline_layer(extra_args):
+    """ return the waterline paths (lists of points) of one layer """
+    layer_grid, models, cutter, batch = extra_args
+    path_processor = pycam.PathProcessors.ContourCutter.ContourCutter()
+    path_processor.new_direction(0)
+    for p1, p2 in layer_grid:
+        points = get_free_paths_triangles(models, cutter, p1, p2, batch=batch)
+        if points:
+            path_processor.new_scanline()
+            for point in points:
+                path_processor.append(point)
+            path_processor.end_scanline()
+    path_processor.end_direction()
+    path_processor.finish()
+    # plain tuples can be transferred from the worker processes
+    return [[tuple(point) for point in path.points] for path in path_processor.paths]
+
+
 class PushCutter(object):
 
-    def __init__(self, waterlines=False):
+    def __init__(self, waterlines=False, batch=False):
+        """
+        @param batch: use the vectorized collision functions (requires numpy)
+        """
         log.debug("Starting PushCutter")
         self.waterlines = waterlines
+        if batch and not pycam.Geometry.TriangleArrays.numpy_enabled:
+            log.warn("PushCutter: the vectorized collision functions require the 'numpy' "
+                     "module - falling back to the per-triangle calculation")
+            batch = False
+        self.batch = batch
 
     def GenerateToolPath(self, cutter, models, motion_grid, minz=None, maxz=None,
                          draw_callback=None):
@@ -59,94 +96,96 @@ class PushCutter(object):
 
         num_of_layers = len(grid)
 
+        if self.batch:
+            # pack the triangles once - the result is transferred to the workers with the models
+            for model in models:
+                if isinstance(model, pycam.Geometry.Model.CompositeModel):
+                    for one_model in model.models:
+                        one_model.get_triangle_arrays()
+                elif model is not None:
+                    model.get_triangle_arrays()
+
         progress_counter = ProgressCounter(num_of_grid_positions, draw_callback)
 
-        current_layer = 0
         if self.waterlines:
-            self.pa = pycam.PathProcessors.ContourCutter.ContourCutter()
-        else:
-            path = []
+            return self._generate_waterlines(cutter, models, grid, draw_callback,
+                                             progress_counter)
+
+        current_layer = 0
+        path = []
         for layer_grid in grid:
             # update the progress bar and check, if we should cancel the process
             if draw_callback and draw_callback(text=("PushCutter: processing layer %d/%d"
                                                      % (current_layer + 1, num_of_layers))):
                 # cancel immediately
                 break
-
-            if self.waterlines:
-                self.pa.new_direction(0)
             result = self.GenerateToolPathSlice(cutter, models, layer_grid, draw_callback,
                                                 progress_counter)
-            if self.waterlines:
-                self.pa.end_direction()
-                self.pa.finish()
-            else:
-                path.extend(result)
-
+            path.extend(result)
             current_layer += 1
+        return path
 
-        if self.waterlines:
-            # TODO: this is complicated and hacky :(
-            # we don't use parallelism (for the sake of simplicity)
-            result = []
-            # turn the waterline points into cutting segments
-            for path in self.pa.paths:
-                pairs = []
-                for index in range(len(path.points) - 1):
-                    pairs.append((path.points[index], path.points[index + 1]))
-                if len(models) > 1:
-                    # We assume that the first model is used for the waterline and all
-                    # other models are obstacles (e.g. a support grid).
-                    other_models = models[1:]
-                    for p1, p2 in pairs:
-                        free_points = get_free_paths_triangles(other_models, cutter, p1, p2)
-                        for index in range(len(free_points) // 2):
-                            result.append(MoveStraight(free_points[2 * index]))
-                            result.append(MoveStraight(free_points[2 * index + 1]))
-                            result.append(MoveSafety())
-                else:
-                    for p1, p2 in pairs:
-                        result.append(MoveStraight(p1))
-                        result.append(MoveStraight(p2))
-                        result.append(MoveSafety())
-            return result
+    def _generate_waterlines(self, cutter, models, grid, draw_callback, progress_counter):
+        num_of_layers = len(grid)
+        # Every layer is processed independently with its own path processor.
+        # The ContourCutter path processor does not work with combined models.
+        args = [(layer_grid, models[:1], cutter, self.batch) for layer_grid in grid]
+        paths = []
+        for current_layer, layer_paths in enumerate(run_in_parallel(
+                _process_one_waterline_layer, args, callback=progress_counter.update)):
+            paths.extend(layer_paths)
+            if layer_paths and draw_callback:
+                draw_callback(tool_position=layer_paths[-1][-1])
+            # update the progress bar and check, if we should cancel the process
+            if draw_callback and draw_callback(text=("PushCutter: processing layer %d/%d"
+                                                     % (current_layer + 1, num_of_layers))):
+                # cancel immediately
+                break
+            if progress_counter.increment(len(grid[current_layer])):
+                break
+        # upper layers first (stable - see BasePathProcessor.sort_layered)
+        paths.sort(key=lambda points: -points[0][2])
+        # turn the waterline points into cutting segments
+        pairs = []
+        for points in paths:
+            for index in range(len(points) - 1):
+                pairs.append((points[index], points[index + 1]))
+        result = []
+        if len(models) > 1:
+            # We assume that the first model is used for the waterline and all
+            # other models are obstacles (e.g. a support grid).
+            other_models = models[1:]
+            args = [(p1, p2, other_models, cutter, self.batch) for p1, p2 in pairs]
+            for free_points in run_in_parallel(_process_one_line, args,
+                                               callback=progress_counter.update):
+                for index in range(len(free_points) // 2):
+                    result.append(MoveStraight(free_points[2 * index]))
+                    result.append(MoveStraight(free_points[2 * index + 1]))
+                    result.append(MoveSafety())
         else:
-            return path
+            for p1, p2 in pairs:
+                result.append(MoveStraight(p1))
+                result.append(MoveStraight(p2))
+                result.append(MoveSafety())
+        return result
 
     def GenerateToolPathSlice(self, cutter, models, layer_grid, draw_callback=None,
                               progress_counter=None):
         path = []
-        # the ContourCutter pathprocessor does not work with combined models
-        if self.waterlines:
-            models = models[:1]
-        else:
-            models = models
         args = []
         for line in layer_grid:
             p1, p2 = line
-            args.append((p1, p2, models, cutter))
+            args.append((p1, p2, models, cutter, self.batch))
         for points in run_in_parallel(_process_one_line, args, callback=progress_counter.update):
             if points:
-                if self.waterlines:
-                    self.pa.new_scanline()
-                    for point in points:
-                        self.pa.append(point)
-                else:
-                    for index in range(len(points) // 2):
-                        path.append(MoveStraight(points[2 * index]))
-                        path.append(MoveStraight(points[2 * index + 1]))
-                        path.append(MoveSafety())
-                if self.waterlines:
-                    if draw_callback:
-                        draw_callback(tool_position=points[-1])
-                    self.pa.end_scanline()
-                else:
-                    if draw_callback:
-                        draw_callback(tool_position=points[-1], toolpath=path)
+                for index in range(len(points) // 2):
+                    path.append(MoveStraight(points[2 * index]))
+                    path.append(MoveStraight(points[2 * index + 1]))
+                    path.append(MoveSafety())
+                if draw_callback:
+                    draw_callback(tool_position=points[-1], toolpath=path)
             # update the progress counter
             if progress_counter and progress_counter.increment():
                 # quit requested
                 break
-
-        if not self.waterlines:
-            return path
+        return path
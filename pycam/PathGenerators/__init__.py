@@ -20,7 +20,15 @@ along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from pycam.Geometry import epsilon, INFINITE
+from pycam.Geometry.Model import CompositeModel
 from pycam.Geometry.PointUtils import pdist, pnorm, pnormalized, psub
+from pycam.Geometry.ScanLineCache import ScanLineCache
+
+try:
+    import numpy
+except ImportError:
+    # only required for the vectorized functions (e.g. "get_max_height_batch")
+    pass
 
 
 class Hit(object):
@@ -36,7 +44,15 @@ class Hit(object):
         return "%s - %s - %s - %s" % (self.d, self.cl, self.dir, self.cp)
 
 
-def get_free_paths_triangles(models, cutter, p1, p2, return_triangles=False):
+def get_free_paths_triangles(models, cutter, p1, p2, return_triangles=False, scan_lines=None,
+                             batch=False):
+    """ return the pairs of start/end points of the free segments between p1 and p2
+
+    @param scan_lines: optional dictionary of ScanLineCache instances (by the id of the model)
+        containing the line p1-p2
+    @param batch: use the vectorized collision functions (see "_get_hits_batch") - they are
+        skipped for cutters without vectorized support of the direction
+    """
     if (len(models) == 0) or ((len(models) == 1) and (models[0] is None)):
         return (p1, p2)
     elif len(models) == 1:
@@ -44,7 +60,12 @@ def get_free_paths_triangles(models, cutter, p1, p2, return_triangles=False):
         model = models[0]
     else:
         # multiple models were given - process them in layers
-        result = get_free_paths_triangles(models[:1], cutter, p1, p2, return_triangles)
+        if (scan_lines is None) and not batch:
+            # the following models are checked for each free segment of the line
+            scan_lines = {id(model): ScanLineCache(model, p1, p2, cutter.distance_radius)
+                          for model in models[1:] if model is not None}
+        result = get_free_paths_triangles(models[:1], cutter, p1, p2, return_triangles,
+                                          scan_lines, batch)
         # group the result into pairs of two points (start/end)
         point_pairs = []
         while result:
@@ -54,7 +75,7 @@ def get_free_paths_triangles(models, cutter, p1, p2, return_triangles=False):
         all_results = []
         for pair in point_pairs:
             one_result = get_free_paths_triangles(models[1:], cutter, pair[0], pair[1],
-                                                  return_triangles)
+                                                  return_triangles, scan_lines, batch)
             all_results.extend(one_result)
         return all_results
 
@@ -69,19 +90,30 @@ def get_free_paths_triangles(models, cutter, p1, p2, return_triangles=False):
     minz = min(p1[2], p2[2])
 
     # find all hits along scan line
-    hits = []
+    hits = None
 
-    triangles = model.triangles(minx - cutter.distance_radius, miny - cutter.distance_radius, minz,
-                                maxx + cutter.distance_radius, maxy + cutter.distance_radius,
-                                INFINITE)
+    if batch:
+        hits = _get_hits_batch(model, cutter, p1, backward, forward,
+                               (minx - cutter.distance_radius, maxx + cutter.distance_radius,
+                                miny - cutter.distance_radius, maxy + cutter.distance_radius),
+                               return_triangles)
 
-    for t in triangles:
-        (cl1, d1, cp1) = cutter.intersect(backward, t, start=p1)
-        if cl1:
-            hits.append(Hit(cl1, cp1, t, -d1, backward))
-        (cl2, d2, cp2) = cutter.intersect(forward, t, start=p1)
-        if cl2:
-            hits.append(Hit(cl2, cp2, t, d2, forward))
+    if hits is None:
+        hits = []
+        if scan_lines and (id(model) in scan_lines):
+            triangles = scan_lines[id(model)].get_segment_triangles(p1, p2)
+        else:
+            triangles = model.triangles(minx - cutter.distance_radius,
+                                        miny - cutter.distance_radius, minz,
+                                        maxx + cutter.distance_radius,
+                                        maxy + cutter.distance_radius, INFINITE)
+        for t in triangles:
+            (cl1, d1, cp1) = cutter.intersect(backward, t, start=p1)
+            if cl1:
+                hits.append(Hit(cl1, cp1, t, -d1, backward))
+            (cl2, d2, cp2) = cutter.intersect(forward, t, start=p1)
+            if cl2:
+                hits.append(Hit(cl2, cp2, t, d2, forward))
 
     # sort along the scan direction
     hits.sort(key=lambda h: h.d)
@@ -128,18 +160,75 @@ def get_free_paths_triangles(models, cutter, p1, p2, return_triangles=False):
         return [cut_info[0] for cut_info in points]
 
 
-def get_max_height_triangles(model, cutter, x, y, minz, maxz):
+def _get_hits_batch(model, cutter, p1, backward, forward, box, return_triangles):
+    """ calculate the unsorted hits of "get_free_paths_triangles" with vectorized functions
+
+    The candidate triangles are selected from the packed triangles of the
+    model (see Model.get_triangle_arrays) in the same order as by
+    "Model.triangles". Thus the result is identical to the per-triangle
+    calculation.
+    The contact points are not calculated by the vectorized functions. If
+    they are requested, then only the colliding triangles are processed again
+    with the per-triangle function.
+    None is returned, if the cutter does not support the vectorized calculation.
+    """
+    minx, maxx, miny, maxy = box
+    models = model.models if isinstance(model, CompositeModel) else [model]
+    hits = []
+    for one_model in models:
+        triangles = one_model.get_triangle_arrays()
+        index = one_model.get_triangle_index()
+        if index is None:
+            indices = numpy.nonzero(~((triangles.minx > maxx) | (triangles.maxx < minx)
+                                      | (triangles.miny > maxy) | (triangles.maxy < miny)))[0]
+        else:
+            indices = numpy.array(index.search(minx, maxx, miny, maxy), dtype=int)
+        try:
+            cl_backward, d_backward = cutter.push_batch(backward, triangles, indices, p1)
+            cl_forward, d_forward = cutter.push_batch(forward, triangles, indices, p1)
+        except NotImplementedError:
+            return None
+        hit_backward = ~numpy.isnan(cl_backward[:, 0])
+        hit_forward = ~numpy.isnan(cl_forward[:, 0])
+        all_triangles = one_model.triangles()
+        for row in numpy.nonzero(hit_backward | hit_forward)[0]:
+            t = all_triangles[indices[row]]
+            if return_triangles:
+                (cl1, d1, cp1) = cutter.intersect(backward, t, start=p1)
+                if cl1:
+                    hits.append(Hit(cl1, cp1, t, -d1, backward))
+                (cl2, d2, cp2) = cutter.intersect(forward, t, start=p1)
+                if cl2:
+                    hits.append(Hit(cl2, cp2, t, d2, forward))
+            else:
+                if hit_backward[row]:
+                    hits.append(Hit(tuple(cl_backward[row].tolist()), None, t,
+                                    -float(d_backward[row]), backward))
+                if hit_forward[row]:
+                    hits.append(Hit(tuple(cl_forward[row].tolist()), None, t,
+                                    float(d_forward[row]), forward))
+    return hits
+
+
+def get_max_height_triangles(model, cutter, x, y, minz, maxz, triangles=None):
+    """ calculate the cutter location at the given position
+
+    @param triangles: optional list of candidate triangles (instead of a query of the model) -
+        it has to contain all triangles of the model below the cutter
+    """
     if model is None:
         return (x, y, minz)
     p = (x, y, maxz)
     height_max = None
-    box_x_min = cutter.get_minx(p)
-    box_x_max = cutter.get_maxx(p)
-    box_y_min = cutter.get_miny(p)
-    box_y_max = cutter.get_maxy(p)
-    box_z_min = minz
-    box_z_max = maxz
-    triangles = model.triangles(box_x_min, box_y_min, box_z_min, box_x_max, box_y_max, box_z_max)
+    if triangles is None:
+        box_x_min = cutter.get_minx(p)
+        box_x_max = cutter.get_maxx(p)
+        box_y_min = cutter.get_miny(p)
+        box_y_max = cutter.get_maxy(p)
+        box_z_min = minz
+        box_z_max = maxz
+        triangles = model.triangles(box_x_min, box_y_min, box_z_min, box_x_max, box_y_max,
+                                    box_z_max)
     for t in triangles:
         cut = cutter.drop(t, start=p)
         if cut and ((height_max is None) or (cut[2] > height_max)):
@@ -154,6 +243,77 @@ def get_max_height_triangles(model, cutter, x, y, minz, maxz):
         return (x, y, height_max)
 
 
+def get_max_height_batch(model, cutter, positions, minz, maxz, chunk_size=64):
+    """ calculate the result of "get_max_height_triangles" for many positions at once
+
+    The collisions between the cutter and the packed triangles of the model
+    (see Model.get_triangle_arrays) are calculated with vectorized functions.
+    The models of a CompositeModel are packed separately.
+    The result is a list of points (or None) - one for each position.
+    """
+    if model is None:
+        return [(x, y, minz) for x, y in positions]
+    # the triangles of combined models are processed separately
+    models = model.models if isinstance(model, CompositeModel) else [model]
+    packed_models = [(one_model.get_triangle_arrays(), one_model.get_triangle_index())
+                     for one_model in models]
+    radius = cutter.distance_radius
+    result = []
+    for chunk_start in range(0, len(positions), chunk_size):
+        chunk = numpy.array(positions[chunk_start:chunk_start + chunk_size], dtype=float)
+        xs = chunk[:, 0]
+        ys = chunk[:, 1]
+        heights = numpy.full(len(chunk), -numpy.inf)
+        for triangles, index in packed_models:
+            if index is None:
+                # Select the triangles overlapping the area of the chunk and then the triangles
+                # overlapping the area of each position (similar to TriangleKdtree.Search).
+                candidates = numpy.nonzero(~((triangles.minx > xs.max() + radius)
+                                             | (triangles.maxx < xs.min() - radius)
+                                             | (triangles.miny > ys.max() + radius)
+                                             | (triangles.maxy < ys.min() - radius)))[0]
+                overlap = ~((triangles.minx[candidates] > (xs + radius)[:, None])
+                            | (triangles.maxx[candidates] < (xs - radius)[:, None])
+                            | (triangles.miny[candidates] > (ys + radius)[:, None])
+                            | (triangles.maxy[candidates] < (ys - radius)[:, None]))
+                position_indices, candidate_indices = numpy.nonzero(overlap)
+                triangle_indices = candidates[candidate_indices]
+            else:
+                position_indices, triangle_indices = index.search_many(
+                    xs - radius, xs + radius, ys - radius, ys + radius)
+            starts = numpy.column_stack((xs[position_indices], ys[position_indices],
+                                         numpy.full(len(position_indices), maxz)))
+            cuts = cutter.drop_batch(triangles, triangle_indices, starts)
+            numpy.fmax.at(heights, position_indices, cuts[:, 2])
+        for (x, y), height_max in zip(positions[chunk_start:chunk_start + chunk_size],
+                                      heights.tolist()):
+            # see "get_max_height_triangles"
+            if height_max < minz + epsilon:
+                height_max = minz
+            if height_max > maxz + epsilon:
+                result.append(None)
+            else:
+                result.append((x, y, height_max))
+    return result
+
+
+def _get_scan_line_function(model, cutter, positions, minz, maxz):
+    """ return a function calculating the heights for a list of positions along a line
+
+    The triangles along the line (from the first to the last position) are
+    queried only once (see ScanLineCache). The positions should be processed
+    in the order along the line.
+    """
+    if (model is None) or (len(positions) < 2):
+        return lambda positions: [get_max_height_triangles(model, cutter, x, y, minz, maxz)
+                                  for x, y in positions]
+    scan_line = ScanLineCache(model, positions[0], positions[-1], cutter.distance_radius)
+    return lambda positions: [
+        get_max_height_triangles(model, cutter, x, y, minz, maxz,
+                                 triangles=scan_line.get_triangles(x, y))
+        for x, y in positions]
+
+
 def _check_deviance_of_adjacent_points(p1, p2, p3, min_distance):
     straight = psub(p3, p1)
     added = pdist(p2, p1) + pdist(p3, p2)
@@ -166,15 +326,33 @@ def _check_deviance_of_adjacent_points(p1, p2, p3, min_distance):
         return (added / pnorm(straight)) < 1.001
 
 
-def get_max_height_dynamic(model, cutter, positions, minz, maxz):
+def get_max_height_dynamic(model, cutter, positions, minz, maxz, batch=False):
+    """ calculate the heights for a line of adjacent positions
+
+    Additional points are inserted in non-flat areas.
+    The heights of the given positions are calculated via vectorized functions
+    if "batch" is True (see "get_max_height_batch"). Otherwise each point is
+    calculated separately.
+    The inserted points depend on each other. Thus they are calculated one by
+    one - vectorization would only add overhead for these single points.
+    """
     max_depth = 8
     # the points don't need to get closer than 1/1000 of the cutter radius
     min_distance = cutter.distance_radius / 1000
-    points = []
-    get_max_height = lambda x, y: get_max_height_triangles(model, cutter, x, y, minz, maxz)
-    # add one point between all existing points
-    for index, p in enumerate(positions):
-        points.append(get_max_height(p[0], p[1]))
+    # the triangles along the line are collected only if they are needed
+    scan_line_functions = []
+
+    def get_max_height(x, y):
+        if not scan_line_functions:
+            scan_line_functions.append(
+                _get_scan_line_function(model, cutter, positions, minz, maxz))
+        return scan_line_functions[0]([(x, y)])[0]
+
+    if batch:
+        points = get_max_height_batch(model, cutter, [(p[0], p[1]) for p in positions], minz,
+                                      maxz)
+    else:
+        points = [get_max_height(p[0], p[1]) for p in positions]
     # Check if three consecutive points are "flat".
     # Add additional points if necessary.
     index = 0
@@ -209,3 +387,88 @@ def get_max_height_dynamic(model, cutter, positions, minz, maxz):
         else:
             index += 1
     return points
+
+
+def get_max_height_adaptive(model, cutter, positions, minz, maxz, tolerance, batch=False):
+    """ calculate the heights for a line of adjacent positions with a limited chordal error
+
+    The middle of every interval between two points is sampled. The middle
+    point is kept if its height deviates more than half of the tolerance from
+    the straight line between the points. In this case both halves are
+    refined again. All new samples of a refinement step are calculated
+    together (vectorized if "batch" is True - see "get_max_height_batch").
+    Otherwise the triangles along the line are queried only once (see
+    ScanLineCache).
+    Finally all points are removed, that deviate less than half of the
+    tolerance from the line between their remaining neighbours.
+    """
+    # the points don't need to get closer than 1/1000 of the cutter radius
+    min_distance = cutter.distance_radius / 1000
+    positions = [(p[0], p[1]) for p in positions]
+    if model is None:
+        return [(x, y, minz) for x, y in positions]
+    if batch:
+        get_max_heights = lambda samples: get_max_height_batch(model, cutter, samples, minz,
+                                                               maxz)
+    else:
+        get_max_heights = _get_scan_line_function(model, cutter, positions, minz, maxz)
+    points = get_max_heights(positions)
+    # the new points of each interval: (fraction, point)
+    inserted = [[] for _ in range(len(points) - 1)]
+    # intervals to be refined: (index, start fraction, end fraction, start point, end point)
+    pending = [(index, 0.0, 1.0, points[index], points[index + 1])
+               for index in range(len(points) - 1)
+               if None not in (points[index], points[index + 1])]
+    while pending:
+        samples = [((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
+                   for index, start, end, p1, p2 in pending]
+        next_pending = []
+        for (index, start, end, p1, p2), point in zip(pending, get_max_heights(samples)):
+            fraction = (start + end) / 2
+            if point is None:
+                # the cutter exceeds maxz - no further refinement
+                inserted[index].append((fraction, point))
+            elif abs(point[2] - (p1[2] + p2[2]) / 2) > tolerance / 2:
+                inserted[index].append((fraction, point))
+                if (p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2 >= (2 * min_distance) ** 2:
+                    next_pending.append((index, start, fraction, p1, point))
+                    next_pending.append((index, fraction, end, point, p2))
+        pending = next_pending
+    result = [points[0]] if points else []
+    for index, new_points in enumerate(inserted):
+        new_points.sort(key=lambda item: item[0])
+        result.extend(point for _, point in new_points)
+        result.append(points[index + 1])
+    return _remove_points_within_tolerance(result, tolerance / 2)
+
+
+def _remove_points_within_tolerance(points, tolerance):
+    """ remove points whose height deviates less than "tolerance" from the line between the
+    remaining neighbours (including the points removed before)
+    """
+    result = points[:1]
+    # the points removed since the last remaining point
+    skipped = []
+    for index in range(1, len(points) - 1):
+        p1, p3 = result[-1], points[index + 1]
+        candidates = skipped + [points[index]]
+        if (None in (p1, p3)) or (None in candidates):
+            removable = False
+        else:
+            length_sq = (p3[0] - p1[0]) ** 2 + (p3[1] - p1[1]) ** 2
+            removable = length_sq > 0
+            for p2 in candidates:
+                if not removable:
+                    break
+                # the position of p2 along the line (xy) and its height deviation
+                ratio = ((p2[0] - p1[0]) * (p3[0] - p1[0])
+                         + (p2[1] - p1[1]) * (p3[1] - p1[1])) / length_sq
+                removable = abs(p1[2] + ratio * (p3[2] - p1[2]) - p2[2]) <= tolerance
+        if removable:
+            skipped = candidates
+        else:
+            result.append(points[index])
+            skipped = []
+    if len(points) > 1:
+        result.append(points[-1])
+    return result
@@ -139,7 +139,8 @@ class ParallelProcessing(pycam.Plugins.PluginBase):
         model = self.process_pool_model
         model.clear()
         for item in stats:
-            model.append(item)
+            # the cache statistics of the workers are summarized in the details below
+            model.append(item[:6])
         self.gui.get_object("ProcessPoolConnectedWorkersValue").set_text(str(len(stats)))
         details = pycam.Utils.threading.get_task_statistics()
         detail_text = os.linesep.join(["%s: %s" % (key, value)
@@ -21,6 +21,8 @@ along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 
 import pycam.Plugins
 import pycam.Gui.ControlsGTK
+import pycam.PathGenerators.DropCutter
+import pycam.PathGenerators.PushCutter
 import pycam.Toolpath.MotionGrid
 
 
@@ -108,6 +110,88 @@ class PathParamMillingStyle(pycam.Plugins.PluginBase):
         self.core.get("unregister_parameter")("process", "milling_style")
 
 
+class PathParamDropEngine(pycam.Plugins.PluginBase):
+
+    DEPENDS = ["Processes"]
+    CATEGORIES = ["Process", "Parameter"]
+
+    def setup(self):
+        self.control = pycam.Gui.ControlsGTK.InputChoice(
+            (("per triangle", pycam.PathGenerators.DropCutter.DropCutterEngine.TRIANGLES),
+             ("batch (numpy)", pycam.PathGenerators.DropCutter.DropCutterEngine.BATCH),
+             ("height field (numpy)",
+              pycam.PathGenerators.DropCutter.DropCutterEngine.HEIGHTFIELD)),
+            change_handler=lambda widget=None: self.core.emit_event("process-changed"))
+        self.core.get("register_parameter")("process", "drop_engine", self.control)
+        self.core.register_ui("process_path_parameters", "Drop engine",
+                              self.control.get_widget(), weight=70)
+        return True
+
+    def teardown(self):
+        self.core.unregister_ui("process_path_parameters", self.control.get_widget())
+        self.core.get("unregister_parameter")("process", "drop_engine")
+
+
+class PathParamPushEngine(pycam.Plugins.PluginBase):
+
+    DEPENDS = ["Processes"]
+    CATEGORIES = ["Process", "Parameter"]
+
+    def setup(self):
+        self.control = pycam.Gui.ControlsGTK.InputChoice(
+            (("per triangle", pycam.PathGenerators.PushCutter.PushCutterEngine.TRIANGLES),
+             ("batch (numpy)", pycam.PathGenerators.PushCutter.PushCutterEngine.BATCH)),
+            change_handler=lambda widget=None: self.core.emit_event("process-changed"))
+        self.core.get("register_parameter")("process", "push_engine", self.control)
+        self.core.register_ui("process_path_parameters", "Push engine",
+                              self.control.get_widget(), weight=72)
+        return True
+
+    def teardown(self):
+        self.core.unregister_ui("process_path_parameters", self.control.get_widget())
+        self.core.get("unregister_parameter")("process", "push_engine")
+
+
+class PathParamHeightfieldResolution(pycam.Plugins.PluginBase):
+
+    DEPENDS = ["Processes"]
+    CATEGORIES = ["Process", "Parameter"]
+
+    def setup(self):
+        # zero: automatic resolution (based on the tool radius)
+        self.control = pycam.Gui.ControlsGTK.InputNumber(
+            start=0, lower=0, digits=3, increment=0.05,
+            change_handler=lambda widget=None: self.core.emit_event("process-changed"))
+        self.core.get("register_parameter")("process", "heightfield_resolution", self.control)
+        self.core.register_ui("process_path_parameters", "Height field resolution",
+                              self.control.get_widget(), weight=75)
+        return True
+
+    def teardown(self):
+        self.core.unregister_ui("process_path_parameters", self.control.get_widget())
+        self.core.get("unregister_parameter")("process", "heightfield_resolution")
+
+
+class PathParamSurfaceTolerance(pycam.Plugins.PluginBase):
+
+    DEPENDS = ["Processes"]
+    CATEGORIES = ["Process", "Parameter"]
+
+    def setup(self):
+        # zero: fixed flatness criterion for the resampling of grid lines
+        self.control = pycam.Gui.ControlsGTK.InputNumber(
+            start=0, lower=0, digits=3, increment=0.01,
+            change_handler=lambda widget=None: self.core.emit_event("process-changed"))
+        self.core.get("register_parameter")("process", "surface_tolerance", self.control)
+        self.core.register_ui("process_path_parameters", "Surface tolerance",
+                              self.control.get_widget(), weight=80)
+        return True
+
+    def teardown(self):
+        self.core.unregister_ui("process_path_parameters", self.control.get_widget())
+        self.core.get("unregister_parameter")("process", "surface_tolerance")
+
+
 class PathParamGridDirection(pycam.Plugins.PluginBase):
 
     DEPENDS = ["Processes", "PathParamPattern"]
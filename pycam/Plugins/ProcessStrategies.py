@@ -33,14 +33,15 @@ def _get_line_distance(radius, overlap):
 class ProcessStrategySlicing(pycam.Plugins.PluginBase):
 
     DEPENDS = ["ParameterGroupManager", "PathParamOverlap", "PathParamStepDown",
-               "PathParamMaterialAllowance", "PathParamPattern"]
+               "PathParamMaterialAllowance", "PathParamPattern", "PathParamPushEngine"]
     CATEGORIES = ["Process"]
 
     def setup(self):
         parameters = {"overlap": 0.1,
                       "step_down": 1.0,
                       "material_allowance": 0,
-                      "path_pattern": None}
+                      "path_pattern": None,
+                      "push_engine": pycam.PathGenerators.PushCutter.PushCutterEngine.TRIANGLES}
         self.core.get("register_parameter_set")("process", "slicing", "Slice removal",
                                                 self.run_process, parameters=parameters, weight=10)
         return True
@@ -50,7 +51,10 @@ class ProcessStrategySlicing(pycam.Plugins.PluginBase):
 
     def run_process(self, process, tool_radius, box):
         line_distance = _get_line_distance(tool_radius, process["parameters"]["overlap"])
-        path_generator = pycam.PathGenerators.PushCutter.PushCutter(waterlines=False)
+        path_generator = pycam.PathGenerators.PushCutter.PushCutter(
+            waterlines=False,
+            batch=(process["parameters"]["push_engine"]
+                   == pycam.PathGenerators.PushCutter.PushCutterEngine.BATCH))
         path_pattern = process["parameters"]["path_pattern"]
         path_get_func = self.core.get("get_parameter_sets")(
             "path_pattern")[path_pattern["name"]]["func"]
@@ -63,14 +67,15 @@ class ProcessStrategySlicing(pycam.Plugins.PluginBase):
 class ProcessStrategyContour(pycam.Plugins.PluginBase):
 
     DEPENDS = ["Processes", "PathParamStepDown", "PathParamMaterialAllowance",
-               "PathParamMillingStyle"]
+               "PathParamMillingStyle", "PathParamPushEngine"]
     CATEGORIES = ["Process"]
 
     def setup(self):
         parameters = {"step_down": 1.0,
                       "material_allowance": 0,
                       "overlap": 0.8,
-                      "milling_style": pycam.Toolpath.MotionGrid.MillingStyle.IGNORE}
+                      "milling_style": pycam.Toolpath.MotionGrid.MillingStyle.IGNORE,
+                      "push_engine": pycam.PathGenerators.PushCutter.PushCutterEngine.TRIANGLES}
         self.core.get("register_parameter_set")("process", "contour", "Waterline",
                                                 self.run_process, parameters=parameters, weight=20)
         return True
@@ -80,7 +85,10 @@ class ProcessStrategyContour(pycam.Plugins.PluginBase):
 
     def run_process(self, process, tool_radius, box):
         line_distance = _get_line_distance(tool_radius, process["parameters"]["overlap"])
-        path_generator = pycam.PathGenerators.PushCutter.PushCutter(waterlines=True)
+        path_generator = pycam.PathGenerators.PushCutter.PushCutter(
+            waterlines=True,
+            batch=(process["parameters"]["push_engine"]
+                   == pycam.PathGenerators.PushCutter.PushCutterEngine.BATCH))
         # TODO: milling_style currently refers to the grid lines - not to the waterlines
         motion_grid = pycam.Toolpath.MotionGrid.get_fixed_grid(
             box, process["parameters"]["step_down"], line_distance=line_distance,
@@ -92,13 +100,17 @@ class ProcessStrategyContour(pycam.Plugins.PluginBase):
 class ProcessStrategySurfacing(pycam.Plugins.PluginBase):
 
     DEPENDS = ["ParameterGroupManager", "PathParamOverlap", "PathParamMaterialAllowance",
-               "PathParamPattern"]
+               "PathParamPattern", "PathParamDropEngine", "PathParamHeightfieldResolution",
+               "PathParamSurfaceTolerance"]
     CATEGORIES = ["Process"]
 
     def setup(self):
         parameters = {"overlap": 0.6,
                       "material_allowance": 0,
-                      "path_pattern": None}
+                      "path_pattern": None,
+                      "drop_engine": pycam.PathGenerators.DropCutter.DropCutterEngine.TRIANGLES,
+                      "heightfield_resolution": 0,
+                      "surface_tolerance": 0}
         self.core.get("register_parameter_set")("process", "surfacing", "Surfacing",
                                                 self.run_process, parameters=parameters, weight=50)
         return True
@@ -108,7 +120,10 @@ class ProcessStrategySurfacing(pycam.Plugins.PluginBase):
 
     def run_process(self, process, tool_radius, box):
         line_distance = _get_line_distance(tool_radius, process["parameters"]["overlap"])
-        path_generator = pycam.PathGenerators.DropCutter.DropCutter()
+        path_generator = pycam.PathGenerators.DropCutter.DropCutter(
+            engine=process["parameters"]["drop_engine"],
+            resolution=(process["parameters"]["heightfield_resolution"] or None),
+            tolerance=(process["parameters"]["surface_tolerance"] or None))
         path_pattern = process["parameters"]["path_pattern"]
         path_get_func = self.core.get("get_parameter_sets")(
             "path_pattern")[path_pattern["name"]]["func"]
@@ -22,6 +22,7 @@ import datetime
 
 import pycam.Gui.common
 import pycam.Plugins
+from pycam.Simulation.Playback import PlaybackCursor
 
 
 class ToolpathSimulation(pycam.Plugins.PluginBase):
@@ -43,6 +44,7 @@ class ToolpathSimulation(pycam.Plugins.PluginBase):
             self._timer_widget.set_label("")
             self.core.set("show_simulation", False)
             self._toolpath_moves = None
+            self._cursor = None
             self._start_button = self.gui.get_object("SimulationStartButton")
             self._pause_button = self.gui.get_object("SimulationPauseButton")
             self._stop_button = self.gui.get_object("SimulationStopButton")
@@ -93,6 +95,7 @@ class ToolpathSimulation(pycam.Plugins.PluginBase):
             self._progress.set_upper(self._duration)
             self._progress.set_value(0)
             self._toolpath_moves = None
+            self._cursor = PlaybackCursor(self._toolpath)
             self.core.set("show_simulation", True)
             self.core.set("current_tool", self._toolpath.tool)
             self._running = True
@@ -116,6 +119,7 @@ class ToolpathSimulation(pycam.Plugins.PluginBase):
         self.core.set("toolpath_in_progress", None)
         self.core.set("current_tool", None)
         self._toolpath_moves = None
+        self._cursor = None
         self._timer_widget.set_label("")
         self._progress.set_value(0)
         self._start_button.set_sensitive(True)
@@ -147,7 +151,8 @@ class ToolpathSimulation(pycam.Plugins.PluginBase):
             current = datetime.timedelta(seconds=int(self._progress.get_value()))
             complete = datetime.timedelta(seconds=int(self._progress.get_upper()))
             self._timer_widget.set_label("%s / %s" % (current, complete))
-            moves = self._toolpath.get_moves(max_time=self._duration * fraction / 60)
+            self._cursor.seek(self._duration * fraction / 60)
+            moves = self._cursor.get_moves()
             if moves:
                 tool = self.core.get("current_tool")
                 if tool:
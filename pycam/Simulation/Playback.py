@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import bisect
+
+from pycam.Geometry.PointUtils import padd, pmul, psub
+from pycam.Toolpath import MOVES_LIST
+import pycam.Toolpath.Steps as ToolpathSteps
+
+
+class PlaybackCursor(object):
+    """ the progress of a toolpath at a given machine time (e.g. for an animated simulation)
+
+    The cumulative machine time of all moves is calculated only once. The
+    current move is located by a binary search. The moves up to the current
+    time are equal to the result of the "TimeLimit" filter (except for
+    rounding errors of the partial move).
+    Optionally the moves are applied to a stock simulation (see
+    pycam.Simulation.StockSimulation). Only the moves since the last position
+    of the cursor are added. Moving backwards restores the latest preceding
+    checkpoint of the height map.
+    """
+
+    def __init__(self, toolpath, simulation=None, checkpoints=10):
+        """
+        @param toolpath: pycam.Toolpath.Toolpath
+        @param simulation: optional StockSimulation (with an unprocessed stock)
+        @param checkpoints: the number of copies of the height map taken at equal
+            intervals of machine time
+        """
+        self.steps = toolpath.get_basic_moves()
+        step_durations = toolpath.get_machine_move_distances_and_times()[1]
+        # the indices of the moves within "steps" and the time at their end
+        self._move_indices = [index for index, step in enumerate(self.steps)
+                              if step.action in MOVES_LIST]
+        self._moves = [self.steps[index] for index in self._move_indices]
+        self._times = [step_durations[index] for index in self._move_indices]
+        self.duration = self._times[-1] if self._times else 0
+        self.simulation = simulation
+        if (simulation is not None) and (checkpoints > 0) and (self.duration > 0):
+            self._checkpoint_interval = self.duration / checkpoints
+        else:
+            self._checkpoint_interval = None
+        self._checkpoints = []
+        # the state of the cursor: "_count" moves are complete, the next one could be partial
+        self.time = None
+        self._count = 0
+        self._partial = None
+        # the number of steps (and the partial move) added to the simulation
+        self._fed_steps = 0
+        self._fed_partial = None
+        if simulation is not None:
+            self._checkpoints.append((None, 0, None, simulation.last_position,
+                                      simulation.heights.copy()))
+
+    def _get_state(self, time):
+        """ return the number of complete moves and the optional partial move at the given time
+
+        This matches the behaviour of the "TimeLimit" filter.
+        """
+        if not self._times:
+            return 0, None
+        count = bisect.bisect_left(self._times, time)
+        if count == 0:
+            # the first move is complete at the start - unless other steps precede it
+            return (1 if self._move_indices[0] == 0 else 0), None
+        elif count == len(self._times):
+            return count, None
+        elif self._times[count] == time:
+            return count + 1, None
+        else:
+            # interpolate the move that ends after the given time
+            start = self._moves[count - 1].position
+            step = self._moves[count]
+            partial = ((time - self._times[count - 1])
+                       / (self._times[count] - self._times[count - 1]))
+            destination = padd(start, pmul(psub(step.position, start), partial))
+            return count, ToolpathSteps.get_step_class_by_action(step.action)(destination)
+
+    def seek(self, time):
+        """ move the cursor to the given machine time (in minutes)
+
+        The simulation (if given) is updated accordingly.
+        """
+        if (self.simulation is not None) and (self.time is not None) and (time < self.time):
+            self._restore_checkpoint(time)
+        self.time = time
+        self._count, self._partial = self._get_state(time)
+        if self.simulation is not None:
+            self._update_simulation()
+
+    def get_moves(self):
+        """ return the moves up to the current time (see "Toolpath.get_moves") """
+        if self.time is None:
+            return list(self.steps)
+        if self._partial is None:
+            return self._moves[:self._count]
+        else:
+            return self._moves[:self._count] + [self._partial]
+
+    def get_position(self):
+        """ return the current position of the tool (or None before the first move) """
+        if self._partial is not None:
+            return self._partial.position
+        elif self._count > 0:
+            return self._moves[self._count - 1].position
+        else:
+            return None
+
+    def _update_simulation(self):
+        if self._count > 0:
+            # include the steps (e.g. safety moves) preceding the next move
+            end = self._move_indices[self._count - 1] + 1
+            if self._partial is not None:
+                end = self._move_indices[self._count]
+        else:
+            end = 0
+        if end > self._fed_steps:
+            self.simulation.add_steps(self.steps[self._fed_steps:end])
+            self._fed_steps = end
+        if (self._partial is not None) and (self._partial != self._fed_partial):
+            self.simulation.add_positions([self._partial.position])
+        self._fed_partial = self._partial
+        if self._checkpoint_interval is not None:
+            next_checkpoint = self._checkpoint_interval * len(self._checkpoints)
+            if self.time >= next_checkpoint:
+                self._checkpoints.append((self.time, self._fed_steps, self._fed_partial,
+                                          self.simulation.last_position,
+                                          self.simulation.heights.copy()))
+
+    def _restore_checkpoint(self, time):
+        # the checkpoints are sorted by time - the first one has no time (the initial state)
+        index = bisect.bisect_right([checkpoint[0] for checkpoint in self._checkpoints[1:]],
+                                    time)
+        self._fed_steps, self._fed_partial, last_position, heights = self._checkpoints[index][1:]
+        # drop the newer checkpoints - they are created again while moving forward
+        del self._checkpoints[index + 1:]
+        self.simulation.last_position = last_position
+        self.simulation.zbuffer.buf[:] = heights
+        self.simulation.zbuffer.dirty[:] = True
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+from pycam.Geometry.HeightField import HeightField
+from pycam.Simulation.ZBuffer import ZBuffer
+from pycam.Toolpath import MOVE_SAFETY, MOVES_LIST
+import pycam.Utils.log
+
+try:
+    import numpy
+    numpy_enabled = True
+except ImportError:
+    numpy_enabled = False
+
+
+_log = pycam.Utils.log.get_logger()
+
+# maximum number of positions passed to the height map at once
+PATH_CHUNK_SIZE = 10000
+
+
+class StockSimulation(object):
+    """ removal of material from a box-shaped stock without any visualization
+
+    The top of the stock is represented by a ZBuffer. Its cells are located
+    at "lower[0] + i * resolution" and "lower[1] + j * resolution".
+    The steps of a toolpath can be added incrementally (see "add_steps").
+    """
+
+    def __init__(self, box, resolution, cutter):
+        """
+        @param box: Box3D (or a pair of points) describing the unprocessed stock
+        @param resolution: the size of the cells of the height map
+        @param cutter: the tool (see pycam.Cutters)
+        """
+        if resolution <= 0:
+            raise ValueError("The resolution of a simulation must be positive: %s"
+                             % str(resolution))
+        self.lower = tuple(float(value) for value in box[0][:3])
+        self.upper = tuple(float(value) for value in box[1][:3])
+        self.resolution = resolution
+        self.cutter = cutter
+        xres = int(math.ceil((self.upper[0] - self.lower[0]) / resolution)) + 1
+        yres = int(math.ceil((self.upper[1] - self.lower[1]) / resolution)) + 1
+        self.zbuffer = ZBuffer(self.lower[0], self.lower[0] + xres * resolution, xres,
+                               self.lower[1], self.lower[1] + yres * resolution, yres,
+                               self.lower[2], self.upper[2], initial_height=self.upper[2])
+        # the tool is lifted out of the stock in the beginning
+        self.last_position = None
+
+    @property
+    def heights(self):
+        return self.zbuffer.buf
+
+    def add_positions(self, positions):
+        """ move the tool along the given positions (starting at the last position) """
+        positions = list(positions)
+        if not positions:
+            return
+        if self.last_position is not None:
+            positions.insert(0, self.last_position)
+        # the chunks overlap by one position
+        for start in range(0, max(len(positions) - 1, 1), PATH_CHUNK_SIZE):
+            self.zbuffer.add_cutter_path(self.cutter,
+                                         positions[start:start + PATH_CHUNK_SIZE + 1])
+        self.last_position = tuple(positions[-1])
+
+    def add_steps(self, steps):
+        """ process the moves of a sequence of toolpath steps
+
+        Arcs are treated as straight moves. Safety moves (without a position)
+        lift the tool out of the stock - the following move starts without
+        cutting.
+        """
+        positions = []
+        for step in steps:
+            if step.action in MOVES_LIST:
+                positions.append(step.position)
+            elif step.action == MOVE_SAFETY:
+                self.add_positions(positions)
+                positions = []
+                self.last_position = None
+        self.add_positions(positions)
+
+    def get_result(self, model=None, tolerance=0):
+        """ compare the current height map with the model
+
+        @param model: the expected shape (Model or CompositeModel) - the
+            comparison maps of the result are None, if it is missing
+        @param tolerance: deviations below this distance are ignored in the gouge and
+            overcut maps
+        @rtype: SimulationResult
+        """
+        return SimulationResult(self, model, tolerance)
+
+
+def _get_cell_weights(lower, upper, count, resolution):
+    """ return the part of each cell (along one axis) located within the stock
+
+    Each cell of the height map is centered around its position. Thus the
+    cells at the border of the stock (and beyond) cover the stock only
+    partially.
+    """
+    positions = lower + numpy.arange(count) * resolution
+    starts = numpy.maximum(positions - resolution / 2, lower)
+    ends = numpy.minimum(positions + resolution / 2, upper)
+    return numpy.maximum(ends - starts, 0)
+
+
+class SimulationResult(object):
+    """ the final height map of a simulation and its comparison with the model
+
+    All maps are numpy arrays indexed by [y, x] (see StockSimulation):
+        heights: the top of the remaining stock
+        model_heights: the top of the model (the bottom of the stock at empty cells)
+        gouge: the depth of material removed below the surface of the model
+        overcut: the depth of cuts below the bottom of the stock (e.g. into the table)
+        remaining: the thickness of the material above the surface of the model
+    The volumes are measured in cubic units of the model. Only the parts of
+    the cells within the stock are taken into account.
+    """
+
+    def __init__(self, simulation, model, tolerance):
+        self.lower = simulation.lower
+        self.upper = simulation.upper
+        self.resolution = simulation.resolution
+        self.heights = simulation.heights.copy()
+        height, width = self.heights.shape
+        cell_areas = numpy.outer(
+            _get_cell_weights(self.lower[1], self.upper[1], height, self.resolution),
+            _get_cell_weights(self.lower[0], self.upper[0], width, self.resolution))
+        bottom = self.lower[2]
+        self.removed_volume = float(numpy.sum(
+            (self.upper[2] - numpy.maximum(self.heights, bottom)) * cell_areas))
+        self.overcut = numpy.maximum(bottom - self.heights, 0)
+        self.overcut[self.overcut <= tolerance] = 0
+        if model is None:
+            self.model_heights = None
+            self.gouge = None
+            self.remaining = None
+            self.gouge_volume = None
+            self.remaining_volume = None
+        else:
+            height_field = HeightField(self.lower[0], self.upper[0], self.lower[1],
+                                       self.upper[1], self.resolution)
+            height_field.add_model(model)
+            self.model_heights = numpy.full(self.heights.shape, bottom)
+            self.model_heights[:height_field.height, :height_field.width] = numpy.clip(
+                height_field.heights[:height, :width], bottom, self.upper[2])
+            self.gouge = numpy.maximum(self.model_heights - numpy.maximum(self.heights, bottom),
+                                       0)
+            self.gouge[self.gouge <= tolerance] = 0
+            self.remaining = numpy.maximum(self.heights - self.model_heights, 0)
+            self.gouge_volume = float(numpy.sum(self.gouge * cell_areas))
+            self.remaining_volume = float(numpy.sum(self.remaining * cell_areas))
+        self.overcut_volume = float(numpy.sum(self.overcut * cell_areas))
+
+    def get_metrics(self):
+        return {"removed_volume": self.removed_volume,
+                "remaining_volume": self.remaining_volume,
+                "gouge_volume": self.gouge_volume,
+                "overcut_volume": self.overcut_volume,
+                "max_gouge": None if self.gouge is None else float(self.gouge.max()),
+                "max_overcut": float(self.overcut.max())}
+
+    def save(self, filename):
+        """ store the maps and the metrics in a compressed numpy file (.npz) """
+        arrays = {"heights": self.heights, "overcut": self.overcut,
+                  "lower": numpy.array(self.lower), "upper": numpy.array(self.upper),
+                  "resolution": numpy.array(self.resolution)}
+        if self.model_heights is not None:
+            arrays.update({"model_heights": self.model_heights, "gouge": self.gouge,
+                           "remaining": self.remaining})
+        for key, value in self.get_metrics().items():
+            if value is not None:
+                arrays[key] = numpy.array(value)
+        numpy.savez_compressed(filename, **arrays)
+
+
+def simulate_toolpath(toolpath, box, resolution, model=None, cutter=None, tolerance=0,
+                      filename=None, callback=None):
+    """ run a complete toolpath through a stock height map (without visualization)
+
+    @param toolpath: pycam.Toolpath.Toolpath (its filters are applied)
+    @param box: the unprocessed stock (see StockSimulation)
+    @param model: the expected result (optional, see StockSimulation.get_result)
+    @param cutter: the tool (default: the tool of the toolpath)
+    @param filename: store the result in this file (see SimulationResult.save)
+    @param callback: called after each chunk of steps - the simulation is
+        aborted (returning None), if it returns True
+    @rtype: SimulationResult
+    """
+    if cutter is None:
+        cutter = toolpath.tool
+    if cutter is None:
+        raise ValueError("The toolpath does not define a tool - please specify a cutter.")
+    simulation = StockSimulation(box, resolution, cutter)
+    steps = toolpath.get_basic_moves()
+    for start in range(0, len(steps), PATH_CHUNK_SIZE):
+        simulation.add_steps(steps[start:start + PATH_CHUNK_SIZE])
+        if callback and callback():
+            _log.info("Toolpath simulation was aborted")
+            return None
+    result = simulation.get_result(model=model, tolerance=tolerance)
+    if filename is not None:
+        result.save(filename)
+    return result
@@ -18,7 +18,10 @@ You should have received a copy of the GNU General Public License
 along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import ctypes
+
+import math
+
+from pycam.Geometry import epsilon
 
 try:
     import OpenGL.GL as GL
@@ -27,31 +30,48 @@ try:
 except ImportError:
     GL_enabled = False
 
+try:
+    import numpy
+    numpy_enabled = True
+except ImportError:
+    numpy_enabled = False
+
 
 EPSILON = 1e-8
 
+# size of the tiles (in cells) for tracking changes and for the OpenGL display lists
 NUM_PER_CELL_X = 10
 NUM_PER_CELL_Y = 10
-NUM_CELL_X = 0
-NUM_CELL_Y = 0
 
-
-class ZBufferItem(object):
-    def __init__(self, z=0.0):
-        self.z = float(z)
-        self.changed = True
-        self.list = -1
+# maximum number of (sample, footprint cell) pairs to be processed at once
+STAMP_CHUNK_SIZE = 1000000
 
 
 class ZCellItem(object):
     def __init__(self):
         self.list = -1
-        self.array = None
+        self.vertex = None
+        self.normal = None
+        self.index = None
 
 
 class ZBuffer(object):
-    def __init__(self, minx, maxx, xres, miny, maxy, yres, minz, maxz):
-        global NUM_CELL_X, NUM_CELL_Y
+    """ height map of the stock for simulating the removal of material
+
+    The heights are stored in the numpy array "buf" (indexed by [y, x]). The
+    cell with the indices (x, y) is located at the position (self.x[x],
+    self.y[y]).
+    Changes are tracked for tiles of NUM_PER_CELL_X * NUM_PER_CELL_Y cells
+    (see "dirty"). Only the changed tiles are transferred to OpenGL.
+    """
+
+    def __init__(self, minx, maxx, xres, miny, maxy, yres, minz, maxz, initial_height=None):
+        """
+        @param initial_height: the height of the cells before any triangle or
+            cutter was added (default: minz)
+        """
+        if not numpy_enabled:
+            raise ImportError("The 'numpy' module is required for the simulation.")
         self.minx = float(minx)
         self.maxx = float(maxx)
         self.miny = float(miny)
@@ -60,132 +80,257 @@ class ZBuffer(object):
         self.maxz = float(maxz)
         self.xres = int(xres)
         self.yres = int(yres)
-        self.changed = True
-
-        NUM_CELL_X = self.xres / NUM_PER_CELL_X
-        NUM_CELL_Y = self.yres / NUM_PER_CELL_Y
-
-        self.x = [0.0] * self.xres
-        for i in range(0, self.xres):
-            self.x[i] = self.minx+(i * (self.maxx-self.minx)/self.xres)
-        self.y = [0.0] * self.yres
-        for i in range(0, self.yres):
-            self.y[i] = self.miny+(i * (self.maxy-self.miny)/self.yres)
-        self.buf = [[]] * self.yres
-        for y in range(0, self.yres):
-            self.buf[y] = [None] * self.xres
-            for x in range(0, self.xres):
-                self.buf[y][x] = ZBufferItem(self.minz)
-
-        self.list = [[]] * self.yres
-        for y in range(0, self.yres):
-            self.list[y] = [None] * self.xres
-            for x in range(0, self.xres):
-                self.list[y][x] = -1
-
-        self.cell = [None] * NUM_CELL_Y
-        for y in range(0, NUM_CELL_Y):
-            self.cell[y] = [None] * NUM_CELL_X
-            for x in range(0, NUM_CELL_X):
-                self.cell[y][x] = ZCellItem()
+        self.step_x = (self.maxx - self.minx) / self.xres
+        self.step_y = (self.maxy - self.miny) / self.yres
+        self.x = self.minx + numpy.arange(self.xres) * self.step_x
+        self.y = self.miny + numpy.arange(self.yres) * self.step_y
+        if initial_height is None:
+            initial_height = self.minz
+        self.buf = numpy.full((self.yres, self.xres), float(initial_height))
+        self.num_cell_x = int(math.ceil(self.xres / float(NUM_PER_CELL_X)))
+        self.num_cell_y = int(math.ceil(self.yres / float(NUM_PER_CELL_Y)))
+        self.dirty = numpy.ones((self.num_cell_y, self.num_cell_x), dtype=bool)
+        self.cell = [[ZCellItem() for x in range(self.num_cell_x)]
+                     for y in range(self.num_cell_y)]
+        # cells reachable by the cutters - for each cutter and resolution
+        # (see "get_tool_footprint")
+        self._footprints = {}
+
+    @property
+    def changed(self):
+        return bool(self.dirty.any())
+
+    def _get_index_range(self, low, high, start, step, count):
+        """ return the first and last (inclusive) index of the cells between low and high """
+        first = max(int(math.ceil((low - start) / step - EPSILON)), 0)
+        last = min(int(math.floor((high - start) / step + EPSILON)), count - 1)
+        return first, last
+
+    def _mark_changed(self, ys, xs):
+        """ mark the tiles containing the given cells (numpy arrays of indices) as dirty
+
+        The quads and normals of the preceding neighbours depend on a cell, too.
+        """
+        for dy in (0, -1):
+            for dx in (0, -1):
+                self.dirty[numpy.maximum(ys + dy, 0) // NUM_PER_CELL_Y,
+                           numpy.maximum(xs + dx, 0) // NUM_PER_CELL_X] = True
 
     def add_triangles(self, triangles):
         for t in triangles:
             self.add_triangle(t)
 
     def add_triangle(self, t):
-        minx = int((t.minx - self.minx) / (self.maxx - self.minx) * self.xres) - 1
-        maxx = int((t.maxx - self.minx) / (self.maxx - self.minx) * self.xres) + 1
-        miny = int((t.miny - self.miny) / (self.maxy - self.miny) * self.yres) - 1
-        maxy = int((t.maxy - self.miny) / (self.maxy - self.miny) * self.yres) + 2
-        if minx < 0:
-            minx = 0
-        if maxx > self.xres - 1:
-            maxx = self.xres - 1
-        if miny < 0:
-            miny = 0
-        if maxy > self.yres - 1:
-            maxy = self.yres - 1
-
-        for y in range(miny, maxy):
-            py = self.y[y]
-            for x in range(minx, maxx):
-                px = self.x[x]
-                v0x = t.p3[0] - t.p1[0]
-                v0y = t.p3[1] - t.p1[1]
-                v1x = t.p2[0] - t.p1[0]
-                v1y = t.p2[1] - t.p1[1]
-                v2x = px - t.p1[0]
-                v2y = py - t.p1[1]
-                dot00 = v0x*v0x + v0y*v0y
-                dot01 = v0x*v1x + v0y*v1y
-                dot02 = v0x*v2x + v0y*v2y
-                dot11 = v1x*v1x + v1y*v1y
-                dot12 = v1x*v2x + v1y*v2y
-                invDenom = 1 / (dot00 * dot11 - dot01 * dot01)
-                u = (dot11 * dot02 - dot01 * dot12) * invDenom
-                v = (dot00 * dot12 - dot01 * dot02) * invDenom
-                if (u >= -EPSILON) and (v >= -EPSILON) and (u + v <= 1-EPSILON):
-                    v0z = t.p3[2] - t.p1[2]
-                    v1z = t.p2[2] - t.p1[2]
-                    pz = t.p1[2] + v0z * u + v1z * v
-                    if pz > self.buf[y][x].z:
-                        self.buf[y][x].z = pz
-                        self.buf[y+0][x+0].changed = True
-                        self.buf[y+0][x+1].changed = True
-                        self.buf[y+1][x+0].changed = True
-                        self.buf[y+1][x+1].changed = True
-                        self.changed = True
-
-    def add_cutter(self, c):
-        cx = c.location[0]
-        cy = c.location[1]
-        rsq = c.radiussq
-        minx = int((c.minx - self.minx) / (self.maxx - self.minx) * self.xres) - 1
-        maxx = int((c.maxx - self.minx) / (self.maxx - self.minx) * self.xres) + 1
-        miny = int((c.miny - self.miny) / (self.maxy - self.miny) * self.yres) - 1
-        maxy = int((c.maxy - self.miny) / (self.maxy - self.miny) * self.yres) + 1
-        if minx < 0:
-            minx = 0
-        if maxx < 0:
-            maxx = 0
-        if minx > self.xres - 1:
-            minx = self.xres - 1
-        if maxx > self.xres - 1:
-            maxx = self.xres - 1
-        if miny < 0:
-            miny = 0
-        if maxy < 0:
-            maxy = 0
-        if maxy > self.yres - 1:
-            maxy = self.yres - 1
-        if miny > self.yres - 1:
-            miny = self.yres - 1
-        p = (0, 0, 0)
-        zaxis = (0, 0, -1)
-
-        for y in range(miny, maxy):
-            py = self.y[y]
-            p = (p[0], py, p[2])
-            for x in range(minx, maxx):
-                px = self.x[x]
-                p = (px, p[1], p[2])
-                if (px - cx) * (px - cx) + (py - cy) * (py - cy) <= rsq + EPSILON:
-                    (cl, ccp, cp, l) = c.intersect_point(zaxis, p)
-                    if ccp:
-                        pz = l
-                        if pz < self.buf[y][x].z:
-                            self.buf[y][x].z = pz
-                            self.buf[y+0][x+0].changed = True
-                            self.buf[y+0][x+1].changed = True
-                            self.buf[y+1][x+0].changed = True
-                            self.buf[y+1][x+1].changed = True
-                            self.changed = True
+        """ raise the cells within the xy projection of the triangle to its surface """
+        minx, maxx = self._get_index_range(t.minx, t.maxx, self.minx, self.step_x, self.xres)
+        miny, maxy = self._get_index_range(t.miny, t.maxy, self.miny, self.step_y, self.yres)
+        if (minx > maxx) or (miny > maxy):
+            return
+        v0x = t.p3[0] - t.p1[0]
+        v0y = t.p3[1] - t.p1[1]
+        v1x = t.p2[0] - t.p1[0]
+        v1y = t.p2[1] - t.p1[1]
+        dot00 = v0x * v0x + v0y * v0y
+        dot01 = v0x * v1x + v0y * v1y
+        dot11 = v1x * v1x + v1y * v1y
+        denom = dot00 * dot11 - dot01 * dot01
+        if denom == 0:
+            # vertical triangle
+            return
+        v2x = self.x[None, minx:maxx + 1] - t.p1[0]
+        v2y = self.y[miny:maxy + 1, None] - t.p1[1]
+        dot02 = v0x * v2x + v0y * v2y
+        dot12 = v1x * v2x + v1y * v2y
+        u = (dot11 * dot02 - dot01 * dot12) / denom
+        v = (dot00 * dot12 - dot01 * dot02) / denom
+        pz = t.p1[2] + (t.p3[2] - t.p1[2]) * u + (t.p2[2] - t.p1[2]) * v
+        window = self.buf[miny:maxy + 1, minx:maxx + 1]
+        raised = (u >= -EPSILON) & (v >= -EPSILON) & (u + v <= 1 + EPSILON) & (pz > window)
+        if raised.any():
+            window[raised] = pz[raised]
+            ys, xs = numpy.nonzero(raised)
+            self._mark_changed(ys + miny, xs + minx)
+
+    def _get_sample_spacing(self, cutter):
+        """ return the maximum horizontal length of the pieces of sampled moves """
+        return max(min(self.step_x, self.step_y), cutter.distance_radius / 2)
+
+    def get_tool_footprint(self, cutter):
+        """ return the cells that can be reached by a cutter moving along a piece of a sampled
+        move (see "_get_sample_spacing") starting within the center cell
+
+        The result contains the offsets (numpy arrays of y and x) relative to
+        the center cell and the same offsets as distances (in units of the
+        model). Footprints are cached for each shape and size of cutter and
+        for each resolution.
+        Only the cells are cached - the heights of the cutter within the
+        footprint depend on the position of each sample within its center
+        cell and on the direction of its move. Thus the profile of the cutter
+        is evaluated for every sample (see "_add_sampled_moves").
+        """
+        key = (cutter.__class__, cutter.radius, getattr(cutter, "minorradius", None),
+               cutter.get_required_distance(), self.step_x, self.step_y)
+        if key not in self._footprints:
+            radius = (cutter.distance_radius + self._get_sample_spacing(cutter)
+                      + math.hypot(self.step_x, self.step_y) / 2)
+            steps_x = int(math.floor(radius / self.step_x + EPSILON))
+            steps_y = int(math.floor(radius / self.step_y + EPSILON))
+            offset_x, offset_y = numpy.meshgrid(numpy.arange(-steps_x, steps_x + 1),
+                                                numpy.arange(-steps_y, steps_y + 1))
+            inside = (numpy.hypot(offset_x * self.step_x, offset_y * self.step_y)
+                      <= radius + epsilon)
+            offset_y, offset_x = offset_y[inside], offset_x[inside]
+            self._footprints[key] = (offset_y, offset_x, offset_y * self.step_y,
+                                     offset_x * self.step_x)
+        return self._footprints[key]
+
+    def _get_cell_indices(self, xs, ys):
+        """ return the indices of the cells nearest to the given positions (not clipped) """
+        return (numpy.rint((numpy.asarray(ys, dtype=float) - self.miny) / self.step_y).astype(int),
+                numpy.rint((numpy.asarray(xs, dtype=float) - self.minx) / self.step_x).astype(int))
+
+    def _get_window(self, c, minx, maxx, miny, maxy):
+        """ return the ranges of cell indices (inclusive) reachable by the cutter within the
+        given limits of its location
+        """
+        radius = c.distance_radius
+        x0, x1 = self._get_index_range(minx - radius, maxx + radius, self.minx, self.step_x,
+                                       self.xres)
+        y0, y1 = self._get_index_range(miny - radius, maxy + radius, self.miny, self.step_y,
+                                       self.yres)
+        return x0, x1, y0, y1
+
+    def _lower_window(self, c, z, x0, x1, y0, y1, distances):
+        """ lower the cells of a window to the cutter surface at the given distances """
+        radius = c.distance_radius
+        heights = z + c.get_profile_heights(numpy.minimum(distances, radius))
+        window = self.buf[y0:y1 + 1, x0:x1 + 1]
+        lowered = (distances <= radius + epsilon) & (heights < window)
+        if lowered.any():
+            window[lowered] = heights[lowered]
+            ys, xs = numpy.nonzero(lowered)
+            self._mark_changed(ys + y0, xs + x0)
+
+    def add_cutter(self, c, location=None):
+        """ remove the material below the cutter at its location """
+        if location is None:
+            location = c.location
+        x0, x1, y0, y1 = self._get_window(c, location[0], location[0], location[1], location[1])
+        if (x0 <= x1) and (y0 <= y1):
+            distances = numpy.hypot(self.x[None, x0:x1 + 1] - location[0],
+                                    self.y[y0:y1 + 1, None] - location[1])
+            self._lower_window(c, location[2], x0, x1, y0, y1, distances)
+
+    def add_cutter_path(self, c, positions):
+        """ remove the material along the moves of the cutter between the given positions
+
+        Horizontal moves are calculated exactly (based on the distance between
+        each cell and the move). All other moves are sampled (see
+        "_add_sampled_moves"). The cells of the tool footprint are processed
+        for all samples of all these moves at once.
+        @param positions: sequence of cutter locations
+        """
+        positions = numpy.asarray(positions, dtype=float).reshape((-1, 3))
+        if len(positions) == 0:
+            return
+        if len(positions) == 1:
+            self.add_cutter(c, positions[0])
+            return
+        starts = positions[:-1]
+        ends = positions[1:]
+        horizontal = ((numpy.abs(ends[:, 2] - starts[:, 2]) < EPSILON)
+                      & numpy.any(ends[:, :2] != starts[:, :2], axis=1))
+        for start, end in zip(starts[horizontal], ends[horizontal]):
+            self._add_horizontal_move(c, start, end)
+        if not horizontal.all():
+            self._add_sampled_moves(c, starts[~horizontal], ends[~horizontal])
+
+    def _add_horizontal_move(self, c, start, end):
+        vector = end - start
+        length = math.hypot(vector[0], vector[1])
+        # split long moves - the window of cells around a diagonal move is mostly empty
+        pieces = max(1, int(math.ceil(length / (4 * c.distance_radius))))
+        for index in range(pieces):
+            p1 = start + vector * (float(index) / pieces)
+            p2 = start + vector * (float(index + 1) / pieces)
+            x0, x1, y0, y1 = self._get_window(c, min(p1[0], p2[0]), max(p1[0], p2[0]),
+                                              min(p1[1], p2[1]), max(p1[1], p2[1]))
+            if (x0 > x1) or (y0 > y1):
+                continue
+            dx = self.x[None, x0:x1 + 1] - p1[0]
+            dy = self.y[y0:y1 + 1, None] - p1[1]
+            vx, vy = p2[0] - p1[0], p2[1] - p1[1]
+            ratio = numpy.clip((dx * vx + dy * vy) / (vx * vx + vy * vy), 0, 1)
+            distances = numpy.hypot(dx - ratio * vx, dy - ratio * vy)
+            self._lower_window(c, start[2], x0, x1, y0, y1, distances)
+
+    def _add_sampled_moves(self, c, starts, ends):
+        """ remove the material along moves that are not horizontal
+
+        The moves are split into short pieces. The height of a cell is
+        calculated for the point of a piece that is closest to the cell (in
+        the xy plane). This never cuts too deep. The error is limited by the
+        change of height along a piece (at most the size of a cell).
+        """
+        lower = numpy.minimum(starts, ends).min(axis=0)
+        upper = numpy.maximum(starts, ends).max(axis=0)
+        x0, x1, y0, y1 = self._get_window(c, lower[0], upper[0], lower[1], upper[1])
+        if (x0 > x1) or (y0 > y1):
+            return
+        vectors = ends - starts
+        counts = numpy.maximum(numpy.maximum(
+            numpy.ceil(numpy.hypot(vectors[:, 0], vectors[:, 1]) / self._get_sample_spacing(c)),
+            numpy.ceil(numpy.abs(vectors[:, 2]) / min(self.step_x, self.step_y))), 1).astype(int)
+        moves = numpy.repeat(numpy.arange(len(starts)), counts)
+        steps = numpy.arange(len(moves)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        pieces = vectors[moves] / counts[moves, None]
+        samples = starts[moves] + pieces * steps[:, None]
+        lengths_sq = pieces[:, 0] ** 2 + pieces[:, 1] ** 2
+        vertical = lengths_sq == 0
+        lengths_sq[vertical] = 1
+        sample_y, sample_x = self._get_cell_indices(samples[:, 0], samples[:, 1])
+        footprint_y, footprint_x, footprint_dy, footprint_dx = self.get_tool_footprint(c)
+        # the position of the center cell relative to the start of the piece
+        offset_x = self.minx + sample_x * self.step_x - samples[:, 0]
+        offset_y = self.miny + sample_y * self.step_y - samples[:, 1]
+        # The window is padded by the size of the footprint (beyond the limits of the grid).
+        # Thus all cells of the footprints are within the padded window.
+        pad_x, pad_y = footprint_x.max(), footprint_y.max()
+        padded_x0 = sample_x.min() - pad_x
+        padded_y0 = sample_y.min() - pad_y
+        width = sample_x.max() + pad_x - padded_x0 + 1
+        height = sample_y.max() + pad_y - padded_y0 + 1
+        padded = numpy.full((height, width), numpy.inf)
+        window = padded[y0 - padded_y0:y1 - padded_y0 + 1, x0 - padded_x0:x1 - padded_x0 + 1]
+        window[:] = self.buf[y0:y1 + 1, x0:x1 + 1]
+        flat = padded.ravel()
+        bases = (sample_y - padded_y0) * width + sample_x - padded_x0
+        footprint = footprint_y * width + footprint_x
+        radius = c.distance_radius
+        chunk_size = max(1, STAMP_CHUNK_SIZE // len(footprint))
+        for chunk_start in range(0, len(samples), chunk_size):
+            chunk = slice(chunk_start, chunk_start + chunk_size)
+            dx = offset_x[chunk, None] + footprint_dx
+            dy = offset_y[chunk, None] + footprint_dy
+            vx, vy, vz = pieces[chunk, 0, None], pieces[chunk, 1, None], pieces[chunk, 2, None]
+            # the closest point of the piece - or the lower end of vertical pieces
+            ratios = numpy.where(vertical[chunk, None], vz < 0,
+                                 numpy.clip((dx * vx + dy * vy) / lengths_sq[chunk, None], 0, 1))
+            distances = numpy.hypot(dx - ratios * vx, dy - ratios * vy)
+            heights = (samples[chunk, 2, None] + ratios * vz
+                       + c.get_profile_heights(numpy.minimum(distances, radius)))
+            heights[distances > radius + epsilon] = numpy.inf
+            numpy.minimum.at(flat, (bases[chunk, None] + footprint).ravel(), heights.ravel())
+        lowered = window < self.buf[y0:y1 + 1, x0:x1 + 1]
+        if lowered.any():
+            self.buf[y0:y1 + 1, x0:x1 + 1] = window
+            ys, xs = numpy.nonzero(lowered)
+            self._mark_changed(ys + y0, xs + x0)
 
     def to_OpenGL(self):
         if GL_enabled:
             self.to_OpenGL_6()
-        self.changed = False
+        self.dirty[:] = False
 
     def normal(self, z0, z1, z2):
         nx = 1.0 / self.xres
@@ -193,94 +338,55 @@ class ZBuffer(object):
         nz = 1.0 / (self.maxz - self.minz)
         return (-ny * (z1 - z0) * nz / nx, -nx * (z2 - z1) * nz / ny, nx * ny / nz * 100)
 
+    def _get_cell_arrays(self, y0, y1, x0, x1):
+        """ return the vertices, normals and quad indices of a tile (as numpy arrays) """
+        ys, xs = numpy.meshgrid(numpy.arange(y0, y1), numpy.arange(x0, x1), indexing="ij")
+        vertex = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.float32)
+        vertex[:, :, 0] = self.x[xs]
+        vertex[:, :, 1] = self.y[ys]
+        vertex[:, :, 2] = self.buf[ys, xs]
+        # the normals along the upper borders are based on the preceding cells
+        border = (xs == self.xres - 1) | (ys == self.yres - 1)
+        ys = numpy.where(border, ys - 1, ys)
+        xs = numpy.where(border, xs - 1, xs)
+        normal = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.float32)
+        for axis, value in enumerate(self.normal(self.buf[ys, xs], self.buf[ys, xs + 1],
+                                                 self.buf[ys + 1, xs])):
+            normal[:, :, axis] = value
+        width = x1 - x0
+        corners = (numpy.arange(y1 - y0 - 1)[:, None] * width
+                   + numpy.arange(x1 - x0 - 1)[None, :]).ravel()
+        index = numpy.stack((corners, corners + width, corners + width + 1, corners + 1),
+                            axis=1).ravel().astype(numpy.uint16)
+        return vertex.reshape((-1, 3)), normal.reshape((-1, 3)), index
+
     # use display list with vertex and normal and index buffers per cell
     # (cell = group of quads)
     def to_OpenGL_6(self):
-        num_cell_x = NUM_CELL_X
-        num_cell_y = NUM_CELL_Y
-
-        dy = self.yres/num_cell_y
-        if dy < 2:
-            num_cell_y = 1
-            dy = self.yres
-        dx = self.xres/num_cell_x
-        if dx < 2:
-            num_cell_x = 1
-            dx = self.xres
-
         GL.glEnableClientState(GL.GL_INDEX_ARRAY)
         GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
         GL.glEnableClientState(GL.GL_NORMAL_ARRAY)
 
-        for y in range(num_cell_y):
-            y0 = y * dy
-            y1 = y0 + dy + 1
-            if y1 > self.yres:
-                y1 = self.yres
-            for x in range(num_cell_x):
-                x0 = x * dx
-                x1 = x0 + dx + 1
-                if x1 > self.xres:
-                    x1 = self.xres
-
-                changed = False
-
-                if self.changed:
-                    for yi in range(y0, y1 - 1):
-                        for xi in range(x0, x1 - 1):
-                            if self.buf[yi][xi].changed:
-                                changed = True
-                                break
-
-                if changed:
-                    if self.cell[y][x].list == -1:
-                        self.cell[y][x].list = GL.glGenLists(1)
-                        self.cell[y][x].vertex = (ctypes.c_float * 3 * ((y1-y0) * (x1 - x0)))()
-                        self.cell[y][x].normal = (ctypes.c_float * 3 * ((y1-y0) * (x1 - x0)))()
-                        self.cell[y][x].index = (ctypes.c_ushort
-                                                 * (4 * (y1 - y0 - 1) * (x1 - x0 - 1)))()
-                    glIndexPointers(self.cell[y][x].index)
-                    glVertexPointerf(self.cell[y][x].vertex)
-                    glNormalPointerf(self.cell[y][x].normal)
-
-                    GL.glNewList(self.cell[y][x].list, GL.GL_COMPILE)
-                    idx = 0
-                    for yi in range(y0, y1):
-                        for xi in range(x0, x1):
-                            self.buf[yi][xi].changed = False
-                            self.cell[y][x].vertex[idx][0] = self.x[xi]
-                            self.cell[y][x].vertex[idx][1] = self.y[yi]
-                            self.cell[y][x].vertex[idx][2] = self.buf[yi][xi].z
-
-                            if (xi == self.xres - 1) or (yi == self.yres - 1):
-                                n = self.normal(self.buf[yi-1][xi-1].z, self.buf[yi-1][xi].z,
-                                                self.buf[yi][xi-1].z)
-                            else:
-                                n = self.normal(self.buf[yi][xi].z, self.buf[yi][xi+1].z,
-                                                self.buf[yi+1][xi].z)
-                            self.cell[y][x].normal[idx][0] = n[0]
-                            self.cell[y][x].normal[idx][1] = n[1]
-                            self.cell[y][x].normal[idx][2] = n[2]
-
-                            idx += 1
-
-                    idx = 0
-                    for yi in range(y0, y1 - 1):
-                        for xi in range(x0, x1 - 1):
-                            self.cell[y][x].index[idx + 0] = ((yi - y0 + 0)
-                                                              * (x1 - x0) + (xi - x0 + 0))
-                            self.cell[y][x].index[idx + 1] = ((yi - y0 + 1)
-                                                              * (x1 - x0) + (xi - x0 + 0))
-                            self.cell[y][x].index[idx + 2] = ((yi - y0 + 1)
-                                                              * (x1 - x0) + (xi - x0 + 1))
-                            self.cell[y][x].index[idx + 3] = ((yi - y0 + 0)
-                                                              * (x1 - x0) + (xi - x0 + 1))
-                            idx += 4
-
-                    GL.glDrawElements(GL.GL_QUADS, idx, GL.GL_UNSIGNED_SHORT,
-                                      self.cell[y][x].index)
+        for y in range(self.num_cell_y):
+            y0 = y * NUM_PER_CELL_Y
+            y1 = min(y0 + NUM_PER_CELL_Y + 1, self.yres)
+            for x in range(self.num_cell_x):
+                x0 = x * NUM_PER_CELL_X
+                x1 = min(x0 + NUM_PER_CELL_X + 1, self.xres)
+                cell = self.cell[y][x]
+                if self.dirty[y, x] or (cell.list == -1):
+                    if cell.list == -1:
+                        cell.list = GL.glGenLists(1)
+                    cell.vertex, cell.normal, cell.index = self._get_cell_arrays(y0, y1, x0, x1)
+                    glIndexPointers(cell.index)
+                    glVertexPointerf(cell.vertex)
+                    glNormalPointerf(cell.normal)
+
+                    GL.glNewList(cell.list, GL.GL_COMPILE)
+                    GL.glDrawElements(GL.GL_QUADS, len(cell.index), GL.GL_UNSIGNED_SHORT,
+                                      cell.index)
                     GL.glEndList()
-                GL.glCallList(self.cell[y][x].list)
+                GL.glCallList(cell.list)
 
         GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
         GL.glDisableClientState(GL.GL_NORMAL_ARRAY)
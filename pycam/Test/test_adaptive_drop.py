@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Cutters.ToroidalCutter import ToroidalCutter
+from pycam.Geometry.Model import Model
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.PathGenerators import get_max_height_adaptive, get_max_height_triangles
+
+
+def get_wavy_model(size):
+    model = Model()
+    get_point = lambda x, y: (x, y, math.sin(x / 2.0) * math.cos(y / 3.0))
+    for x in range(size):
+        for y in range(size):
+            p1, p2, p3, p4 = (get_point(x, y), get_point(x + 1, y), get_point(x + 1, y + 1),
+                              get_point(x, y + 1))
+            model.append(Triangle(p1, p3, p2))
+            model.append(Triangle(p1, p4, p3))
+    return model
+
+
+def interpolate(points, x):
+    for p1, p2 in zip(points, points[1:]):
+        if p1[0] <= x <= p2[0]:
+            return p1[2] + (x - p1[0]) / (p2[0] - p1[0]) * (p2[2] - p1[2])
+
+
+class AdaptiveResampling(pycam.Test.PycamTestCase):
+    """Error-bounded resampling of grid lines"""
+
+    def setUp(self):
+        self.model = get_wavy_model(20)
+        self.positions = [(3 + 0.5 * index, 10.3) for index in range(29)]
+
+    def test_tolerance(self):
+        "Chordal error"
+        for cutter in (SphericalCutter(2), ToroidalCutter(2, 0.5)):
+            points = get_max_height_adaptive(self.model, cutter, self.positions, -5, 5, 0.01)
+            self.assertEqual(points[0][0], 3)
+            self.assertEqual(points[-1][0], 17)
+            for index in range(141):
+                x = 3 + index / 10.0
+                exact = get_max_height_triangles(self.model, cutter, x, 10.3, -5, 5)
+                self.assertTrue(abs(interpolate(points, x) - exact[2]) <= 0.01)
+
+    @pytest.mark.skipif(not numpy_enabled, reason="the batch engine requires numpy")
+    def test_batch(self):
+        "Batch calculation"
+        cutter = SphericalCutter(2)
+        self.assertEqual(
+            get_max_height_adaptive(self.model, cutter, self.positions, -5, 5, 0.01, batch=True),
+            get_max_height_adaptive(self.model, cutter, self.positions, -5, 5, 0.01))
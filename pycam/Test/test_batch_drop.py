@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import random
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Cutters.ToroidalCutter import ToroidalCutter
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Importers.STLImporter import ImportModel
+from pycam.PathGenerators import get_max_height_batch, get_max_height_triangles
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "samples")
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="the batch engine requires numpy")
+class BatchDropCutter(pycam.Test.PycamTestCase):
+    """Batch drop cutter compared with the per-triangle calculation"""
+
+    def _compare(self, filename, cutters, count=100):
+        model = ImportModel(os.path.join(SAMPLES_DIR, filename))
+        width = model.maxx - model.minx
+        height = model.maxy - model.miny
+        randomizer = random.Random(filename)
+        positions = [(randomizer.uniform(model.minx - 0.1 * width, model.maxx + 0.1 * width),
+                      randomizer.uniform(model.miny - 0.1 * height, model.maxy + 0.1 * height))
+                     for _ in range(count)]
+        minz, maxz = model.minz - 1, model.maxz + 1
+        for cutter in cutters:
+            expected = [get_max_height_triangles(model, cutter, x, y, minz, maxz)
+                        for x, y in positions]
+            result = get_max_height_batch(model, cutter, positions, minz, maxz)
+            for point, wanted in zip(result, expected):
+                if wanted is None:
+                    self.assertIsNone(point)
+                else:
+                    self.assertVectorEqual(point, wanted)
+
+    def test_sample_scene(self):
+        "Sample scene"
+        self._compare("SampleScene.stl", (CylindricalCutter(0.5), CylindricalCutter(1.5),
+                                          SphericalCutter(0.5), SphericalCutter(0.2),
+                                          ToroidalCutter(0.5, 0.15), ToroidalCutter(1.0, 0.25)))
+
+    def test_sphere(self):
+        "Sphere"
+        self._compare("Sphere0.stl", (CylindricalCutter(0.25), SphericalCutter(0.25),
+                                      ToroidalCutter(0.5, 0.125)))
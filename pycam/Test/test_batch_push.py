@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import random
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Cutters.ToroidalCutter import ToroidalCutter
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Importers.STLImporter import ImportModel
+from pycam.PathGenerators import get_free_paths_triangles
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "samples")
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="the vectorized collision requires numpy")
+class BatchPushCutter(pycam.Test.PycamTestCase):
+    """Vectorized free paths compared with the per-triangle calculation"""
+
+    def _compare(self, filename, cutters, count=20):
+        model = ImportModel(os.path.join(SAMPLES_DIR, filename))
+        randomizer = random.Random(filename)
+        lines = []
+        for _ in range(count):
+            z = randomizer.uniform(model.minz, model.maxz)
+            if randomizer.random() < 0.5:
+                y = randomizer.uniform(model.miny, model.maxy)
+                lines.append(((model.minx - 1, y, z), (model.maxx + 1, y, z)))
+            else:
+                x = randomizer.uniform(model.minx, model.maxx)
+                lines.append(((x, model.maxy + 1, z), (x, model.miny - 1, z)))
+        for cutter in cutters:
+            for p1, p2 in lines:
+                expected = get_free_paths_triangles([model], cutter, p1, p2,
+                                                    return_triangles=True)
+                result = get_free_paths_triangles([model], cutter, p1, p2, batch=True)
+                self.assertEqual(len(result), len(expected))
+                for point, (wanted, triangle, cp) in zip(result, expected):
+                    self.assertVectorEqual(point, wanted)
+                # the contact points are calculated for the colliding triangles
+                self.assertEqual(get_free_paths_triangles([model], cutter, p1, p2,
+                                                          return_triangles=True, batch=True),
+                                 expected)
+
+    def test_sample_scene(self):
+        "Sample scene"
+        self._compare("SampleScene.stl", (CylindricalCutter(0.5), SphericalCutter(0.2),
+                                          ToroidalCutter(0.5, 0.15)))
+
+    def test_sphere(self):
+        "Sphere"
+        self._compare("Sphere0.stl", (CylindricalCutter(0.25), SphericalCutter(0.25),
+                                      ToroidalCutter(0.5, 0.125)))
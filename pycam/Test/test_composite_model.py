@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import pycam.Test
+from pycam.Geometry.Model import CompositeModel, get_combined_model, Model
+from pycam.Geometry.Triangle import Triangle
+
+
+def get_model(offset_x, count):
+    model = Model()
+    for index in range(count):
+        x = offset_x + 2 * index
+        model.append(Triangle((x, 0, 0), (x, 1, 1), (x + 1, 0, 0)))
+    return model
+
+
+class CompositeModelQueries(pycam.Test.PycamTestCase):
+    """Combination of models without copying triangles"""
+
+    def test_combine(self):
+        "Combined models"
+        model1 = get_model(0, 5)
+        model2 = get_model(20, 3)
+        self.assertIs(get_combined_model([None, model1]), model1)
+        combined = get_combined_model([model1, None, model2])
+        self.assertIsInstance(combined, CompositeModel)
+        self.assertEqual(len(combined), 8)
+        self.assertEqual((combined.minx, combined.maxx, combined.maxz), (0, 25, 1))
+        # the triangles are not copied
+        self.assertEqual(combined.triangles(), model1.triangles() + model2.triangles())
+        self.assertEqual(combined.triangles(3, -1, -1, 21, 1, 1),
+                         model1.triangles()[1:] + model2.triangles()[:1])
+        # the combination is identified by the models
+        uuid = combined.uuid
+        self.assertEqual(CompositeModel([model1, model2]).uuid, uuid)
+        model2.append(Triangle((0, 5, 0), (0, 6, 0), (1, 5, 0)))
+        self.assertNotEqual(combined.uuid, uuid)
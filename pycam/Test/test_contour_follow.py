@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import pycam.Test
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Importers.STLImporter import ImportModel
+from pycam.PathGenerators import ContourFollow
+from pycam.PathProcessors import BasePathProcessor
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "samples")
+
+
+class PathRecorder(BasePathProcessor):
+
+    def __init__(self):
+        super(PathRecorder, self).__init__()
+        self.points = []
+
+    def append(self, point):
+        self.points.append(point)
+
+    def new_scanline(self):
+        pass
+
+    def end_scanline(self):
+        pass
+
+
+class ContourFollowTiles(pycam.Test.PycamTestCase):
+    """Contour-follow processing of xy tiles"""
+
+    def setUp(self):
+        self.model = ImportModel(os.path.join(SAMPLES_DIR, "TestModel.stl"))
+        model = self.model
+        self.bounds = (model.minx - 2, model.maxx + 2, model.miny - 2, model.maxy + 2)
+
+    def test_tiles(self):
+        "Each triangle belongs to one tile"
+        minx, maxx, miny, maxy = self.bounds
+        self.assertEqual(len(ContourFollow._get_tiles(self.model, minx, maxx, miny, maxy, 1)), 1)
+        for count in (4, 9, 10):
+            tiles = ContourFollow._get_tiles(self.model, minx, maxx, miny, maxy, count)
+            self.assertTrue(len(tiles) > 1)
+            self.assertEqual(sorted(sum(tiles, [])), list(range(len(self.model))))
+
+    def test_independent_of_tiles(self):
+        "The toolpath does not depend on the number of tiles"
+        results = []
+        for count in (1, 9):
+            generator = ContourFollow.ContourFollow(PathRecorder())
+            minx, maxx, miny, maxy = self.bounds
+            generator._get_tiles = lambda model, minx, maxx, miny, maxy: \
+                ContourFollow._get_tiles(model, minx, maxx, miny, maxy, count)
+            generator.GenerateToolPath(SphericalCutter(1), [self.model], minx, maxx, miny, maxy,
+                                       self.model.minz, self.model.maxz, 1)
+            results.append(generator.pa.points)
+        self.assertTrue(results[0])
+        self.assertEqual(results[0], results[1])
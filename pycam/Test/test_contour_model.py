@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import random
+
+import pycam.Test
+from pycam.Geometry.Line import Line
+from pycam.Geometry.Model import ContourModel
+
+
+def get_square_lines(x, y, size, reverse=False):
+    points = [(x, y, 0), (x + size, y, 0), (x + size, y + size, 0), (x, y + size, 0)]
+    if reverse:
+        points.reverse()
+    return [Line(p1, p2) for p1, p2 in zip(points, points[1:] + points[:1])]
+
+
+class ContourModelLinking(pycam.Test.PycamTestCase):
+    """Connecting lines and polygons of a contour model"""
+
+    def test_shuffled_lines(self):
+        "Lines in random order"
+        lines = []
+        for index in range(50):
+            lines.extend(get_square_lines(3 * (index % 10), 3 * (index // 10), 2,
+                                          reverse=(index % 2 == 0)))
+        random.Random(7).shuffle(lines)
+        model = ContourModel()
+        for line in lines:
+            model.append(line)
+        polygons = model.get_polygons()
+        self.assertEqual(len(polygons), 50)
+        for polygon in polygons:
+            self.assertTrue(polygon.is_closed)
+            self.assertEqual(len(polygon.get_points()), 4)
+            self.assertEqual(abs(polygon.get_area()), 4)
+
+    def test_allow_reverse(self):
+        "Merging open polygons with different directions"
+        lines = get_square_lines(0, 0, 2)
+        model = ContourModel()
+        model.append(lines[0])
+        model.append(lines[2])
+        self.assertEqual(len(model.get_polygons()), 2)
+        # connects the start of the first polygon with the end of the second polygon
+        model.append(lines[3])
+        self.assertEqual(len(model.get_polygons()), 1)
+        # the reversed line connects the remaining ends
+        model.append(Line(lines[1].p2, lines[1].p1), allow_reverse=True)
+        self.assertEqual(len(model.get_polygons()), 1)
+        self.assertTrue(model.get_polygons()[0].is_closed)
+        # a new polygon starting at a point of a closed polygon
+        model.append(Line((0, 0, 0), (-1, -1, 0)))
+        self.assertEqual(len(model.get_polygons()), 2)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import decimal
+import io
+import os
+import random
+
+import pycam.Test
+from pycam.Exporters.GCode.LinuxCNC import LinuxCNC
+import pycam.Toolpath.Filters as Filters
+from pycam.Toolpath.Steps import MoveStraight, MoveStraightRapid, MoveSafety, Comment
+
+
+def get_moves():
+    return [Comment("start"), MoveStraight((1, 2, 0)), MoveStraight((1.5, 2, 0)),
+            MoveStraight((1.5, 2, 0)), MoveStraight((1.5, 2.0004, -0.25)),
+            MoveStraightRapid((1.5, 2.0004, 3)), MoveStraight((1.5, 2.0004, 3)), MoveSafety()]
+
+
+class StepQuantization(pycam.Test.PycamTestCase):
+    """Conversion of coordinates into integer units of the step width"""
+
+    def test_rounding(self):
+        "Rounding like the text representation"
+        rnd = random.Random(7)
+        numbers = [0.0005, 0.0015, 1.0005, -2.5, 2.5, 0.1, -0.0004, 12345678.9, 1e12 + 0.5]
+        numbers.extend(rnd.uniform(-1000, 1000) for _ in range(1000))
+        numbers.extend(round(rnd.uniform(-100, 100), 3) + 0.0005 for _ in range(1000))
+        for step_width in (1, 0.1, 0.001, 0.0025):
+            quantize, min_units = Filters._get_num_quantizer(step_width)
+            digits = Filters._get_num_of_significant_digits(step_width)
+            for number in numbers:
+                expected = decimal.Decimal("%.*f" % (digits, number)).scaleb(digits)
+                self.assertEqual(quantize(number), int(expected))
+            # the smallest number of units (as a decimal number) not below the step width
+            step = decimal.Decimal(min_units).scaleb(-digits)
+            self.assertTrue(step >= step_width)
+            self.assertTrue(step - decimal.Decimal(1).scaleb(-digits) < step_width)
+
+    def test_step_width(self):
+        "Skipped moves below the step width"
+        moves = [MoveStraight((0, 0, 0)), MoveStraight((0.0004, 0, 0)),
+                 MoveStraight((0.0011, 0.0004, 0)), MoveStraight((0.0011, 0.0016, 0.1)),
+                 MoveStraight((0.0025, 0.0016, 0.2))]
+        result = moves | Filters.StepWidth(0.001, 0.001, 0.1)
+        # the step widths (as binary floats) are slightly larger than 1/1000 and 1/10
+        self.assertEqual([step.position for step in result],
+                         [(0, 0, 0), [0, 0.0016, 0], [0.0025, 0.0016, 0.2]])
+
+
+class LinuxCNCExport(pycam.Test.PycamTestCase):
+    """GCode export for LinuxCNC"""
+
+    def _export(self, moves, filters):
+        destination = io.StringIO()
+        generator = LinuxCNC(destination)
+        generator.add_filters(filters)
+        generator.add_moves(moves)
+        generator.finish()
+        return destination.getvalue()
+
+    def test_output(self):
+        "Moves and machine settings"
+        filters = [Filters.MachineSetting("feedrate", 200), Filters.SafetyHeight(5)]
+        expected = (
+            "G40\t; disable tool radius compensation", "G49\t; disable tool length compensation",
+            "G80\t; cancel modal motion", "G54\t; select coordinate system 1",
+            "G90\t; disable incremental moves", "G21\t; metric", "F200\t; set feedrate",
+            "; start", "G0 X1.000000 Y2.000000 Z5.000000", "G1 Z0.000000", "  X1.500000",
+            "  Y2.000400 Z-0.250000", "G0 Z3.000000", "G1", "G0 Z5.000000",
+            "M2\t; end program", "")
+        self.assertEqual(self._export(get_moves(), filters), os.linesep.join(expected))
+
+    def test_buffer(self):
+        "Output in small chunks"
+        filters = [Filters.SafetyHeight(5)]
+        expected = self._export(get_moves(), filters)
+        LinuxCNC.WRITE_BUFFER_SIZE = 10
+        try:
+            self.assertEqual(self._export(get_moves(), filters), expected)
+        finally:
+            del LinuxCNC.WRITE_BUFFER_SIZE
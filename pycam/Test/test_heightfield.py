@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Cutters.ToroidalCutter import ToroidalCutter
+from pycam.Geometry import Box3D, Point3D
+import pycam.Geometry.HeightField
+from pycam.Geometry.HeightField import HeightField, get_minimum_resolution, numpy_enabled
+from pycam.Geometry.Model import Model
+from pycam.Geometry.Triangle import Triangle
+from pycam.Importers.STLImporter import ImportModel
+from pycam.PathGenerators import get_max_height_batch
+from pycam.PathGenerators.DropCutter import DropCutter, DropCutterEngine
+import pycam.Toolpath.MotionGrid
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "samples")
+
+
+def get_ramp(slope):
+    """ a square (20 x 20) rising along the x axis """
+    model = Model()
+    model.append(Triangle((0, 0, 0), (20, 20, 20 * slope), (20, 0, 20 * slope)))
+    model.append(Triangle((0, 0, 0), (0, 20, 0), (20, 20, 20 * slope)))
+    return model
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="height fields require numpy")
+class HeightFieldSurfacing(pycam.Test.PycamTestCase):
+    """Cutter locations based on a rasterized model"""
+
+    def test_flat_surface(self):
+        "Flat surface"
+        field = HeightField(-5, 25, -5, 25, 0.25)
+        field.add_model(get_ramp(0))
+        for cutter in (CylindricalCutter(2), SphericalCutter(2), ToroidalCutter(2, 0.5)):
+            heights = field.get_cutter_locations(cutter).get_heights([10, 1.1, 19.4, 30],
+                                                                     [10, 3.6, 19.9, 10], -1)
+            self.assertEqual(heights.tolist(), [0, 0, 0, -1])
+
+    def test_drop_cutter(self):
+        "Deviation from the exact cutter locations"
+        model = get_ramp(0.5)
+        box = Box3D(Point3D(0, 0, 0), Point3D(20, 20, 10))
+        cutter = SphericalCutter(2)
+        grid = list(pycam.Toolpath.MotionGrid.get_fixed_grid(
+            box, None, step_width=0.5, line_distance=2,
+            grid_direction=pycam.Toolpath.MotionGrid.GridDirection.X))
+        generator = DropCutter(engine=DropCutterEngine.HEIGHTFIELD, resolution=0.1)
+        path = generator.GenerateToolPath(cutter, [model], grid, minz=0, maxz=20)
+        # the exact location on the slope is raised by: radius * (sqrt(1 + slope ^ 2) - 1)
+        offset = 2 * ((1 + 0.5 ** 2) ** 0.5 - 1)
+        for move in path:
+            if (move.position is not None) and (2 < move.position[0] < 18):
+                exact = move.position[0] / 2 + offset
+                self.assertTrue(exact - 1e-6 <= move.position[2] < exact + 0.15)
+        self.assertTrue(0 < generator.max_deviation < 0.15)
+
+    def test_no_gouging(self):
+        "Cutter locations are never below the exact locations"
+        model = ImportModel(os.path.join(SAMPLES_DIR, "SampleScene.stl"))
+        count = 30
+        positions = [(model.minx + (model.maxx - model.minx) * ix / (count - 1),
+                      model.miny + (model.maxy - model.miny) * iy / (count - 1))
+                     for iy in range(count) for ix in range(count)]
+        minz = model.minz - 1
+        maxz = model.maxz + 10
+        for cutter in (SphericalCutter(1), SphericalCutter(0.5), ToroidalCutter(1, 0.25)):
+            points = DropCutter(engine=DropCutterEngine.HEIGHTFIELD)._get_heightfield_lines(
+                model, cutter, [positions], minz, maxz)[0]
+            exact = get_max_height_batch(model, cutter, positions, minz, maxz)
+            for point, exact_point in zip(points, exact):
+                self.assertTrue(point[2] >= exact_point[2] - 1e-6)
+
+    def test_size_limit(self):
+        "Limited number of grid nodes"
+        self.assertRaises(ValueError, HeightField, 0, 100, 0, 50, 0.5, max_nodes=10000)
+        resolution = get_minimum_resolution(100, 50, max_nodes=10000)
+        field = HeightField(0, 100, 0, 50, resolution, max_nodes=10000)
+        self.assertTrue(9000 < field.width * field.height <= 10000)
+        # the resolution of the engine is coarsened automatically
+        model = get_ramp(0.5)
+        positions = [(x, 10) for x in range(21)]
+        original_limit = pycam.Geometry.HeightField.MAX_NODES
+        pycam.Geometry.HeightField.MAX_NODES = 1000
+        try:
+            points = DropCutter(engine=DropCutterEngine.HEIGHTFIELD, resolution=0.01) \
+                ._get_heightfield_lines(model, SphericalCutter(2), [positions], 0, 20)[0]
+        finally:
+            pycam.Geometry.HeightField.MAX_NODES = original_limit
+        exact = get_max_height_batch(model, SphericalCutter(2), positions, 0, 20)
+        for point, exact_point in zip(points, exact):
+            self.assertTrue(exact_point[2] - 1e-6 <= point[2] < exact_point[2] + 2)
+
+    def test_progress(self):
+        "Progress and cancellation"
+        model = get_ramp(0.5)
+        positions = [(x, 10) for x in range(21)]
+        progress = []
+
+        def callback(text=None, percent=None):
+            progress.append(percent)
+
+        generator = DropCutter(engine=DropCutterEngine.HEIGHTFIELD)
+        self.assertTrue(generator._get_heightfield_lines(model, SphericalCutter(2), [positions],
+                                                         0, 20, callback=callback))
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], 100)
+        self.assertIn(50, progress)
+        # cancel during the rasterization and during the calculation of the cutter locations
+        for limit in (1, progress.index(50) + 2):
+            calls = []
+
+            def cancel(text=None, percent=None):
+                calls.append(percent)
+                return len(calls) >= limit
+
+            self.assertIsNone(generator._get_heightfield_lines(
+                model, SphericalCutter(2), [positions], 0, 20, callback=cancel))
+            self.assertEqual(len(calls), limit)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Geometry import Box3D
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Simulation.Playback import PlaybackCursor
+from pycam.Simulation.StockSimulation import StockSimulation
+from pycam.Toolpath import Toolpath
+from pycam.Toolpath.Steps import MachineSetting, MoveSafety, MoveStraight, MoveStraightRapid
+
+
+def get_toolpath(safety_move=True):
+    path = [MachineSetting("feedrate", 200), MoveStraightRapid((0, 0, 5))]
+    for index in range(20):
+        angle = index * math.pi / 10
+        path.append(MoveStraight((5 + 4 * math.cos(angle), 5 + 4 * math.sin(angle),
+                                  3 - index / 10.0)))
+        if index == 10:
+            if safety_move:
+                path.append(MoveSafety())
+            path.append(MachineSetting("feedrate", 50))
+    # a move without a distance
+    path.extend([MoveStraight((5, 5, 1)), MoveStraight((5, 5, 1)), MoveStraight((9, 9, 1))])
+    return Toolpath(toolpath_path=path, tool=SphericalCutter(1))
+
+
+class ToolpathPlayback(pycam.Test.PycamTestCase):
+    """Progress of a toolpath over time"""
+
+    def assert_moves_equal(self, moves1, moves2):
+        self.assertEqual(len(moves1), len(moves2))
+        for move1, move2 in zip(moves1, moves2):
+            self.assertEqual(move1.action, move2.action)
+            for value1, value2 in zip(move1.position, move2.position):
+                self.assertAlmostEqual(value1, value2)
+
+    def test_time_limit(self):
+        "Equivalence with the TimeLimit filter"
+        toolpath = get_toolpath()
+        cursor = PlaybackCursor(toolpath)
+        self.assertEqual(cursor.duration, toolpath.get_machine_time())
+        times = [-1, 0] + [cursor.duration * index / 37.0 for index in range(40)]
+        # the end of the zero-length move
+        times.append(cursor._times[-2])
+        for time in times + list(reversed(times)):
+            cursor.seek(time)
+            expected = toolpath.get_moves(max_time=time)
+            self.assert_moves_equal(cursor.get_moves(), expected)
+            if expected:
+                for value1, value2 in zip(cursor.get_position(), expected[-1].position):
+                    self.assertAlmostEqual(value1, value2)
+            else:
+                self.assertIsNone(cursor.get_position())
+
+    @pytest.mark.skipif(not numpy_enabled, reason="the simulation requires numpy")
+    def test_simulation(self):
+        "Incremental simulation with checkpoints"
+        # the TimeLimit filter drops safety moves
+        toolpath = get_toolpath(safety_move=False)
+        box = Box3D((0, 0, 0), (10, 10, 4))
+        simulation = StockSimulation(box, 0.2, toolpath.tool)
+        cursor = PlaybackCursor(toolpath, simulation=simulation, checkpoints=4)
+        duration = cursor.duration
+        times = [duration * index / 13.0 for index in range(15)]
+        for time in times + [0.4 * duration, 0.7 * duration]:
+            cursor.seek(time)
+            expected = StockSimulation(box, 0.2, toolpath.tool)
+            expected.add_steps(toolpath.get_moves(max_time=time))
+            # moves split by the cursor are sampled differently (errors below a cell)
+            self.assertTrue((abs(simulation.heights - expected.heights) < 0.2).all())
+            self.assertTrue(abs(simulation.heights - expected.heights).mean() < 0.001)
+        self.assertTrue(len(cursor._checkpoints) <= 5)
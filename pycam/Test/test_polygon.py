@@ -1,5 +1,11 @@
-from pycam.Geometry.Polygon import Polygon
+import math
+import random
+import time
+
+from pycam.Geometry import epsilon
+from pycam.Geometry.Polygon import Polygon, _get_overlapping_pairs, _split_at_intersections
 from pycam.Geometry.Line import Line
+from pycam.Geometry.PointUtils import pdist
 
 
 def assert_polygons_are_identical(polygon0, polygon1):
@@ -62,3 +68,152 @@ def test_get_offset_polygons_square_inside():
         print(str(p))
     assert(len(output_p) == 1)
     assert_polygons_are_identical(output_p[0], expected_inside_p)
+
+
+def test_get_overlapping_pairs():
+    # a zigzag chain crossing itself many times
+    points = [(index % 7, (index * 3) % 5, 0) for index in range(40)]
+    chain = [Line(p1, p2) for p1, p2 in zip(points, points[1:])]
+    expected = []
+    for index1 in range(len(chain)):
+        for index2 in range(index1 + 1, len(chain)):
+            line1, line2 = chain[index1], chain[index2]
+            margin = 2 * epsilon * (2 + line1.len + line2.len)
+            if (line1.minx <= line2.maxx + margin) and (line2.minx <= line1.maxx + margin) \
+                    and (line1.miny <= line2.maxy + margin) \
+                    and (line2.miny <= line1.maxy + margin):
+                expected.append((index1, index2))
+    assert _get_overlapping_pairs(chain) == expected
+
+
+def _split_pairwise(lines):
+    """ reference: compare every line with every other line (see "_split_at_intersections") """
+    new_group = list(lines)
+    group_starts = []
+    index1 = 0
+    while index1 < len(new_group):
+        index2 = 0
+        while index2 < len(new_group):
+            index_distance = min(abs(index2 - index1), abs(len(new_group) - (index2 - index1)))
+            if index_distance > 1:
+                line1 = new_group[index1]
+                intersection, factor = line1.get_intersection(new_group[index2])
+                if intersection and (pdist(intersection, line1.p1) > epsilon) \
+                        and (pdist(intersection, line1.p2) > epsilon):
+                    new_group[index1:index1 + 1] = [Line(line1.p1, intersection),
+                                                    Line(intersection, line1.p2)]
+                    group_starts = [start + 1 if start > index1 else start
+                                    for start in group_starts]
+                    if index1 + 1 not in group_starts:
+                        group_starts.append(index1 + 1)
+                    continue
+                elif intersection and (pdist(intersection, line1.p1) < epsilon):
+                    if index1 not in group_starts:
+                        group_starts.append(index1)
+            index2 += 1
+        index1 += 1
+    if not group_starts:
+        return [new_group]
+    group_starts.sort()
+    groups = [new_group[start:end] for start, end in zip([0] + group_starts, group_starts)]
+    groups = [group for group in groups if group]
+    if groups[0][0].p1 == new_group[-1].p2:
+        groups[0] = new_group[group_starts[-1]:] + groups[0]
+    else:
+        groups.append(new_group[group_starts[-1]:])
+    # combine each open group with the first open group that fits
+    combined_groups = []
+    for index, current_group in enumerate(groups):
+        if current_group[0].p1 == current_group[-1].p2:
+            combined_groups.append(current_group)
+            continue
+        for other_group in groups[index + 1:]:
+            if other_group[0].p1 != other_group[-1].p2:
+                if other_group[0].p1 == current_group[-1].p2:
+                    other_group[:0] = current_group
+                    break
+                if other_group[-1].p2 == current_group[0].p1:
+                    other_group.extend(current_group)
+                    break
+        else:
+            combined_groups.append(current_group)
+    return combined_groups
+
+
+def get_star(seed, count=40):
+    rnd = random.Random(seed)
+    points = []
+    for index in range(count):
+        angle = 2 * math.pi * index / count
+        radius = rnd.uniform(5, 10) if index % 2 == 0 else rnd.uniform(2, 6)
+        points.append((radius * math.cos(angle), radius * math.sin(angle), 0))
+    polygon = Polygon()
+    for p1, p2 in zip(points, points[1:] + points[:1]):
+        polygon.append(Line(p1, p2))
+    return polygon
+
+
+def test_split_at_intersections():
+    # the shifted lines of star outlines intersect each other
+    split_count = 0
+    for seed in range(10):
+        polygon = get_star(seed)
+        for offset in (-2.5, -1, 1, 2.5):
+            points = [polygon.get_shifted_vertex(index, offset)
+                      for index in range(len(polygon.get_points()))]
+            lines = [Line(p1, p2) for p1, p2 in zip(points, points[1:] + points[:1])]
+            result = _split_at_intersections(lines)
+            expected = _split_pairwise(lines)
+            assert [[line.get_points() for line in group] for group in result] \
+                == [[line.get_points() for line in group] for group in expected]
+            if len(result) > 1:
+                split_count += 1
+    assert split_count > 5
+
+
+def get_sawtooth(count):
+    """ a chain of teeth crossed by its closing line """
+    points = [(index, 1 + index % 2, 0) for index in range(count)]
+    points += [(count - 1, 1.5, 0), (0, 1.5, 0)]
+    return [Line(p1, p2) for p1, p2 in zip(points, points[1:] + points[:1])]
+
+
+def test_split_at_intersections_sawtooth():
+    lines = get_sawtooth(60)
+    result = _split_at_intersections(lines)
+    expected = _split_pairwise(lines)
+    assert [[line.get_points() for line in group] for group in result] \
+        == [[line.get_points() for line in group] for group in expected]
+    # each of the 59 teeth and the closing line are split at each crossing
+    assert sum(len(group) for group in result) == len(lines) + 2 * 59
+
+
+def test_split_at_intersections_scaling():
+    # A quadratic algorithm would need 64 times longer for the larger chain.
+    durations = []
+    for count in (200, 1600):
+        lines = get_sawtooth(count)
+        best = None
+        for _ in range(2):
+            start_time = time.time()
+            _split_at_intersections(lines)
+            duration = time.time() - start_time
+            best = duration if best is None else min(best, duration)
+        durations.append(best)
+    assert durations[1] < 24 * durations[0]
+
+
+def test_get_offset_polygons_split():
+    # two squares connected by a narrow bridge
+    points = [(0, 0, 0), (10, 0, 0), (10, 4, 0), (14, 4, 0), (14, 0, 0), (24, 0, 0),
+              (24, 10, 0), (14, 10, 0), (14, 6, 0), (10, 6, 0), (10, 10, 0), (0, 10, 0)]
+    polygon = Polygon()
+    for p1, p2 in zip(points, points[1:] + points[:1]):
+        polygon.append(Line(p1, p2))
+    result = polygon.get_offset_polygons(-0.5)
+    assert len(result) == 1
+    assert abs(result[0].get_area() - 167) < epsilon
+    # the bridge vanishes
+    result = polygon.get_offset_polygons(-1.5)
+    assert len(result) == 2
+    assert all(group.is_closed for group in result)
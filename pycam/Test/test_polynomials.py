@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import random
+
+import numpy
+import pytest
+
+import pycam.Test
+from pycam.Geometry.intersection import intersect_torus_point
+import pycam.Geometry.intersection_batch
+from pycam.Geometry.PointUtils import pnormalized
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Utils.polynomials import poly2_roots, poly2_roots_batch, poly3_roots, \
+        poly3_roots_batch, poly4_roots, poly4_roots_batch
+
+
+def get_roots(roots):
+    return sorted(root for root in roots if not numpy.isnan(root))
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="the vectorized solvers require numpy")
+class BatchPolynomials(pycam.Test.PycamTestCase):
+    """Vectorized polynomial solvers compared with the scalar functions"""
+
+    def _compare(self, scalar_func, batch_func, coefficients):
+        result = batch_func(*numpy.array(coefficients).T)
+        for coeffs, roots in zip(coefficients, result):
+            self.assertEqual(len(get_roots(roots)), len(scalar_func(*coeffs) or []))
+            for wanted, root in zip(sorted(scalar_func(*coeffs) or []), get_roots(roots)):
+                self.assertAlmostEqual(root, wanted, places=6)
+
+    def test_special_cases(self):
+        "Degenerated polynomials"
+        self._compare(poly2_roots, poly2_roots_batch,
+                      [(1, 2, 0), (1, 2, 1), (1, 2, 2), (0, 2, 1), (0, 0, 1), (-1, 1, 2)])
+        self._compare(poly3_roots, poly3_roots_batch,
+                      [(1, 0, 0, 0), (1, 0, 0, -1), (1, -1, 0, 0), (1, 0, -2, 0), (1, 0, -2, 1),
+                       (0, 1, 2, 0)])
+        self._compare(poly4_roots, poly4_roots_batch,
+                      [(1, 0, 0, 0, 0), (1, 0, 0, 0, -1), (1, 0, -2, 0, 1), (1, -10, 35, -50, 24),
+                       (1, 0, 6, -60, 36), (1, -25, 235.895, -995.565, 1585.25),
+                       (0, 1, 0, -2, 1)])
+
+    def test_quartics(self):
+        "Quartic equations with known roots"
+        randomizer = random.Random(4)
+        coefficients = []
+        for _ in range(200):
+            roots = [randomizer.uniform(-3, 3) for _ in range(randomizer.choice((2, 4)))]
+            # a quadratic factor without real roots
+            while len(roots) < 4:
+                roots.extend([complex(randomizer.uniform(-3, 3), 1), None])
+                roots[-1] = roots[-2].conjugate()
+            coefficients.append(tuple(numpy.real(numpy.poly(roots))))
+        self._compare(poly4_roots, poly4_roots_batch, coefficients)
+
+    def test_torus_point(self):
+        "Collisions of a torus and points in arbitrary directions"
+        randomizer = random.Random(5)
+        points = numpy.array([[randomizer.uniform(-3, 3) for _ in range(3)] for _ in range(200)])
+        center = numpy.zeros((len(points), 3))
+        for direction in ((0, 0, -1), (1, 0, 0), pnormalized((1, 2, -1)), pnormalized((0, 1, 3))):
+            ccp, cp, l = pycam.Geometry.intersection_batch.intersect_torus_point(
+                center, (0, 0, 1), 2, 0.5, 4, 0.25, direction, points)
+            for point, wanted_ccp, wanted_l in zip(points, ccp, l):
+                result = intersect_torus_point((0, 0, 0), (0, 0, 1), 2, 0.5, 4, 0.25, direction,
+                                               tuple(point))
+                if result[0] is None:
+                    self.assertTrue(numpy.isnan(wanted_ccp[0]))
+                else:
+                    self.assertVectorEqual(tuple(wanted_ccp.tolist()), result[0])
+                    self.assertAlmostEqual(wanted_l, result[2])
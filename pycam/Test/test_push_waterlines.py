@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Geometry import Box3D, Point3D
+from pycam.Geometry.Model import Model
+from pycam.Geometry.Triangle import Triangle
+from pycam.PathGenerators.PushCutter import PushCutter
+import pycam.Toolpath.MotionGrid
+
+
+def get_cuboid(minx, miny, maxx, maxy, height):
+    model = Model()
+    corners = [(minx, miny), (maxx, miny), (maxx, maxy), (minx, maxy)]
+    for (x1, y1), (x2, y2) in zip(corners, corners[1:] + corners[:1]):
+        model.append(Triangle((x1, y1, 0), (x2, y2, 0), (x2, y2, height)))
+        model.append(Triangle((x1, y1, 0), (x2, y2, height), (x1, y1, height)))
+    bottom = [(x, y, 0) for x, y in corners]
+    top = [(x, y, height) for x, y in corners]
+    model.append(Triangle(bottom[0], bottom[2], bottom[1]))
+    model.append(Triangle(bottom[0], bottom[3], bottom[2]))
+    model.append(Triangle(top[0], top[1], top[2]))
+    model.append(Triangle(top[0], top[2], top[3]))
+    return model
+
+
+class PushCutterWaterlines(pycam.Test.PycamTestCase):
+    """Waterlines of independent layers"""
+
+    def _get_moves(self, models):
+        box = Box3D(Point3D(-5, -5, 1), Point3D(15, 15, 4))
+        grid = pycam.Toolpath.MotionGrid.get_fixed_grid(
+            box, 1, line_distance=0.5, grid_direction=pycam.Toolpath.MotionGrid.GridDirection.X)
+        path = PushCutter(waterlines=True).GenerateToolPath(CylindricalCutter(1), models, grid)
+        return [move.position for move in path if move.position is not None]
+
+    def test_layers(self):
+        "Layer order"
+        positions = self._get_moves([get_cuboid(0, 0, 10, 10, 5)])
+        # the upper layers come first
+        heights = [position[2] for position in positions]
+        self.assertEqual(heights, sorted(heights, reverse=True))
+        self.assertEqual(sorted(set(heights)), [1, 2, 3, 4])
+        for x, y, z in positions:
+            # the cutter touches the cuboid
+            dx = max(-x, 0, x - 10)
+            dy = max(-y, 0, y - 10)
+            self.assertAlmostEqual(math.hypot(dx, dy), 1, places=5)
+
+    def test_obstacles(self):
+        "Obstacle models"
+        models = [get_cuboid(0, 0, 10, 10, 5), get_cuboid(3, 10, 5, 12, 5)]
+        positions = self._get_moves(models)
+        self.assertTrue(len(positions) > len(self._get_moves(models[:1])))
+        # no position within the range of the obstacle
+        self.assertFalse([p for p in positions if (2 < p[0] < 6) and (p[1] > 10)])
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Geometry import INFINITE
+from pycam.Geometry.Model import Model
+from pycam.Geometry.ScanLineCache import ScanLineCache
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Importers.STLImporter import ImportModel
+from pycam.PathGenerators import get_max_height_dynamic
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "samples")
+
+
+def get_model():
+    """ small triangles in a grid of 20 x 20 """
+    model = Model()
+    for x in range(20):
+        for y in range(20):
+            model.append(Triangle((x, y, 0), (x + 0.5, y + 0.5, 1), (x + 0.5, y, 0)))
+    return model
+
+
+class ScanLineCandidates(pycam.Test.PycamTestCase):
+    """Triangles along a scan line"""
+
+    def _get_expected(self, model, x, y, radius):
+        # the triangles with a vertex below the cutter at the given position
+        return set(t for t in model.triangles(x - radius, y - radius, -INFINITE,
+                                              x + radius, y + radius, INFINITE)
+                   if [True for p in t.get_points()
+                       if (p[0] - x) ** 2 + (p[1] - y) ** 2 <= radius ** 2])
+
+    def test_sliding_window(self):
+        "Positions along the line"
+        model = get_model()
+        cache = ScanLineCache(model, (0, 5.2), (20, 5.2), 1.5)
+        self.assertEqual(len(cache), 3 * 20)
+        # forward, a small step backwards and a big step backwards
+        for x in [0.5 * index for index in range(41)] + [17, 3]:
+            triangles = cache.get_triangles(x, 5.2)
+            self.assertTrue(self._get_expected(model, x, 5.2, 1.5) <= set(triangles))
+            self.assertTrue(all(abs(t.maxx + t.minx - 2 * x) <= 2 * 1.5 + 0.5
+                                for t in triangles))
+        self.assertEqual((cache.hits, cache.misses), (43, 0))
+
+    def test_misses(self):
+        "Positions and segments outside of the line"
+        model = get_model()
+        ScanLineCache.reset_statistics()
+        cache = ScanLineCache(model, (2, 2), (12, 12), 1)
+        # the triangles far away from the diagonal line are skipped
+        triangles = set(cache.get_segment_triangles((4, 4), (6, 6)))
+        self.assertTrue(triangles < set(model.triangles(3, 3, -INFINITE, 7, 7, INFINITE)))
+        for position in (4, 5, 6):
+            self.assertTrue(self._get_expected(model, position, position, 1) <= triangles)
+        self.assertEqual(set(cache.get_triangles(5, 3)),
+                         set(model.triangles(4, 2, -INFINITE, 6, 4, INFINITE)))
+        self.assertEqual(cache.get_triangles(15, 15), model.triangles(14, 14, -INFINITE, 16, 16,
+                                                                      INFINITE))
+        self.assertEqual(ScanLineCache.get_statistics(), {"hits": 1, "misses": 2})
+
+    def test_direct_query(self):
+        "Same triangles as the query of the model"
+        model = ImportModel(os.path.join(SAMPLES_DIR, "sled.stl"))
+        radius = 0.175
+        # along the border of the model, backwards and diagonal
+        for start, end in (((7.175, model.miny), (7.175, model.maxy)),
+                           ((model.maxx, 1.0), (model.minx, 1.0)),
+                           ((model.minx, model.miny), (model.maxx, model.maxy))):
+            cache = ScanLineCache(model, start, end, radius)
+            positions = [(start[0] + (end[0] - start[0]) * index / 100.0,
+                          start[1] + (end[1] - start[1]) * index / 100.0)
+                         for index in range(101)]
+            for x, y in positions:
+                self.assertEqual(cache.get_triangles(x, y),
+                                 model.triangles(x - radius, y - radius, -INFINITE,
+                                                 x + radius, y + radius, INFINITE))
+            for (x1, y1), (x2, y2) in zip(positions, positions[5:]):
+                triangles = cache.get_segment_triangles((x1, y1), (x2, y2))
+                expected = model.triangles(min(x1, x2) - radius, min(y1, y2) - radius,
+                                           -INFINITE, max(x1, x2) + radius,
+                                           max(y1, y2) + radius, INFINITE)
+                if (start[0] == end[0]) or (start[1] == end[1]):
+                    self.assertEqual(triangles, expected)
+                else:
+                    # the corners of the box (far away from the line) are skipped
+                    self.assertEqual(triangles, [t for t in expected if t in triangles])
+            self.assertEqual(cache.misses, 0)
+
+    @pytest.mark.skipif(not numpy_enabled, reason="the batch engine requires numpy")
+    def test_drop_cutter(self):
+        "Same cutter locations as the batch engine"
+        model = ImportModel(os.path.join(SAMPLES_DIR, "sled.stl"))
+        # the cutter touches the side of the model
+        cutter = CylindricalCutter(0.175)
+        positions = [(7.175, model.miny + (model.maxy - model.miny) * index / 52.0)
+                     for index in range(53)]
+        self.assertEqual(get_max_height_dynamic(model, cutter, positions, 0, 2),
+                         get_max_height_dynamic(model, cutter, positions, 0, 2, batch=True))
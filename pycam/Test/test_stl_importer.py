@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from io import BytesIO
+import os
+import struct
+import tempfile
+
+import pytest
+
+import pycam.Test
+from pycam.Geometry import Box3D, Point3D
+import pycam.Importers.STLImporter
+
+
+# counter-clockwise facets (normal, vertices) of a tetrahedron
+FACETS = (((0, 0, -1), ((0, 0, 0), (0, 3, 0), (4, 0, 0))),
+          ((0, -1, 0), ((0, 0, 0), (4, 0, 0), (0, 0, 2))),
+          ((-1, 0, 0), ((0, 0, 0), (0, 0, 2), (0, 3, 0))),
+          # wrong orientation
+          ((0.43, 0.57, 0.86), ((4, 0, 0), (0, 0, 2), (0, 3, 0))),
+          # invalid facet: two identical vertices
+          ((0, 0, 0), ((1, 1, 1), (2, 2, 2), (1, 1, 1))))
+
+
+def get_binary_stl():
+    data = [b"binary".ljust(80, b" "), struct.pack("<I", len(FACETS))]
+    for normal, vertices in FACETS:
+        data.append(struct.pack("<3f", *normal))
+        for vertex in vertices:
+            data.append(struct.pack("<3f", *vertex))
+        data.append(b"\0\0")
+    return b"".join(data)
+
+
+class BinarySTLImport(pycam.Test.PycamTestCase):
+    """Import of binary STL files"""
+
+    def _import(self, bulk_decoding):
+        original = pycam.Importers.STLImporter.numpy_enabled
+        pycam.Importers.STLImporter.numpy_enabled = bulk_decoding
+        try:
+            return pycam.Importers.STLImporter.ImportModel(BytesIO(get_binary_stl()))
+        finally:
+            pycam.Importers.STLImporter.numpy_enabled = original
+
+    def test_import(self):
+        "Facet-by-facet"
+        model = self._import(False)
+        self.assertEqual(len(model), 4)
+        self.assertEqual((model.minx, model.maxx, model.maxy, model.maxz), (0, 4, 3, 2))
+        # clockwise order of vertices
+        self.assertEqual(model.triangles()[0].get_points(), ((0, 0, 0), (4, 0, 0), (0, 3, 0)))
+
+    @pytest.mark.skipif(not pycam.Importers.STLImporter.numpy_enabled,
+                        reason="bulk decoding requires numpy")
+    def test_bulk_import(self):
+        "Bulk decoding"
+        expected = self._import(False)
+        model = self._import(True)
+        self.assertIsNotNone(model.mesh)
+        # shared vertices
+        self.assertEqual(len(model.mesh.vertices), 6)
+        self.assertEqual([t.get_points() for t in model.triangles()],
+                         [t.get_points() for t in expected.triangles()])
+        for triangle, expected_triangle in zip(model.triangles(), expected.triangles()):
+            self.assertVectorEqual(triangle.normal, expected_triangle.plane.n)
+
+    @pytest.mark.skipif(not pycam.Importers.STLImporter.numpy_enabled,
+                        reason="memory mapping requires numpy")
+    def test_memory_map(self):
+        "Memory mapped file"
+        expected = self._import(False)
+        handle, filename = tempfile.mkstemp(suffix=".stl")
+        try:
+            with os.fdopen(handle, "wb") as out_file:
+                out_file.write(get_binary_stl())
+            model = pycam.Importers.STLImporter.ImportModel(filename)
+            self.assertEqual([t.get_points() for t in model.triangles()],
+                             [t.get_points() for t in expected.triangles()])
+            # skip the triangles outside of the bounds
+            bounds = Box3D(Point3D(-1, 1, -1), Point3D(5, 5, 5))
+            model = pycam.Importers.STLImporter.ImportModel(filename, bounds=bounds)
+            self.assertEqual(len(model), 3)
+        finally:
+            os.remove(filename)
+
+    @pytest.mark.skipif(not pycam.Importers.STLImporter.numpy_enabled,
+                        reason="bulk decoding requires numpy")
+    def test_decode_chunks(self):
+        "Decoding in chunks"
+        data = get_binary_stl()
+        expected_points = [vertex for normal, vertices in FACETS for vertex in vertices]
+        expected_normals = [normal for normal, vertices in FACETS]
+        bounds = Box3D(Point3D(-1, -1, -1), Point3D(0.5, 5, 5))
+        original = pycam.Importers.STLImporter.BINARY_CHUNK_SIZE
+        pycam.Importers.STLImporter.BINARY_CHUNK_SIZE = 2
+        try:
+            points, normals = pycam.Importers.STLImporter._decode_binary_facets(
+                data, len(FACETS))
+            self.assertEqual(points.shape, (3 * len(FACETS), 3))
+            for point, expected in zip(points, expected_points):
+                self.assertVectorEqual(tuple(point), expected)
+            for normal, expected in zip(normals, expected_normals):
+                self.assertVectorEqual(tuple(normal), expected)
+            # the invalid facet is outside of the bounds
+            points, normals = pycam.Importers.STLImporter._decode_binary_facets(
+                data, len(FACETS), bounds=bounds)
+            self.assertEqual(points.shape, (3 * 4, 3))
+            self.assertEqual(normals.shape, (4, 3))
+            self.assertVectorEqual(tuple(normals[3]), FACETS[3][0])
+        finally:
+            pycam.Importers.STLImporter.BINARY_CHUNK_SIZE = original
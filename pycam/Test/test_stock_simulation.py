@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Geometry import Box3D
+from pycam.Geometry.Model import Model
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Simulation.StockSimulation import simulate_toolpath
+from pycam.Toolpath import Toolpath
+from pycam.Toolpath.Steps import MoveSafety, MoveStraight
+
+try:
+    import numpy
+except ImportError:
+    pass
+
+
+def get_plate(z):
+    """ a horizontal square from (2, 2) to (8, 8) """
+    model = Model()
+    model.append(Triangle((2, 2, z), (8, 8, z), (8, 2, z)))
+    model.append(Triangle((2, 2, z), (2, 8, z), (8, 8, z)))
+    return model
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="the simulation requires numpy")
+class HeadlessSimulation(pycam.Test.PycamTestCase):
+    """Simulation of complete toolpaths"""
+
+    def setUp(self):
+        self.box = Box3D((0, 0, 0), (10, 10, 5))
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_metrics(self):
+        "Removed material, gouges and overcuts"
+        path = []
+        # a horizontal pocket (2 < y < 8) at z=3 - the plate stays in place
+        for y in range(3, 8):
+            path.extend([MoveStraight((0, y, 3)), MoveStraight((10, y, 3)), MoveSafety()])
+        # a gouge in the plate and a hole through the stock
+        path.extend([MoveStraight((5, 5, 2.5)), MoveSafety(), MoveStraight((9, 1, -1))])
+        toolpath = Toolpath(toolpath_path=path, tool=CylindricalCutter(1))
+        filename = os.path.join(self.tempdir, "result.npz")
+        result = simulate_toolpath(toolpath, self.box, 0.1, model=get_plate(3), filename=filename)
+        heights = result.heights
+        self.assertEqual(heights.shape, (101, 101))
+        # cells at (x, y) = (0, 2), (0, 5), (5, 5), (9, 1), (5, 9)
+        self.assertEqual([heights[20, 0], heights[50, 0], heights[50, 50], heights[10, 90],
+                          heights[90, 50]], [3, 3, 2.5, -1, 5])
+        # the tool touches the plate without cutting into it (except for the gouge)
+        self.assertEqual(result.gouge.max(), 0.5)
+        self.assertEqual(result.gouge[50, 50], 0.5)
+        self.assertEqual(result.gouge[50, 80], 0)
+        self.assertEqual(result.remaining[50, 80], 0)
+        self.assertEqual(result.remaining[50, 50], 0)
+        self.assertEqual(result.remaining[90, 50], 5)
+        self.assertEqual(result.overcut.max(), 1)
+        self.assertEqual(result.overcut[10, 90], 1)
+        self.assertEqual(result.overcut[50, 50], 0)
+        # the stock below the table is not part of the removed volume
+        self.assertTrue(result.removed_volume
+                        < 2 * 10 * 7 + 5 * 3.2 + 0.5 * 3.2 + 0.01)
+        self.assertTrue(result.removed_volume > 2 * 10 * 6 + 5 * 3)
+        self.assertAlmostEqual(result.removed_volume + result.remaining_volume
+                               - result.gouge_volume + 6.1 * 6.1 * 3, 10 * 10 * 5)
+        stored = numpy.load(filename)
+        self.assertTrue((stored["heights"] == heights).all())
+        self.assertTrue((stored["gouge"] == result.gouge).all())
+        self.assertEqual(float(stored["removed_volume"]), result.removed_volume)
+
+    def test_without_model(self):
+        "Simulation without a model"
+        toolpath = Toolpath(toolpath_path=[MoveStraight((1, 1, 4)), MoveStraight((9, 1, 4))])
+        result = simulate_toolpath(toolpath, self.box, 0.5, cutter=CylindricalCutter(1))
+        self.assertIsNone(result.gouge)
+        self.assertIsNone(result.get_metrics()["remaining_volume"])
+        # A strip of 5 x 17 cells and two round ends (3 + 1 cells) with a depth of 1.
+        # Half of the cells at the border of the stock (y=0, x=0 and x=10) are outside.
+        self.assertAlmostEqual(result.removed_volume,
+                               (4.5 * 17 + 2 * (3 + 0.5)) * 0.25)
+        self.assertRaises(ValueError, simulate_toolpath, toolpath, self.box, 0.5)
+
+    def test_face_cut(self):
+        "Remove the complete stock"
+        path = []
+        for y in range(-1, 12):
+            path.extend([MoveStraight((-2, y, 0)), MoveStraight((12, y, 0)), MoveSafety()])
+        toolpath = Toolpath(toolpath_path=path, tool=CylindricalCutter(1))
+        for resolution in (1, 0.1, 0.3):
+            result = simulate_toolpath(toolpath, self.box, resolution, model=get_plate(0))
+            self.assertEqual(result.heights.max(), 0)
+            self.assertAlmostEqual(result.removed_volume, 10 * 10 * 5)
+            self.assertAlmostEqual(result.remaining_volume, 0)
+            self.assertEqual(result.gouge_volume, 0)
+            self.assertEqual(result.overcut_volume, 0)
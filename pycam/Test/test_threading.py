@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import pickle
+import time
+import uuid
+
+import pycam.Test
+from pycam.Geometry.Model import Model
+from pycam.Geometry.ScanLineCache import ScanLineCache
+from pycam.Geometry.Triangle import Triangle
+import pycam.Utils.threading
+
+
+def _count_triangles(args):
+    model, models, factor = args
+    return (len(model) + sum(len(one_model) for one_model in models)) * factor
+
+
+class SharedData(pycam.Test.PycamTestCase):
+    """Transfer of task arguments to worker processes"""
+
+    def test_publish(self):
+        "Publish models once"
+        model = Model()
+        model.append(Triangle((0, 0, 0), (1, 0, 0), (0, 1, 0)))
+        store = pycam.Utils.threading.SharedDataStore()
+        try:
+            args = store.replace_args((model, [model, model], 2))
+            self.assertEqual(store.length(), 1)
+            self.assertIsInstance(args[0], pycam.Utils.threading.SharedDataItemID)
+            self.assertIs(args[1][0], args[0])
+            self.assertTrue(len(pickle.dumps(args)) < len(pickle.dumps(model)))
+            # the model is not part of the cache of this process yet
+            args[0].key = str(uuid.uuid4())
+            result, info = pycam.Utils.threading._run_task_with_shared_data(
+                (1, _count_triangles, args))
+            self.assertEqual(result, 6)
+            # one cache miss (including the transfer) and two hits
+            self.assertEqual(info[1:3], (2, 1))
+            self.assertTrue(info[3] > 0)
+        finally:
+            store.release()
+        self.assertEqual(store.length(), 0)
+
+    def test_release_least_recently_used(self):
+        "Limited number of published objects"
+        models = [Model() for _ in range(3)]
+        store = pycam.Utils.threading.SharedDataStore(max_items=2)
+        try:
+            store.publish(models[0])
+            store.publish(models[1])
+            store.publish(models[0])
+            store.publish(models[2])
+            self.assertEqual(list(store._items), [str(models[0].uuid), str(models[2].uuid)])
+        finally:
+            store.release()
+
+    def test_keep_referenced_items(self):
+        "Keep the objects of unfinished jobs"
+        models = [Model() for _ in range(3)]
+        store = pycam.Utils.threading.SharedDataStore(max_items=1)
+        try:
+            first = store.publish(models[0], job_id=1)
+            store.publish(models[1], job_id=2)
+            # both jobs are running
+            self.assertEqual(store.length(), 2)
+            store.finish_job(1)
+            self.assertEqual(list(store._items), [str(models[1].uuid)])
+            # the released data is not available for the workers anymore
+            self.assertRaises((IOError, OSError), pycam.Utils.threading._get_shared_data,
+                              first, [0, 0, 0])
+            # late references of finished jobs are ignored
+            store.publish(models[2], job_id=1)
+            self.assertEqual(store.length(), 2)
+            store.finish_job(2)
+            self.assertEqual(list(store._items), [str(models[2].uuid)])
+        finally:
+            store.release()
+
+
+class TaskChunks(pycam.Test.PycamTestCase):
+    """Batching of tasks for remote workers"""
+
+    def test_chunk_size(self):
+        "Adapt the chunk size to the transfer overhead"
+        get_chunk_size = pycam.Utils.threading._get_chunk_size
+        stats = pycam.Utils.threading.ProcessStatistics(timeout=None)
+        # no statistics: a few chunks for every worker
+        self.assertEqual(get_chunk_size(stats, 1000, 2), 125)
+        self.assertEqual(get_chunk_size(stats, 5, 2), 1)
+        # expensive tasks: no batching
+        stats.add_transfer_time("worker", 0.01)
+        stats.add_process_time("worker", 10.0, count=10)
+        self.assertEqual(get_chunk_size(stats, 1000, 2), 1)
+        # cheap tasks: the overhead is distributed among many tasks
+        stats.add_process_time("worker", 0.0, count=990)
+        self.assertEqual(stats.get_task_timing(), (0.01, 0.01))
+        self.assertEqual(get_chunk_size(stats, 1000, 2), 20)
+        self.assertEqual(get_chunk_size(stats, 100, 2), 12)
+
+
+def _delayed_sum(args):
+    model, delay = args
+    time.sleep(delay)
+    return len(model) + delay
+
+
+def _scan_line(args):
+    model, count = args
+    cache = ScanLineCache(model, (0, 0), (1, 0), 0.5)
+    for index in range(count):
+        cache.get_triangles(float(index) / count, 0)
+    # one position outside of the line
+    cache.get_triangles(0, 1)
+    return count
+
+
+class LocalPool(pycam.Test.PycamTestCase):
+    """Long-lived local worker processes"""
+
+    def tearDown(self):
+        pycam.Utils.threading.cleanup()
+
+    def test_disabled(self):
+        "Process locally without worker processes"
+        pycam.Utils.threading.init_threading(number_of_processes=0)
+        self.assertFalse(pycam.Utils.threading.is_multiprocessing_enabled())
+        self.assertFalse(pycam.Utils.threading.is_pool_available())
+        results = pycam.Utils.threading.run_in_parallel(_count_triangles,
+                                                        [(Model(), [], 1)] * 3)
+        self.assertEqual(list(results), [0, 0, 0])
+
+    def test_reuse_and_cancel(self):
+        "Reuse the workers and their data for subsequent jobs"
+        pycam.Utils.threading.init_threading(number_of_processes=2)
+        self.assertTrue(pycam.Utils.threading.is_pool_available())
+        model = Model()
+        model.append(Triangle((0, 0, 0), (1, 0, 0), (0, 1, 0)))
+        args = [(model, [model], factor) for factor in range(20)]
+        for _ in range(2):
+            results = pycam.Utils.threading.run_in_parallel(_count_triangles, args)
+            self.assertEqual(list(results), [2 * factor for factor in range(20)])
+        statistics = pycam.Utils.threading.get_task_statistics()
+        # the model was published once and transferred at most once to each worker
+        self.assertEqual(statistics["shared items"], 1)
+        self.assertTrue(1 <= statistics["cache misses"] <= 2)
+        self.assertEqual(statistics["cache hits"] + statistics["cache misses"], 80)
+        # cancel a slow job: its remaining tasks are skipped by the workers
+        received = []
+        start_time = time.time()
+        for result in pycam.Utils.threading.run_in_parallel(
+                _delayed_sum, [(model, 0.1)] * 100, callback=lambda: len(received) >= 2):
+            received.append(result)
+        self.assertEqual(received, [1.1, 1.1])
+        # the next job is not delayed by the tasks of the cancelled job
+        results = pycam.Utils.threading.run_in_parallel(_delayed_sum,
+                                                        [(model, 0)] * 4, unordered=True)
+        self.assertEqual(list(results), [1, 1, 1, 1])
+        self.assertTrue(time.time() - start_time < 3)
+
+    def test_scan_line_statistics(self):
+        "Collect the counters of the scan line caches of the workers"
+        pycam.Utils.threading.init_threading(number_of_processes=2)
+        ScanLineCache.reset_statistics()
+        model = Model()
+        model.append(Triangle((0, 0, 0), (1, 0, 0), (0, 1, 0)))
+        results = pycam.Utils.threading.run_in_parallel(
+            _scan_line, [(model, count) for count in range(1, 11)])
+        self.assertEqual(sum(results), 55)
+        statistics = pycam.Utils.threading.get_task_statistics()
+        self.assertEqual(statistics["scan line hits"], 55)
+        self.assertEqual(statistics["scan line misses"], 10)
+        # the counters of the workers are not mixed up with the ones of this process
+        self.assertEqual(ScanLineCache.get_statistics(), {"hits": 0, "misses": 0})
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import itertools
+
+import pycam.Test
+from pycam.Toolpath import MOVE_STRAIGHT, MACHINE_SETTING
+import pycam.Toolpath.Filters as Filters
+from pycam.Toolpath.Steps import MoveStraight, MoveSafety, MachineSetting, Comment
+
+
+class Reverse(Filters.BaseFilter):
+    """ an eager filter: it needs the complete toolpath """
+
+    def filter_toolpath(self, toolpath):
+        return toolpath[::-1]
+
+
+def get_moves(count):
+    """ an endless toolpath - only the first "count" steps may be requested """
+    for index in itertools.count():
+        if index >= count:
+            raise AssertionError("too many steps were requested")
+        yield MoveStraight((index, 0, 0)) if index % 10 else MoveSafety()
+
+
+def get_summary(steps):
+    return [(step.key, step.value) if step.action == MACHINE_SETTING
+            else step.position[0] if step.action == MOVE_STRAIGHT else step.action
+            for step in steps]
+
+
+class StreamFilters(pycam.Test.PycamTestCase):
+    """Lazy processing of toolpath filters"""
+
+    def test_lazy(self):
+        "Steps are requested only when needed"
+        filters = [Filters.SafetyHeight(5), Filters.SelectTool(2), Filters.TriggerSpindle(1),
+                   Filters.MachineSetting("feedrate", 100), Filters.PlungeFeedrate(50),
+                   Filters.StepWidth(0.01, 0.01, 0.01), Filters.MovesOnly()]
+        moves = Filters.iter_filtered_moves(get_moves(100), filters)
+        self.assertEqual(len(list(itertools.islice(moves, 95))), 95)
+
+    def test_eager_adapter(self):
+        "Filters processing the complete toolpath"
+        moves = [MoveStraight((index, 0, 0)) for index in range(5)]
+        # the machine setting is added first (lower weight)
+        filters = [Reverse(), Filters.MachineSetting("feedrate", 100)]
+        self.assertEqual(get_summary(Filters.iter_filtered_moves(moves, filters)),
+                         [4, 3, 2, 1, 0, ("feedrate", 100)])
+        self.assertEqual(get_summary(Filters.get_filtered_moves(moves, filters)),
+                         [4, 3, 2, 1, 0, ("feedrate", 100)])
+        self.assertEqual(get_summary(moves), [0, 1, 2, 3, 4])
+
+    def test_trigger_spindle(self):
+        "Start and stop of the spindle"
+        moves = [Comment("start"), MachineSetting("select_tool", 1), MoveStraight((1, 0, 0)),
+                 MoveStraight((2, 0, 0)), MachineSetting("select_tool", 2),
+                 MoveStraight((3, 0, 0)), Comment("end"), MachineSetting("select_tool", 3)]
+        self.assertEqual(get_summary(moves | Filters.TriggerSpindle(0)),
+                         [5, ("select_tool", 1), ("spindle_enabled", True), 1, 2,
+                          ("select_tool", 2), ("spindle_enabled", True), 3,
+                          ("spindle_enabled", False), 5, ("select_tool", 3),
+                          ("spindle_enabled", True)])
+        # no tool selection before the first move
+        moves = [Comment("start"), MoveStraight((1, 0, 0)), Comment("end")]
+        self.assertEqual(get_summary(moves | Filters.TriggerSpindle(2)),
+                         [5, ("spindle_enabled", True), ("delay", 2), 1,
+                          ("spindle_enabled", False), 5])
+        self.assertEqual(get_summary([] | Filters.TriggerSpindle(2)), [])
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import random
+
+import pytest
+
+import pycam.Test
+from pycam.Geometry.Model import Model
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleBVH import numpy_enabled, TriangleBVH
+from pycam.Geometry.TriangleKdtree import TriangleKdtree
+from pycam.Geometry.TriangleMesh import TriangleMesh
+import pycam.Importers.STLImporter
+
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir, "samples",
+                          "pycam-textbox.stl")
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="the array-based index requires numpy")
+class TriangleBVHSearch(pycam.Test.PycamTestCase):
+    """Array-based spatial index of triangles"""
+
+    def setUp(self):
+        self.model = pycam.Importers.STLImporter.ImportModel(MODEL_FILE)
+        self.triangles = list(self.model.triangles())
+        self.index = TriangleBVH(*[[getattr(t, attr) for t in self.triangles]
+                                   for attr in ("minx", "maxx", "miny", "maxy")])
+        rnd = random.Random(1)
+        self.boxes = []
+        for _ in range(200):
+            x = rnd.uniform(self.model.minx - 5, self.model.maxx + 5)
+            y = rnd.uniform(self.model.miny - 5, self.model.maxy + 5)
+            self.boxes.append((x, x + rnd.uniform(0, 10), y, y + rnd.uniform(0, 10)))
+
+    def test_search(self):
+        "Single queries"
+        kdtree = TriangleKdtree(self.triangles)
+        positions = {id(triangle): index for index, triangle in enumerate(self.triangles)}
+        for box in self.boxes:
+            expected = sorted(positions[id(triangle)] for triangle in kdtree.Search(*box))
+            self.assertEqual(self.index.search(*box), expected)
+
+    def test_search_many(self):
+        "Batched queries"
+        box_indices, triangle_indices = self.index.search_many(*zip(*self.boxes))
+        for box_index, box in enumerate(self.boxes):
+            self.assertEqual(triangle_indices[box_indices == box_index].tolist(),
+                             self.index.search(*box))
+
+    def test_model(self):
+        "Model queries"
+        triangles = self.model.triangles(0, 0, -10, 20, 10, 10)
+        self.assertTrue(0 < len(triangles) < len(self.triangles))
+        self.assertEqual([self.triangles.index(triangle) for triangle in triangles],
+                         self.index.search(0, 20, 0, 10))
+
+    def test_empty(self):
+        "Empty index"
+        index = TriangleBVH([], [], [], [])
+        self.assertEqual(index.search(0, 1, 0, 1), [])
+        self.assertEqual(len(index.search_many([0], [1], [0], [1])[1]), 0)
+
+    def _assert_model_search(self, model, box):
+        minx, maxx, miny, maxy = box
+        expected = [t for t in model.triangles() if not ((t.minx > maxx) or (t.maxx < minx)
+                                                         or (t.miny > maxy) or (t.maxy < miny))]
+        self.assertEqual(model.triangles(minx, miny, -10, maxx, maxy, 10), expected)
+
+    def test_append(self):
+        "Queries between appends of triangles"
+        model = Model()
+        rnd = random.Random(2)
+        for _ in range(100):
+            x, y = rnd.uniform(0, 20), rnd.uniform(0, 20)
+            model.append(Triangle((x, y, 0), (x + 1, y, 0), (x, y + 1, 1)))
+            self._assert_model_search(model, (x - 2, x + 2, y - 2, y + 2))
+        # some triangles are not merged into the index yet
+        self.assertTrue(model._index_size < len(model))
+        self.assertEqual(len(model.get_triangle_index()), len(model))
+
+    def test_transform(self):
+        "Queries after transformations"
+        model = Model(mesh=TriangleMesh.from_triangles(self.triangles))
+        model.triangles(0, 0, -10, 1, 1, 10)
+        index = model.get_triangle_index()
+        model.shift(5, -3, 1)
+        model.scale(2)
+        # the structure of the index is kept
+        self.assertIs(model.get_triangle_index(), index)
+        for minx, maxx, miny, maxy in self.boxes:
+            self._assert_model_search(model, (2 * minx, 2 * maxx, 2 * miny, 2 * maxy))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import pytest
+
+import pycam.Test
+from pycam.Geometry.Model import Model
+from pycam.Geometry.PointUtils import ptransform_by_matrix
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleMesh import numpy_enabled, TriangleMesh
+
+
+# a tetrahedron (clockwise order of points when viewed from outside)
+VERTICES = ((0, 0, 0), (4, 0, 0), (0, 3, 0), (0, 0, 2))
+FACES = ((0, 1, 2), (0, 3, 1), (0, 2, 3), (1, 3, 2))
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="array-based meshes require numpy")
+class TriangleMeshModel(pycam.Test.PycamTestCase):
+    """Array-based triangle storage of models"""
+
+    def _get_model(self):
+        return Model(mesh=TriangleMesh(VERTICES, FACES))
+
+    def test_triangles(self):
+        "Lazy triangles"
+        model = self._get_model()
+        self.assertEqual(len(model), 4)
+        self.assertEqual((model.minx, model.miny, model.minz), (0, 0, 0))
+        self.assertEqual((model.maxx, model.maxy, model.maxz), (4, 3, 2))
+        for triangle, face in zip(model.triangles(), FACES):
+            expected = Triangle(*[VERTICES[index] for index in face])
+            self.assertEqual(triangle.get_points(), expected.get_points())
+            self.assertVectorEqual(triangle.normal, expected.normal)
+            self.assertEqual(triangle.middle, expected.middle)
+        # triangles are created only once
+        self.assertIs(model.triangles()[2], model.triangles()[2])
+
+    def test_transform(self):
+        "Transformation"
+        model = self._get_model()
+        matrix = ((0, -1, 0, 1), (1, 0, 0, 2), (0, 0, 2, 3))
+        model.transform_by_matrix(matrix)
+        self.assertEqual((model.minz, model.maxz), (3, 7))
+        for triangle, face in zip(model.triangles(), FACES):
+            self.assertEqual(triangle.get_points(),
+                             tuple(ptransform_by_matrix(VERTICES[index], matrix)
+                                   for index in face))
+
+    def test_transform_progress(self):
+        "Progress of a transformation"
+        model = self._get_model()
+        progress = []
+        model.shift(1, 2, 3, callback=lambda percent=None: progress.append(percent))
+        self.assertEqual(progress, [100])
+        self.assertEqual((model.minz, model.maxz), (3, 5))
+
+    def test_append(self):
+        "Append triangles"
+        model = self._get_model()
+        triangle = Triangle((5, 5, 5), (6, 5, 5), (5, 6, 5))
+        model.append(triangle)
+        self.assertEqual(len(model), 5)
+        self.assertEqual(model.maxz, 5)
+        self.assertEqual(len(model.mesh.faces), 5)
+        self.assertIs(model.triangles()[4], triangle)
+        copied = model.copy()
+        self.assertEqual(copied.triangles()[4].get_points(), triangle.get_points())
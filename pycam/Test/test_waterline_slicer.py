@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import pycam.Test
+from pycam.Geometry.Model import Model
+from pycam.Geometry.Plane import Plane
+from pycam.Geometry.Triangle import Triangle
+from pycam.Importers.STLImporter import ImportModel
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "samples")
+
+
+def get_pyramid(size, height):
+    """ a pyramid with a square base (centered at the origin) """
+    model = Model()
+    top = (0, 0, height)
+    corners = [(-size, -size, 0), (size, -size, 0), (size, size, 0), (-size, size, 0)]
+    for p1, p2 in zip(corners, corners[1:] + corners[:1]):
+        model.append(Triangle(p1, p2, top))
+    model.append(Triangle(corners[0], corners[2], corners[1]))
+    model.append(Triangle(corners[0], corners[3], corners[2]))
+    return model
+
+
+class WaterlineSlicer(pycam.Test.PycamTestCase):
+    """Contours of multiple layers"""
+
+    def test_pyramid(self):
+        "Square contours"
+        model = get_pyramid(4, 8)
+        # the levels do not need to be sorted
+        levels = [6, 2, 10, 4, -1]
+        contours = model.get_waterline_contours(levels)
+        self.assertEqual(len(contours), len(levels))
+        for z, contour in zip(levels, contours):
+            if not 0 < z < 8:
+                self.assertEqual(len(contour), 0)
+                continue
+            polygons = contour.get_polygons()
+            self.assertEqual(len(polygons), 1)
+            self.assertTrue(polygons[0].is_closed)
+            self.assertEqual(len(polygons[0].get_points()), 4)
+            self.assertAlmostEqual(abs(polygons[0].get_area()), (8 - z) ** 2)
+            self.assertEqual(contour.minz, z)
+
+    def test_single_layer(self):
+        "Single layer compared with multiple layers"
+        model = ImportModel(os.path.join(SAMPLES_DIR, "SampleScene.stl"))
+        levels = [model.minz + (model.maxz - model.minz) * (index + 0.5) / 10
+                  for index in range(10)]
+        contours = model.get_waterline_contours(levels)
+        for z, contour in zip(levels, contours):
+            single = model.get_waterline_contour(Plane((0, 0, z), (0, 0, 1, 'v')))
+            self.assertEqual([p.get_points() for p in single.get_polygons()],
+                             [p.get_points() for p in contour.get_polygons()])
+            # the sample is a closed mesh
+            self.assertTrue(all(p.is_closed for p in contour.get_polygons()))
+
+    def test_progress(self):
+        "Report the progress after each layer"
+        model = get_pyramid(4, 8)
+        for levels in ([2], [6, 2, 4, 1]):
+            percents = []
+            model.get_waterline_contours(levels, callback=lambda percent: percents.append(percent))
+            self.assertEqual(percents, [100.0 * (index + 1) / len(levels)
+                                        for index in range(len(levels))])
+        # cancel after the first layer
+        self.assertIsNone(model.get_waterline_contours([6, 2, 4], callback=lambda percent: True))
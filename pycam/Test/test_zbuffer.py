@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright 2026 PyCAM contributors
+
+This file is part of PyCAM.
+
+PyCAM is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+PyCAM is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+import pytest
+
+import pycam.Test
+from pycam.Cutters.CylindricalCutter import CylindricalCutter
+from pycam.Cutters.SphericalCutter import SphericalCutter
+from pycam.Geometry.Triangle import Triangle
+from pycam.Geometry.TriangleArrays import numpy_enabled
+from pycam.Simulation.ZBuffer import ZBuffer
+
+
+def get_stock():
+    # cells with a size of 0.1 x 0.1
+    return ZBuffer(0, 10, 100, 0, 10, 100, -5, 5, initial_height=0)
+
+
+@pytest.mark.skipif(not numpy_enabled, reason="the simulation requires numpy")
+class ZBufferSimulation(pycam.Test.PycamTestCase):
+    """Material removal in a height map"""
+
+    def test_cutter(self):
+        "Cutter at a single position"
+        zbuffer = get_stock()
+        zbuffer.to_OpenGL()
+        zbuffer.add_cutter(SphericalCutter(1), (5, 5, -0.5))
+        for x in range(100):
+            for y in range(100):
+                distance = math.hypot(x / 10.0 - 5, y / 10.0 - 5)
+                if distance <= 1:
+                    expected = min(0, -0.5 + 1 - math.sqrt(1 - distance ** 2))
+                else:
+                    expected = 0
+                self.assertAlmostEqual(zbuffer.buf[y, x], expected)
+        # only the tiles around the cutter are changed
+        self.assertEqual(zbuffer.dirty.sum(), 4)
+        zbuffer.to_OpenGL()
+        self.assertFalse(zbuffer.changed)
+
+    def test_horizontal_moves(self):
+        "Exact removal along horizontal moves"
+        zbuffer = get_stock()
+        zbuffer.add_cutter_path(CylindricalCutter(1), [(2, 2, -1), (8, 5, -1), (2, 8, -1)])
+        for x in range(100):
+            for y in range(100):
+                inside = False
+                for p1, p2 in (((2, 2), (8, 5)), ((8, 5), (2, 8))):
+                    vx, vy = p2[0] - p1[0], p2[1] - p1[1]
+                    dx, dy = x / 10.0 - p1[0], y / 10.0 - p1[1]
+                    ratio = min(1, max(0, (dx * vx + dy * vy) / (vx * vx + vy * vy)))
+                    if math.hypot(dx - ratio * vx, dy - ratio * vy) <= 1 + 1e-6:
+                        inside = True
+                self.assertEqual(zbuffer.buf[y, x], -1 if inside else 0)
+
+    def test_sampled_moves(self):
+        "Bulk processing of sloped and vertical moves"
+        cutter = SphericalCutter(0.8)
+        path = [(3, 3, 1), (3, 3, -1), (7, 4.55, -2), (2.5, 9.5, 0), (2.5, 9.5, -0.5)]
+        zbuffer = get_stock()
+        zbuffer.add_cutter_path(cutter, path)
+        # the tool at densely sampled positions
+        expected = get_stock()
+        for p1, p2 in zip(path, path[1:]):
+            count = int(math.ceil(100 * math.hypot(p2[0] - p1[0], p2[1] - p1[1]))) + 2
+            for step in range(count):
+                ratio = step / (count - 1.0)
+                expected.add_cutter(cutter, [v1 + ratio * (v2 - v1) for v1, v2 in zip(p1, p2)])
+        errors = zbuffer.buf - expected.buf
+        self.assertTrue(errors.min() > -0.001)
+        self.assertTrue(abs(errors).mean() < 0.002)
+        self.assertAlmostEqual(zbuffer.buf.min(), -2 + 0.8 - math.sqrt(0.8 ** 2 - 0.05 ** 2))
+        self.assertEqual(zbuffer.buf[95, 25], -0.5)
+
+    def test_triangle(self):
+        "Raise the cells below a triangle"
+        zbuffer = get_stock()
+        zbuffer.add_triangle(Triangle((1, 1, 2), (8, 1, 2), (1, 8, 3)))
+        for x in range(100):
+            for y in range(100):
+                if (x >= 10) and (y >= 10) and (x + y <= 90):
+                    self.assertAlmostEqual(zbuffer.buf[y, x], 2 + (y - 10) / 70.0)
+                else:
+                    self.assertEqual(zbuffer.buf[y, x], 0)
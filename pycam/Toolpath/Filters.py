@@ -19,7 +19,8 @@ along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 
-import decimal
+import collections
+import fractions
 
 from pycam.Geometry import epsilon
 from pycam.Geometry.Line import Line
@@ -30,6 +31,9 @@ import pycam.Utils.log
 
 
 MAX_DIGITS = 12
+# numbers (scaled to units) beyond these limits are quantized via their text representation
+QUANTIZE_MAX_UNITS = 1e9
+QUANTIZE_MARGIN = 1e-6
 
 _log = pycam.Utils.log.get_logger()
 
@@ -64,14 +68,53 @@ def toolpath_filter(our_category, key):
 
 
 def get_filtered_moves(moves, filters):
-    filters = list(filters)
-    moves = list(moves)
-    filters.sort()
-    for one_filter in filters:
-        moves |= one_filter
+    return list(iter_filtered_moves(moves, filters))
+
+
+def iter_filtered_moves(moves, filters):
+    """ return an iterator of the moves processed by all filters (sorted by their weight)
+
+    The steps are processed lazily by the filters based on "BaseStreamFilter". Other filters
+    process the complete list of steps as soon as the first step is requested.
+    """
+    moves = iter(moves)
+    for one_filter in sorted(filters):
+        moves = one_filter.filter_steps(moves)
     return moves
 
 
+class LookAhead(object):
+    """ iterator over toolpath steps, that allows to inspect the upcoming steps ("peek")
+
+    The peeked steps are kept in a queue until they are consumed.
+    """
+
+    def __init__(self, steps):
+        self._steps = iter(steps)
+        self._queue = collections.deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._queue:
+            return self._queue.popleft()
+        else:
+            return next(self._steps)
+
+    # python2
+    next = __next__
+
+    def peek(self, index=0):
+        """ return the upcoming step with the given index (zero: the next one) or None """
+        while len(self._queue) <= index:
+            try:
+                self._queue.append(next(self._steps))
+            except StopIteration:
+                return None
+        return self._queue[index]
+
+
 class BaseFilter(object):
 
     PARAMS = []
@@ -123,19 +166,40 @@ class BaseFilter(object):
         raise NotImplementedError(("The filter class %s failed to implement the 'filter_toolpath' "
                                    "method") % str(type(self)))
 
+    def filter_steps(self, steps):
+        """ return an iterator of the filtered steps
+
+        The given steps are collected into a list for "filter_toolpath".
+        """
+        return iter(self.filter_toolpath(list(steps)))
+
+
+class BaseStreamFilter(BaseFilter):
+    """ filters processing the steps of a toolpath one after another
+
+    Derived classes implement "filter_steps" as a generator. It consumes only as many steps as
+    necessary - filters that need to inspect upcoming steps may use "LookAhead".
+    """
+
+    def filter_toolpath(self, toolpath):
+        return list(self.filter_steps(toolpath))
+
+    def filter_steps(self, steps):
+        raise NotImplementedError(("The filter class %s failed to implement the 'filter_steps' "
+                                   "method") % str(type(self)))
+
 
-class SafetyHeight(BaseFilter):
+class SafetyHeight(BaseStreamFilter):
 
     PARAMS = ("safety_height", )
     WEIGHT = 80
 
-    def filter_toolpath(self, toolpath):
+    def filter_steps(self, steps):
         last_pos = None
         max_height = None
-        new_path = []
         safety_pending = False
         get_safe = lambda pos: tuple((pos[0], pos[1], self.settings["safety_height"]))
-        for step in toolpath:
+        for step in steps:
             if step.action == MOVE_SAFETY:
                 safety_pending = True
             elif step.action in MOVES_LIST:
@@ -145,7 +209,7 @@ class SafetyHeight(BaseFilter):
                 if not last_pos:
                     # there was a safety move (or no move at all) before
                     # -> move sideways
-                    new_path.append(ToolpathSteps.MoveStraightRapid(get_safe(new_pos)))
+                    yield ToolpathSteps.MoveStraightRapid(get_safe(new_pos))
                 elif safety_pending:
                     safety_pending = False
                     if pnear(last_pos, new_pos, axes=(0, 1)):
@@ -153,39 +217,39 @@ class SafetyHeight(BaseFilter):
                         pass
                     else:
                         # go up, sideways and down
-                        new_path.append(ToolpathSteps.MoveStraightRapid(get_safe(last_pos)))
-                        new_path.append(ToolpathSteps.MoveStraightRapid(get_safe(new_pos)))
+                        yield ToolpathSteps.MoveStraightRapid(get_safe(last_pos))
+                        yield ToolpathSteps.MoveStraightRapid(get_safe(new_pos))
                 else:
                     # we are in the middle of usual moves -> keep going
                     pass
-                new_path.append(step)
+                yield step
                 last_pos = new_pos
             else:
                 # unknown move -> keep it
-                new_path.append(step)
+                yield step
         # process pending safety moves
         if safety_pending and last_pos:
-            new_path.append(ToolpathSteps.MoveStraightRapid(get_safe(last_pos)))
+            yield ToolpathSteps.MoveStraightRapid(get_safe(last_pos))
         if max_height > self.settings["safety_height"]:
             _log.warn("Toolpath exceeds safety height: %f => %f",
                       max_height, self.settings["safety_height"])
-        return new_path
 
 
-class MachineSetting(BaseFilter):
+class MachineSetting(BaseStreamFilter):
 
     PARAMS = ("key", "value")
     WEIGHT = 20
 
-    def filter_toolpath(self, toolpath):
-        result = []
+    def filter_steps(self, steps):
+        steps = LookAhead(steps)
         # move all previous machine settings
-        while toolpath and toolpath[0].action == MACHINE_SETTING:
-            result.append(toolpath.pop(0))
+        while (steps.peek() is not None) and (steps.peek().action == MACHINE_SETTING):
+            yield next(steps)
         # add the new setting
         for key, value in self._get_settings():
-            result.append(ToolpathSteps.MachineSetting(key, value))
-        return result + toolpath
+            yield ToolpathSteps.MachineSetting(key, value)
+        for step in steps:
+            yield step
 
     def _get_settings(self):
         return [(self.settings["key"], self.settings["value"])]
@@ -210,70 +274,87 @@ class PathMode(MachineSetting):
                                  self.settings["naive_tolerance"])
 
 
-class SelectTool(BaseFilter):
+class SelectTool(BaseStreamFilter):
 
     PARAMS = ("tool_id", )
     WEIGHT = 35
 
-    def filter_toolpath(self, toolpath):
-        index = 0
+    def filter_steps(self, steps):
+        steps = LookAhead(steps)
         # skip all non-moves
-        while (index < len(toolpath)) and (toolpath[index][0] not in MOVES_LIST):
-            index += 1
-        toolpath.insert(index, ToolpathSteps.MachineSetting("select_tool",
-                                                            self.settings["tool_id"]))
-        return toolpath
+        while (steps.peek() is not None) and (steps.peek().action not in MOVES_LIST):
+            yield next(steps)
+        yield ToolpathSteps.MachineSetting("select_tool", self.settings["tool_id"])
+        for step in steps:
+            yield step
 
 
-class TriggerSpindle(BaseFilter):
+class TriggerSpindle(BaseStreamFilter):
+    """ start the spindle after each tool change and stop it after the last move
+
+    The spindle is started before the first move, if no tool is selected before.
+    """
 
     PARAMS = ("delay", )
     WEIGHT = 40
 
-    def filter_toolpath(self, toolpath):
-        def enable_spindle(path, index):
-            path.insert(index, ToolpathSteps.MachineSetting("spindle_enabled", True))
+    def filter_steps(self, steps):
+        def enable_spindle():
+            result = [ToolpathSteps.MachineSetting("spindle_enabled", True)]
             if self.settings["delay"]:
-                path.insert(index + 1, ToolpathSteps.MachineSetting("delay",
-                                                                    self.settings["delay"]))
-
-        def disable_spindle(path, index):
-            path.insert(index, ToolpathSteps.MachineSetting("spindle_enabled", False))
-
-        # find all positions of "select_tool"
-        tool_changes = [index for index, step in enumerate(toolpath)
-                        if (step.action == MACHINE_SETTING) and (step.key == "select_tool")]
-        if tool_changes:
-            tool_changes.reverse()
-            for index in tool_changes:
-                enable_spindle(toolpath, index + 1)
-        else:
-            # add a single tool selection before the first move
-            for index, step in enumerate(toolpath):
-                if step.action in MOVES_LIST:
-                    enable_spindle(toolpath, index)
-                    break
+                result.append(ToolpathSteps.MachineSetting("delay", self.settings["delay"]))
+            return result
+
+        is_tool_change = lambda step: ((step.action == MACHINE_SETTING)
+                                       and (step.key == "select_tool"))
+        steps = LookAhead(steps)
+        # look for a tool change before the first move
+        index = 0
+        while (steps.peek(index) is not None) and (steps.peek(index).action not in MOVES_LIST) \
+                and not is_tool_change(steps.peek(index)):
+            index += 1
+        spindle_pending = (steps.peek(index) is None) or not is_tool_change(steps.peek(index))
+        moved = False
+        # the steps after the latest move
+        trailing_steps = []
+        for step in steps:
+            if step.action in MOVES_LIST:
+                if spindle_pending:
+                    for new_step in enable_spindle():
+                        yield new_step
+                    spindle_pending = False
+                for other_step in trailing_steps:
+                    yield other_step
+                trailing_steps = []
+                yield step
+                moved = True
+            else:
+                new_steps = [step]
+                if is_tool_change(step):
+                    new_steps.extend(enable_spindle())
+                if moved:
+                    trailing_steps.extend(new_steps)
+                else:
+                    for new_step in new_steps:
+                        yield new_step
         # add "stop spindle" just after the last move
-        index = len(toolpath) - 1
-        while (toolpath[index].action not in MOVES_LIST) and (index > 0):
-            index -= 1
-        if toolpath[index].action in MOVES_LIST:
-            disable_spindle(toolpath, index + 1)
-        return toolpath
+        if moved:
+            yield ToolpathSteps.MachineSetting("spindle_enabled", False)
+        for step in trailing_steps:
+            yield step
 
 
-class PlungeFeedrate(BaseFilter):
+class PlungeFeedrate(BaseStreamFilter):
 
     PARAMS = ("plunge_feedrate", )
     # must be greater than the weight of the SafetyHeight filter
     WEIGHT = 82
 
-    def filter_toolpath(self, toolpath):
-        new_path = []
+    def filter_steps(self, steps):
         last_pos = None
         original_feedrate = None
         current_feedrate = None
-        for step in toolpath:
+        for step in steps:
             if (step.action == MACHINE_SETTING) and (step.key == "feedrate"):
                 # store the current feedrate
                 original_feedrate = step.value
@@ -290,32 +371,29 @@ class PlungeFeedrate(BaseFilter):
                     max_feedrate = min(original_feedrate, max_feedrate)
                     if current_feedrate != max_feedrate:
                         # we are too slow or too fast
-                        new_path.append(ToolpathSteps.MachineSetting("feedrate", max_feedrate))
+                        yield ToolpathSteps.MachineSetting("feedrate", max_feedrate)
                         current_feedrate = max_feedrate
                 else:
                     # we do not move down
                     if current_feedrate != original_feedrate:
                         # switch back to the maximum feedrate
-                        new_path.append(ToolpathSteps.MachineSetting("feedrate",
-                                                                     original_feedrate))
+                        yield ToolpathSteps.MachineSetting("feedrate", original_feedrate)
                         current_feedrate = original_feedrate
                 last_pos = step.position
             else:
                 pass
-            new_path.append(step)
-        return new_path
+            yield step
 
 
-class Crop(BaseFilter):
+class Crop(BaseStreamFilter):
 
     PARAMS = ("polygons", )
     WEIGHT = 90
 
-    def filter_toolpath(self, toolpath):
-        new_path = []
+    def filter_steps(self, steps):
         last_pos = None
         optional_moves = []
-        for step in toolpath:
+        for step in steps:
             if step.action in MOVES_LIST:
                 if last_pos:
                     # find all remaining pieces of this line
@@ -326,16 +404,14 @@ class Crop(BaseFilter):
                     # turn these lines into moves
                     for line in inner_lines:
                         if pdist(line.p1, last_pos) > epsilon:
-                            new_path.append(ToolpathSteps.MoveSafety())
-                            new_path.append(
-                                ToolpathSteps.get_step_class_by_action(step.action)(line.p1))
+                            yield ToolpathSteps.MoveSafety()
+                            yield ToolpathSteps.get_step_class_by_action(step.action)(line.p1)
                         else:
                             # we continue where we left
-                            if optional_moves:
-                                new_path.extend(optional_moves)
-                                optional_moves = []
-                        new_path.append(
-                            ToolpathSteps.get_step_class_by_action(step.action)(line.p2))
+                            for optional_step in optional_moves:
+                                yield optional_step
+                            optional_moves = []
+                        yield ToolpathSteps.get_step_class_by_action(step.action)(line.p2)
                         last_pos = line.p2
                     optional_moves = []
                     # finish the line by moving to its end (if necessary)
@@ -346,29 +422,26 @@ class Crop(BaseFilter):
             elif step.action == MOVE_SAFETY:
                 optional_moves = []
             else:
-                new_path.append(step)
-        return new_path
+                yield step
 
 
-class TransformPosition(BaseFilter):
+class TransformPosition(BaseStreamFilter):
     """ shift or rotate a toolpath based on a given 3x3 or 3x4 matrix
     """
 
     PARAMS = ("matrix", )
     WEIGHT = 85
 
-    def filter_toolpath(self, toolpath):
-        new_path = []
-        for step in toolpath:
+    def filter_steps(self, steps):
+        for step in steps:
             if step.action in MOVES_LIST:
                 new_pos = ptransform_by_matrix(step.position, self.settings["matrix"])
-                new_path.append(ToolpathSteps.get_step_class_by_action(step.action)(new_pos))
+                yield ToolpathSteps.get_step_class_by_action(step.action)(new_pos)
             else:
-                new_path.append(step)
-        return new_path
+                yield step
 
 
-class TimeLimit(BaseFilter):
+class TimeLimit(BaseStreamFilter):
     """ This filter is used for the toolpath simulation. It returns only a partial toolpath within
     a given duration limit.
     """
@@ -376,13 +449,12 @@ class TimeLimit(BaseFilter):
     PARAMS = ("timelimit", )
     WEIGHT = 100
 
-    def filter_toolpath(self, toolpath):
+    def filter_steps(self, steps):
         feedrate = min_feedrate = 1
-        new_path = []
         last_pos = None
         limit = self.settings["timelimit"]
         duration = 0
-        for step in toolpath:
+        for step in steps:
             if step.action in MOVES_LIST:
                 if last_pos:
                     new_distance = pdist(step.position, last_pos)
@@ -396,32 +468,34 @@ class TimeLimit(BaseFilter):
                         duration += new_duration
                 else:
                     destination = step.position
-                new_path.append(ToolpathSteps.get_step_class_by_action(step.action)(destination))
+                yield ToolpathSteps.get_step_class_by_action(step.action)(destination)
                 last_pos = step.position
             if (step.action == MACHINE_SETTING) and (step.key == "feedrate"):
                 feedrate = step.value
             if duration >= limit:
                 break
-        return new_path
 
 
-class MovesOnly(BaseFilter):
+class MovesOnly(BaseStreamFilter):
     """ Use this filter for checking if a given toolpath is empty/useless
     (only machine settings, safety moves, ...).
     """
 
     WEIGHT = 95
 
-    def filter_toolpath(self, toolpath):
-        return [step for step in toolpath if step.action in MOVES_LIST]
+    def filter_steps(self, steps):
+        for step in steps:
+            if step.action in MOVES_LIST:
+                yield step
 
 
-class Copy(BaseFilter):
+class Copy(BaseStreamFilter):
 
     WEIGHT = 100
 
-    def filter_toolpath(self, toolpath):
-        return list(toolpath)
+    def filter_steps(self, steps):
+        for step in steps:
+            yield step
 
 
 def _get_num_of_significant_digits(number):
@@ -443,64 +517,81 @@ def _get_num_of_significant_digits(number):
         return MAX_DIGITS
 
 
-def _get_num_converter(step_width):
-    """ Return a float-to-decimal conversion function with a prevision suitable
-    for the given step width.
+def _get_num_quantizer(step_width):
+    """ Return a function converting a float number into an integer number of units and the
+    minimum step width in these units.
+
+    A unit is the smallest decimal digit suitable for the given step width. The conversion
+    matches the rounding of the number's text representation (e.g. "%.3f"). Two numbers are
+    at least one step width apart, if the difference of their units is not below the
+    returned minimum.
     """
     digits = _get_num_of_significant_digits(step_width)
+    scale = 10 ** digits
     format_string = "%%.%df" % digits
-    conv_func = lambda number: decimal.Decimal(format_string % number)
-    return conv_func, format_string
 
+    def quantize(number):
+        scaled = number * scale
+        result = int(round(scaled))
+        if (abs(scaled) >= QUANTIZE_MAX_UNITS) \
+                or (abs(abs(scaled - result) - 0.5) <= QUANTIZE_MARGIN):
+            # the product is not accurate enough for deciding the rounding direction
+            result = int((format_string % number).replace(".", ""))
+        return result
 
-class StepWidth(BaseFilter):
+    # the minimum number of units covering the exact (binary) value of the step width
+    step_width = fractions.Fraction(step_width) * scale
+    min_units = -(-step_width.numerator // step_width.denominator)
+    return quantize, min_units
+
+
+class StepWidth(BaseStreamFilter):
 
     PARAMS = ("step_width_x", "step_width_y", "step_width_z")
     NUM_OF_AXES = 3
     WEIGHT = 60
 
-    def filter_toolpath(self, toolpath):
-        minimum_steps = []
-        conv = []
-        for key in "xyz":
-            minimum_steps.append(self.settings["step_width_%s" % key])
-        for step_width in minimum_steps:
-            conv.append(_get_num_converter(step_width)[0])
+    def filter_steps(self, steps):
+        quantizers = [_get_num_quantizer(self.settings["step_width_%s" % key])
+                      for key in "xyz"]
         last_pos = None
-        path = []
-        for step in toolpath:
+        last_units = None
+        for step in steps:
             if step.action in MOVES_LIST:
+                units = [quantize(a_pos)
+                         for (quantize, _), a_pos in zip(quantizers, step.position)]
                 if last_pos:
                     real_target_position = []
-                    diff = [(abs(a_conv(a_last_pos) - a_conv(a_pos)))
-                            for a_conv, a_last_pos, a_pos in zip(conv, last_pos, step.position)]
+                    real_target_units = []
                     position_changed = False
                     # For every axis: if the new position is closer than the defined step width,
                     # then stay at the previous position.
                     # see https://sf.net/p/pycam/discussion/860184/thread/930b1c7f/
-                    for axis_distance, min_distance, axis_last, axis_wanted in zip(
-                            diff, minimum_steps, last_pos, step.position):
-                        if axis_distance >= min_distance:
+                    for (_, min_units), axis_last, axis_wanted, units_last, units_wanted in zip(
+                            quantizers, last_pos, step.position, last_units, units):
+                        if abs(units_wanted - units_last) >= min_units:
                             real_target_position.append(axis_wanted)
+                            real_target_units.append(units_wanted)
                             position_changed = True
                         else:
                             real_target_position.append(axis_last)
+                            real_target_units.append(units_last)
                     if not position_changed:
                         # The limitiation was not exceeded for any axis.
                         continue
                 else:
                     real_target_position = step.position
+                    real_target_units = units
                 # TODO: this would also change the GCode output - we want
                 # this, but it sadly breaks other code pieces that rely on
                 # floats instead of decimals at this point. The output
                 # conversion needs to move into the GCode output hook.
-#               destination = [a_conv(a_pos) for a_conv, a_pos in zip(conv, step.position)]
                 destination = real_target_position
-                path.append(ToolpathSteps.get_step_class_by_action(step.action)(destination))
+                yield ToolpathSteps.get_step_class_by_action(step.action)(destination)
                 # We store the real machine position (instead of the "wanted" position).
                 last_pos = real_target_position
+                last_units = real_target_units
             else:
                 # forget "last_pos" - we don't know what happened in between
                 last_pos = None
-                path.append(step)
-        return path
+                yield step
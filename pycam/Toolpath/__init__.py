@@ -339,12 +339,27 @@ class Toolpath(object):
         return self.get_machine_move_distance_and_time()[1]
 
     def get_machine_move_distance_and_time(self):
+        distances, durations = self.get_machine_move_distances_and_times()
+        if distances:
+            return distances[-1], durations[-1]
+        else:
+            return 0, 0
+
+    def get_machine_move_distances_and_times(self):
+        """ calculate the cumulative distance and machine time (in minutes) for each step of
+        the basic moves (see "get_basic_moves")
+
+        The values of a step include its move (if it is a move). The result is cached.
+        @returns: two lists (distances and durations) with one item per step
+        """
         if self._cache_machine_distance_and_time is None:
             min_feedrate = 1
             length = 0
             duration = 0
             feedrate = min_feedrate
             current_position = None
+            distances = []
+            durations = []
             # go through all points of the path
             for step in self.get_basic_moves():
                 if (step.action == MACHINE_SETTING) and (step.key == "feedrate"):
@@ -355,7 +370,9 @@ class Toolpath(object):
                         duration += distance / max(feedrate, min_feedrate)
                         length += distance
                     current_position = step.position
-            self._cache_machine_distance_and_time = length, duration
+                distances.append(length)
+                durations.append(duration)
+            self._cache_machine_distance_and_time = distances, durations
         return self._cache_machine_distance_and_time
 
     def get_basic_moves(self, filters=None, reset_cache=False):
@@ -32,6 +32,9 @@ class Iterator(object):
             self.ind += 1
             return item
 
+    # the builtin "next" is used by the callers (Python 3)
+    __next__ = next
+
     def insertBefore(self, item):
         self.seq.insert(self.ind - 1, item)
         self.ind += 1
@@ -85,6 +88,8 @@ class CyclicIterator(object):
             self.ind = 0
         return item
 
+    __next__ = next
+
     def copy(self):
         return CyclicIterator(self.seq, self.ind)
 
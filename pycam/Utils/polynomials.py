@@ -22,6 +22,12 @@ import math
 
 from pycam.Geometry import sqrt
 
+try:
+    import numpy
+except ImportError:
+    # only required for the vectorized functions (e.g. "poly4_roots_batch")
+    pass
+
 
 # see BRL-CAD/src/libbn/poly.c
 EPSILON = 1e-4
@@ -176,6 +182,132 @@ def poly4_roots(a, b, c, d, e):
         return None
 
 
+def _broadcast(*values):
+    return numpy.broadcast_arrays(*[numpy.asarray(value, dtype=float) for value in values])
+
+
+def poly1_roots_batch(a, b):
+    """ vectorized version of "poly1_roots"
+
+    All vectorized functions return an array with one row per equation and
+    one column for each possible root. Missing roots are NaN.
+    """
+    a, b = _broadcast(a, b)
+    valid = ~near_zero(a)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where(valid, -b / a, numpy.nan)[..., None]
+
+
+def poly2_roots_batch(a, b, c):
+    """ vectorized version of "poly2_roots" """
+    a, b, c = _broadcast(a, b, c)
+    linear = near_zero(a)
+    with numpy.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        d = b * b - 4 * a * c
+        q = numpy.sqrt(d)
+        root1 = numpy.where(a < 0, (-b + q) / (2 * a), (-b - q) / (2 * a))
+        root2 = numpy.where(a < 0, (-b - q) / (2 * a), (-b + q) / (2 * a))
+        # a double root is returned only once
+        root1 = numpy.where(d == 0, -b / (2 * a), root1)
+    root2 = numpy.where(d == 0, numpy.nan, root2)
+    root1 = numpy.where(linear, poly1_roots_batch(b, c)[..., 0], root1)
+    root2 = numpy.where(linear, numpy.nan, root2)
+    result = numpy.stack((root1, root2), axis=-1)
+    return numpy.where((d < 0)[..., None], numpy.nan, result)
+
+
+def poly3_roots_batch(a, b, c, d):
+    """ vectorized version of "poly3_roots" """
+    a, b, c, d = _broadcast(a, b, c, d)
+    quadratic = near_zero(a)
+    quadratic_roots = numpy.concatenate(
+        (poly2_roots_batch(b, c, d), numpy.full(quadratic.shape + (1, ), numpy.nan)), axis=-1)
+    # the results of degenerated equations are discarded
+    with numpy.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        c1 = b / a
+        c2 = c / a
+        c3 = d / a
+        c1_3 = c1 * INV_3
+        a = c2 - c1 * c1_3
+        b = (2 * c1 * c1 * c1 - 9 * c1 * c2 + 27 * c3) * INV_27
+        delta = a * a
+        delta = b * b * INV_4 + delta * a * INV_27
+        # delta > 0: one real root
+        r_delta = numpy.sqrt(delta)
+        A = _cuberoot_batch(-INV_2 * b + r_delta)
+        B = _cuberoot_batch(-INV_2 * b - r_delta)
+        one_root = A + B - c1_3
+        # delta == 0: one single and one double root
+        s = _cuberoot_batch(-b * INV_2)
+        double_roots = numpy.stack((2 * s - c1_3, -s - c1_3, -s - c1_3), axis=-1)
+        # delta < 0: three real roots
+        a_3 = a * -INV_3
+        fact = numpy.where(a > 0, 0, numpy.sqrt(a_3))
+        f = -b * INV_2 / (a_3 * fact)
+        phi = numpy.where(f >= 1.0, 0, numpy.where(f <= -1.0, PI_DIV_3,
+                                                   numpy.arccos(numpy.clip(f, -1, 1)) * INV_3))
+        phi = numpy.where(a > 0, 0, phi)
+        cs_phi = numpy.cos(phi)
+        sn_phi_s3 = numpy.sin(phi) * SQRT3
+        r1 = 2 * fact * cs_phi
+        r2 = fact * (sn_phi_s3 - cs_phi)
+        r3 = fact * (-sn_phi_s3 - cs_phi)
+        result = numpy.stack((r1 - c1_3, r2 - c1_3, r3 - c1_3), axis=-1)
+    result = numpy.where((delta == 0)[..., None], double_roots, result)
+    missing = numpy.full_like(one_root, numpy.nan)
+    result = numpy.where((delta > 0)[..., None],
+                         numpy.stack((one_root, missing, missing), axis=-1), result)
+    return numpy.where(quadratic[..., None], quadratic_roots, result)
+
+
+def _cuberoot_batch(x):
+    return numpy.where(x >= 0, numpy.power(numpy.abs(x), INV_3),
+                       -numpy.power(numpy.abs(x), INV_3))
+
+
+def poly4_roots_batch(a, b, c, d, e):
+    """ vectorized version of "poly4_roots"
+
+    The numerical safeguards ("near_zero" and "SMALL") are applied to each
+    equation in the same way as in "poly4_roots".
+    """
+    a, b, c, d, e = _broadcast(a, b, c, d, e)
+    cubic = (a == 0)
+    cubic_roots = numpy.concatenate(
+        (poly3_roots_batch(b, c, d, e), numpy.full(cubic.shape + (1, ), numpy.nan)), axis=-1)
+    # the results of degenerated equations are discarded
+    with numpy.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        c1 = b / a
+        c2 = c / a
+        c3 = d / a
+        c4 = e / a
+        roots3 = poly3_roots_batch(1.0, -c2, c3 * c1 - 4 * c4,
+                                   -c3 * c3 - c4 * c1 * c1 + 4 * c4 * c2)
+        # the largest root (NaN, if there is none)
+        U = numpy.fmax.reduce(roots3, axis=-1)
+        valid = ~numpy.isnan(U)
+        p = c1 * c1 * INV_4 + U - c2
+        U = U * INV_2
+        q = U * U - c4
+        valid &= ~(p < -SMALL) & ~(q < -SMALL)
+        p = numpy.where(p < 0, 0, numpy.sqrt(p))
+        q = numpy.where(q < 0, 0, numpy.sqrt(q))
+        quad1_b = c1 * INV_2 - p
+        quad2_b = c1 * INV_2 + p
+        q1 = U - q
+        q2 = U + q
+        p = quad1_b * q2 + quad2_b * q1 - c3
+        q = quad1_b * q1 + quad2_b * q2 - c3
+        first_order = near_zero(p)
+        valid &= first_order | near_zero(q)
+        quad1_c = numpy.where(first_order, q1, q2)
+        quad2_c = numpy.where(first_order, q2, q1)
+        result = numpy.concatenate((poly2_roots_batch(1.0, quad1_b, quad1_c),
+                                    poly2_roots_batch(1.0, quad2_b, quad2_c)), axis=-1)
+    result = numpy.where(valid[..., None], result, numpy.nan)
+    return numpy.where(cubic[..., None], cubic_roots, result)
+
+
 def test_poly1(a, b):
     roots = poly1_roots(a, b)
     print(a, "*x+", b, "=0 ", roots)
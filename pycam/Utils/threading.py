@@ -20,7 +20,11 @@ along with PyCAM.  If not, see <http://www.gnu.org/licenses/>.
 
 # multiprocessing is imported later
 # import multiprocessing
+import atexit
+import collections
+import math
 import os
+import pickle
 import platform
 try:
     import queue
@@ -31,6 +35,7 @@ import random
 import signal
 import socket
 import sys
+import tempfile
 import time
 import uuid
 
@@ -76,6 +81,16 @@ __closing = None
 __task_source_uuid = None
 __finished_jobs = []
 __issued_warnings = []
+# see LocalWorkerPool
+__local_pool = None
+DEFAULT_WORKER_CACHE_SIZE = 8
+# see "_get_chunk_size"
+CHUNKS_PER_WORKER = 4
+MAX_TRANSFER_OVERHEAD = 0.05
+# objects received via SharedDataItemID (within local worker processes)
+__shared_data_cache = collections.OrderedDict()
+__shared_data_cache_size = DEFAULT_WORKER_CACHE_SIZE
+__cancelled_job = None
 
 
 def run_in_parallel(*args, **kwargs):
@@ -91,7 +106,7 @@ def run_in_parallel(*args, **kwargs):
 
 
 def is_pool_available():
-    return __manager is not None
+    return (__manager is not None) or (__local_pool is not None)
 
 
 def is_multiprocessing_available():
@@ -142,16 +157,28 @@ def get_number_of_cores():
 
 
 def get_pool_statistics():
+    """ return a tuple for each worker: name, seconds since last notification, number of tasks,
+    process time, average process time, average transfer time, cache hits, cache misses and
+    transferred bytes
+    """
     global __manager
-    if __manager is None:
-        return []
-    else:
+    if __manager is not None:
         return __manager.statistics().get_worker_statistics()
+    elif __local_pool is not None:
+        return __local_pool.statistics.get_worker_statistics()
+    else:
+        return []
 
 
 def get_task_statistics():
     global __manager
     result = {}
+    if __local_pool is not None:
+        result.update(__local_pool.get_cache_statistics())
+    # the scan lines of the tasks processed within this process (e.g. without workers)
+    hits, misses = _get_scan_line_statistics()
+    result["scan line hits"] = result.get("scan line hits", 0) + hits
+    result["scan line misses"] = result.get("scan line misses", 0) + misses
     if __manager is not None:
         try:
             result["tasks"] = __manager.tasks().qsize()
@@ -161,6 +188,9 @@ def get_task_statistics():
             pass
         result["pending"] = __manager.pending_tasks().length()
         result["cache"] = __manager.cache().length()
+        totals = __manager.statistics().get_cache_totals()
+        for key in ("scan line hits", "scan line misses"):
+            result[key] += totals[key]
     return result
 
 
@@ -193,7 +223,8 @@ class ManagerInfo(object):
 
 def init_threading(number_of_processes=None, enable_server=False, remote=None, run_server=False,
                    server_credentials="", local_port=DEFAULT_PORT):
-    global __multiprocessing, __num_of_processes, __manager, __closing, __task_source_uuid
+    global __multiprocessing, __num_of_processes, __manager, __closing, __task_source_uuid, \
+        __local_pool
     if __multiprocessing:
         # kill the manager and clean everything up for a re-initialization
         cleanup()
@@ -252,12 +283,17 @@ def init_threading(number_of_processes=None, enable_server=False, remote=None, r
         else:
             __multiprocessing = multiprocessing
             __num_of_processes = number_of_processes
+    if __multiprocessing and not __num_of_processes and not enable_server and not run_server:
+        # zero local processes are only useful for a server
+        __multiprocessing = False
     # initialize the manager
     if not __multiprocessing:
         __manager = None
         log.info("Disabled parallel processing")
     elif not enable_server and not run_server:
         __manager = None
+        # the workers are started once and reused for all tasks
+        __local_pool = LocalWorkerPool(__multiprocessing, __num_of_processes)
         log.info("Enabled %d parallel local processes", __num_of_processes)
     else:
         # with multiprocessing
@@ -345,7 +381,11 @@ def init_threading(number_of_processes=None, enable_server=False, remote=None, r
 
 
 def cleanup():
-    global __multiprocessing, __manager, __closing
+    global __multiprocessing, __manager, __closing, __local_pool
+    if __local_pool is not None:
+        log.debug("Shutting down local worker pool")
+        __local_pool.terminate()
+        __local_pool = None
     if __multiprocessing and __closing:
         log.debug("Shutting down process handler")
         try:
@@ -440,43 +480,113 @@ def _handle_tasks(tasks, results, stats, cache, pending_tasks, closing):
             log.debug("Worker %s processes %s / %s", name, job_id, task_id)
             # reset the timeout counter, if we found another item in the queue
             timeout_counter = 0
-            real_args = []
-            for arg in args:
-                if isinstance(arg, ProcessDataCacheItemID):
-                    try:
-                        value = local_cache.get(arg)
-                    except KeyError:
-                        # TODO: we will break hard, if the item is expired
-                        value = cache.get(arg)
-                        local_cache.add(arg, value)
-                    real_args.append(value)
-                elif isinstance(arg, list) and [True for item in arg
-                                                if isinstance(item, ProcessDataCacheItemID)]:
-                    # check if any item in the list is cacheable
-                    args_list = []
-                    for item in arg:
-                        if isinstance(item, ProcessDataCacheItemID):
-                            try:
-                                value = local_cache.get(item)
-                            except KeyError:
-                                value = cache.get(item)
-                                local_cache.add(item, value)
-                            args_list.append(value)
-                        else:
-                            args_list.append(item)
-                    real_args.append(args_list)
-                else:
-                    real_args.append(arg)
+            # each task contains a chunk of argument lists
+            real_args_chunk = [_resolve_cached_args(one_args, local_cache, cache)
+                               for one_args in args]
             stats.add_transfer_time(name, time.time() - start_time)
             start_time = time.time()
-            results.put((job_id, task_id, func(real_args)))
+            scan_lines_before = _get_scan_line_statistics()
+            results.put((job_id, task_id, [func(real_args) for real_args in real_args_chunk]))
             pending_tasks.remove(job_id, task_id)
-            stats.add_process_time(name, time.time() - start_time)
+            stats.add_process_time(name, time.time() - start_time, count=len(args))
+            scan_line_hits, scan_line_misses = [
+                after - before for before, after in zip(scan_lines_before,
+                                                        _get_scan_line_statistics())]
+            stats.add_cache_statistics(name, 0, 0, 0, scan_line_hits=scan_line_hits,
+                                       scan_line_misses=scan_line_misses)
     except KeyboardInterrupt:
         pass
     log.debug("Worker thread finished after %d seconds of inactivity: %s", timeout_counter, name)
 
 
+def _resolve_cached_args(args, local_cache, cache):
+    """ replace the ProcessDataCacheItemID items of the arguments with the real values """
+    real_args = []
+    for arg in args:
+        if isinstance(arg, ProcessDataCacheItemID):
+            try:
+                value = local_cache.get(arg)
+            except KeyError:
+                # TODO: we will break hard, if the item is expired
+                value = cache.get(arg)
+                local_cache.add(arg, value)
+            real_args.append(value)
+        elif isinstance(arg, list) and [True for item in arg
+                                        if isinstance(item, ProcessDataCacheItemID)]:
+            # check if any item in the list is cacheable
+            args_list = []
+            for item in arg:
+                if isinstance(item, ProcessDataCacheItemID):
+                    try:
+                        value = local_cache.get(item)
+                    except KeyError:
+                        value = cache.get(item)
+                        local_cache.add(item, value)
+                    args_list.append(value)
+                else:
+                    args_list.append(item)
+            real_args.append(args_list)
+        else:
+            real_args.append(arg)
+    return real_args
+
+
+def _get_cached_args(args, remote_cache, job_id, known_items):
+    """ add suitable arguments to the cache and replace them with a ProcessDataCacheItemID
+
+    @param known_items: set of uuids that were added to the cache before (during this job)
+    """
+    result_args = []
+    for arg in args:
+        # add the argument to the cache if possible
+        if hasattr(arg, "uuid"):
+            data_uuid = ProcessDataCacheItemID(arg.uuid)
+            if (arg.uuid not in known_items) and not remote_cache.contains(data_uuid):
+                log.debug("Adding cache item for job %s: %s - %s",
+                          job_id, arg.uuid, arg.__class__)
+                remote_cache.add(data_uuid, arg)
+            known_items.add(arg.uuid)
+            result_args.append(data_uuid)
+        elif isinstance(arg, (list, set, tuple)):
+            # a list with - maybe containing cacheable items
+            new_arg_list = []
+            for item in arg:
+                try:
+                    data_uuid = ProcessDataCacheItemID(item.uuid)
+                except AttributeError:
+                    # non-cacheable item
+                    new_arg_list.append(item)
+                    continue
+                if (item.uuid not in known_items) and not remote_cache.contains(data_uuid):
+                    log.debug("Adding cache item from list for job %s: %s - %s",
+                              job_id, item.uuid, item.__class__)
+                    remote_cache.add(data_uuid, item)
+                known_items.add(item.uuid)
+                new_arg_list.append(data_uuid)
+            result_args.append(new_arg_list)
+        else:
+            result_args.append(arg)
+    return result_args
+
+
+def _get_chunk_size(stats, number_of_tasks, number_of_workers):
+    """ calculate a suitable number of tasks to be transferred together
+
+    Bigger chunks reduce the overhead of the transfer (queues and proxies) per
+    task, while smaller chunks distribute the tasks more evenly among the
+    workers. The timing of previous tasks is taken from ProcessStatistics.
+    """
+    # every worker should receive a few chunks
+    max_size = max(1, number_of_tasks // (CHUNKS_PER_WORKER * max(1, number_of_workers)))
+    process_time, overhead_time = stats.get_task_timing()
+    if not process_time:
+        # no statistics available yet
+        return max_size
+    # the overhead should be small compared to the processing time of a chunk
+    size = int(math.ceil(overhead_time / (MAX_TRANSFER_OVERHEAD * process_time)))
+    return max(1, min(size, max_size))
+
+
 def run_in_parallel_remote(func, args_list, unordered=False, disable_multiprocessing=False,
                            callback=None):
     global __multiprocessing, __num_of_processes, __manager, __task_source_uuid, __finished_jobs
@@ -492,46 +602,29 @@ def run_in_parallel_remote(func, args_list, unordered=False, disable_multiproces
         stats = __manager.statistics()
         pending_tasks = __manager.pending_tasks()
         # add all tasks of this job to the queue
-        for index, args in enumerate(args_list):
-            if callback:
-                callback()
+        args_list = list(args_list)
+        chunk_size = _get_chunk_size(stats, len(args_list),
+                                     max(len(stats.get_worker_statistics()), __num_of_processes))
+        chunks = [args_list[chunk_start:chunk_start + chunk_size]
+                  for chunk_start in range(0, len(args_list), chunk_size)]
+        log.debug("Splitting %d tasks of job %s into %d chunks", len(args_list), job_id,
+                  len(chunks))
+        known_items = set()
+        for index, chunk in enumerate(chunks):
             start_time = time.time()
-            result_args = []
-            for arg in args:
-                # add the argument to the cache if possible
-                if hasattr(arg, "uuid"):
-                    data_uuid = ProcessDataCacheItemID(arg.uuid)
-                    if not remote_cache.contains(data_uuid):
-                        log.debug("Adding cache item for job %s: %s - %s",
-                                  job_id, arg.uuid, arg.__class__)
-                        remote_cache.add(data_uuid, arg)
-                    result_args.append(data_uuid)
-                elif isinstance(arg, (list, set, tuple)):
-                    # a list with - maybe containing cacheable items
-                    new_arg_list = []
-                    for item in arg:
-                        try:
-                            data_uuid = ProcessDataCacheItemID(item.uuid)
-                        except AttributeError:
-                            # non-cacheable item
-                            new_arg_list.append(item)
-                            continue
-                        if not remote_cache.contains(data_uuid):
-                            log.debug("Adding cache item from list for job %s: %s - %s",
-                                      job_id, item.uuid, item.__class__)
-                            remote_cache.add(data_uuid, item)
-                        new_arg_list.append(data_uuid)
-                    result_args.append(new_arg_list)
-                else:
-                    result_args.append(arg)
-            tasks_queue.put((job_id, index, func, result_args))
+            result_chunk = []
+            for args in chunk:
+                if callback:
+                    callback()
+                result_chunk.append(_get_cached_args(args, remote_cache, job_id, known_items))
+            tasks_queue.put((job_id, index, func, result_chunk))
             stats.add_queueing_time(__task_source_uuid, time.time() - start_time)
         log.debug("Added %d tasks for job %s", len(args_list), job_id)
         result_buffer = {}
         index = 0
         cancelled = False
-        # wait for all results of this job
-        while (index < len(args_list)) and not cancelled:
+        # wait for the results of all chunks of this job
+        while (index < len(chunks)) and not cancelled:
             if callback and callback():
                 # cancel requested
                 cancelled = True
@@ -561,17 +654,19 @@ def run_in_parallel_remote(func, args_list, unordered=False, disable_multiproces
                 log.debug("Received the result of a task: %s / %s", job_id, task_id)
                 try:
                     if unordered:
-                        # just return the values in any order
-                        yield result
+                        # just return the chunks in any order
+                        for one_result in result:
+                            yield one_result
                         index += 1
                     else:
-                        # return the results in order (based on task_id)
+                        # return the chunks in order (based on task_id)
                         if task_id == index:
-                            yield result
+                            for one_result in result:
+                                yield one_result
                             index += 1
                             while index in result_buffer.keys():
-                                yield result_buffer[index]
-                                del result_buffer[index]
+                                for one_result in result_buffer.pop(index):
+                                    yield one_result
                                 index += 1
                         else:
                             result_buffer[task_id] = result
@@ -632,36 +727,335 @@ def _cleanup_job(job_id, tasks_queue, pending_tasks, finished_jobs):
 
 def run_in_parallel_local(func, args, unordered=False, disable_multiprocessing=False,
                           callback=None):
-    global __multiprocessing, __num_of_processes
+    global __multiprocessing, __local_pool
     if __multiprocessing is None:
         # threading was not configured before
         init_threading()
-    if __multiprocessing and not disable_multiprocessing:
-        # use the number of CPUs as the default number of worker threads
-        pool = __multiprocessing.Pool(__num_of_processes)
+    if __multiprocessing and (__local_pool is not None) and not disable_multiprocessing:
+        for result in __local_pool.imap(func, args, unordered=unordered):
+            if callback and callback():
+                # cancel requested
+                break
+            yield result
+    else:
+        for arg in args:
+            if callback and callback():
+                # cancel requested
+                break
+            yield func(arg)
+
+
+class LocalWorkerPool(object):
+    """ long-lived local worker processes (started by "init_threading")
+
+    Big arguments of the tasks (e.g. models and cutters) are published via
+    shared memory (see SharedDataStore). Each worker keeps the received
+    objects in a cache (least recently used items are removed), thus
+    subsequent calls of "run_in_parallel" (e.g. for every layer) do not
+    transfer the same model again.
+    """
+
+    def __init__(self, multiprocessing, number_of_processes,
+                 cache_size=DEFAULT_WORKER_CACHE_SIZE):
+        # the store needs to be created before the workers
+        self.shared_data = SharedDataStore(max_items=4 * cache_size)
+        self.statistics = ProcessStatistics(timeout=None)
+        # the tasks of cancelled jobs are skipped
+        self._cancelled_job = multiprocessing.Value("l", 0)
+        self._job_counter = 0
+        self._pool = multiprocessing.Pool(number_of_processes, initializer=_init_pool_worker,
+                                          initargs=(self._cancelled_job, cache_size))
+        atexit.register(self.terminate)
+
+    def imap(self, func, args, unordered=False):
+        """ process all items of "args" with "func" and return the results (a generator) """
+        self._job_counter += 1
+        job_id = self._job_counter
+        tasks = ((job_id, func, self.shared_data.replace_args(arg, job_id=job_id))
+                 for arg in args)
         if unordered:
-            imap_func = pool.imap_unordered
+            imap_func = self._pool.imap_unordered
         else:
-            imap_func = pool.imap
-        # We need to use try/finally here to ensure the garbage collection
-        # of "pool". Otherwise a memory overflow is caused for Python 2.7.
+            imap_func = self._pool.imap
+        finished = False
         try:
             # Beware: we may not return "pool.imap" or "pool.imap_unordered"
             # directly. It would somehow loose the focus and just hang infinitely.
             # Thus we wrap our own generator around it.
-            for result in imap_func(func, args):
-                if callback and callback():
-                    # cancel requested
-                    break
+            for result, info in imap_func(_run_task_with_shared_data, tasks):
+                if info is not None:
+                    (name, hits, misses, transferred_bytes, transfer_time, process_time,
+                     scan_line_hits, scan_line_misses) = info
+                    self.statistics.worker_notification(name)
+                    self.statistics.add_transfer_time(name, transfer_time)
+                    self.statistics.add_process_time(name, process_time)
+                    self.statistics.add_cache_statistics(
+                        name, hits, misses, transferred_bytes, scan_line_hits=scan_line_hits,
+                        scan_line_misses=scan_line_misses)
                 yield result
+            finished = True
         finally:
-            pool.terminate()
-    else:
+            if not finished:
+                # the pool is kept alive - thus we need to skip the remaining tasks
+                self._cancelled_job.value = job_id
+            self.shared_data.finish_job(job_id)
+
+    def get_cache_statistics(self):
+        result = {"shared items": self.shared_data.length()}
+        for key, value in self.statistics.get_cache_totals().items():
+            result[key] = value
+        return result
+
+    def terminate(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self.shared_data.release()
+
+
+def _init_pool_worker(cancelled_job, cache_size):
+    global __cancelled_job, __shared_data_cache_size
+    __cancelled_job = cancelled_job
+    __shared_data_cache_size = cache_size
+    __shared_data_cache.clear()
+
+
+def _run_task_with_shared_data(task):
+    """ resolve the shared arguments of a task and run it (within a worker process)
+
+    @returns: the result of the task and a tuple of statistics (or None for skipped tasks):
+        name of the worker, shared data cache hits, cache misses, transferred bytes, transfer
+        time, process time, scan line hits and scan line misses
+    """
+    job_id, func, args = task
+    if (__cancelled_job is not None) and (job_id <= __cancelled_job.value):
+        return None, None
+    start_time = time.time()
+    counters = [0, 0, 0]
+    real_args = []
+    try:
         for arg in args:
-            if callback and callback():
-                # cancel requested
+            if isinstance(arg, SharedDataItemID):
+                real_args.append(_get_shared_data(arg, counters))
+            elif isinstance(arg, list):
+                real_args.append([_get_shared_data(item, counters)
+                                  if isinstance(item, SharedDataItemID) else item
+                                  for item in arg])
+            else:
+                real_args.append(arg)
+    except (IOError, OSError):
+        # the data of a cancelled job may be released before all of its tasks are skipped
+        if (__cancelled_job is not None) and (job_id <= __cancelled_job.value):
+            return None, None
+        raise
+    transfer_time = time.time() - start_time
+    start_time = time.time()
+    scan_lines_before = _get_scan_line_statistics()
+    result = func(real_args)
+    process_time = time.time() - start_time
+    scan_line_hits, scan_line_misses = [
+        after - before for before, after in zip(scan_lines_before, _get_scan_line_statistics())]
+    import multiprocessing
+    name = multiprocessing.current_process().name
+    return result, (name, counters[0], counters[1], counters[2], transfer_time, process_time,
+                    scan_line_hits, scan_line_misses)
+
+
+def _get_scan_line_statistics():
+    """ return the hits and misses of the scan line caches within this process
+
+    The counters of worker processes are transferred along with the results of
+    their tasks (see ProcessStatistics.add_cache_statistics).
+    """
+    from pycam.Geometry.ScanLineCache import ScanLineCache
+    statistics = ScanLineCache.get_statistics()
+    return statistics["hits"], statistics["misses"]
+
+
+def _get_shared_data(item_id, counters):
+    """ retrieve a published object within a worker process (see SharedDataStore)
+
+    @param counters: list of cache hits, cache misses and transferred bytes (to be updated)
+    """
+    try:
+        value = __shared_data_cache.pop(item_id.key)
+    except KeyError:
+        pass
+    else:
+        # mark the item as recently used
+        __shared_data_cache[item_id.key] = value
+        counters[0] += 1
+        return value
+    if item_id.is_file:
+        with open(item_id.location, "rb") as in_file:
+            data = in_file.read()
+    else:
+        from multiprocessing import shared_memory
+        # the memory is owned (and removed) by the publishing process
+        try:
+            memory = shared_memory.SharedMemory(name=item_id.location, track=False)
+        except TypeError:
+            # Python < 3.13: the memory is registered with the resource tracker of the
+            # publishing process (see SharedDataStore)
+            memory = shared_memory.SharedMemory(name=item_id.location)
+        try:
+            data = bytes(memory.buf[:item_id.size])
+        finally:
+            memory.close()
+    value = pickle.loads(data)
+    counters[1] += 1
+    counters[2] += len(data)
+    __shared_data_cache[item_id.key] = value
+    # remove the least recently used items
+    while len(__shared_data_cache) > __shared_data_cache_size:
+        __shared_data_cache.popitem(last=False)
+    return value
+
+
+class SharedDataItemID(object):
+    """ reference to an object published by SharedDataStore """
+
+    def __init__(self, key, location, size, is_file):
+        self.key = key
+        self.location = location
+        self.size = size
+        self.is_file = is_file
+
+
+class SharedDataStore(object):
+    """ publish objects once for all local worker processes
+
+    Every object with a "uuid" attribute (e.g. a model or a cutter) is pickled
+    into a block of shared memory - or into a temporary file if
+    "multiprocessing.shared_memory" is not available (Python < 3.8).
+    The tasks contain only a small reference (SharedDataItemID) instead of the
+    object. Each worker unpickles the object once and keeps it afterwards.
+    The least recently used objects are released, if more than "max_items"
+    objects are published. Objects referenced by the tasks of unfinished jobs
+    are kept (see "finish_job").
+    """
+
+    def __init__(self, max_items=None):
+        import multiprocessing
+        self._items = collections.OrderedDict()
+        # the ids of the unfinished jobs referencing each item
+        self._references = {}
+        self._finished_jobs = set()
+        # Beware: the items are published by the task handler thread of the pool (a single
+        # thread for all jobs), while jobs are finished by the thread consuming the results.
+        self._lock = multiprocessing.Lock()
+        self._max_items = max_items
+        if os.name == "posix":
+            try:
+                from multiprocessing import resource_tracker
+            except ImportError:
+                pass
+            else:
+                # The worker processes need to share the resource tracker of this process
+                # (it is started on demand). Otherwise a separate resource tracker would
+                # remove the shared memory as soon as one of the workers finishes.
+                # Thus the store needs to be created before the workers.
+                resource_tracker.ensure_running()
+
+    def publish(self, value, job_id=None):
+        """ return a reference to the published object (or the object itself on failure)
+
+        @param job_id: the object is kept until this job is finished (see "finish_job")
+        """
+        with self._lock:
+            if (job_id is not None) and (job_id not in self._finished_jobs):
+                self._references.setdefault(str(value.uuid), set()).add(job_id)
+            return self._publish(value)
+
+    def _publish(self, value):
+        key = str(value.uuid)
+        if key in self._items:
+            # mark the item as recently used
+            item = self._items.pop(key)
+            self._items[key] = item
+            return item[0]
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        try:
+            try:
+                from multiprocessing import shared_memory
+            except ImportError:
+                handle, location = tempfile.mkstemp(prefix="pycam-shared-")
+                with os.fdopen(handle, "wb") as out_file:
+                    out_file.write(data)
+                item_id = SharedDataItemID(key, location, len(data), True)
+                memory = None
+            else:
+                memory = shared_memory.SharedMemory(create=True, size=len(data))
+                memory.buf[:len(data)] = data
+                item_id = SharedDataItemID(key, memory.name, len(data), False)
+        except (IOError, OSError) as exc:
+            log.debug("Failed to publish data for worker processes: %s", exc)
+            return value
+        self._items[key] = (item_id, memory)
+        self._release_unused_items(keep=key)
+        return item_id
+
+    def finish_job(self, job_id):
+        """ release the references of a job - its tasks do not access the objects anymore
+
+        The tasks of a cancelled job may still be running. Thus they need to
+        tolerate missing objects (see "_run_task_with_shared_data").
+        """
+        with self._lock:
+            self._finished_jobs.add(job_id)
+            for key in list(self._references):
+                self._references[key].discard(job_id)
+                if not self._references[key]:
+                    del self._references[key]
+            self._release_unused_items()
+
+    def _release_unused_items(self, keep=None):
+        """ release the least recently used items exceeding "max_items"
+
+        Items referenced by unfinished jobs (and the item "keep") are skipped.
+        """
+        if self._max_items is None:
+            return
+        excess = len(self._items) - self._max_items
+        for key in list(self._items):
+            if excess <= 0:
                 break
-            yield func(arg)
+            if (key != keep) and (key not in self._references):
+                self._release_item(*self._items.pop(key))
+                excess -= 1
+
+    def replace_args(self, args, job_id=None):
+        """ replace all suitable arguments (and items of list arguments) with references """
+        result = []
+        for arg in args:
+            if hasattr(arg, "uuid"):
+                result.append(self.publish(arg, job_id=job_id))
+            elif isinstance(arg, list):
+                result.append([self.publish(item, job_id=job_id) if hasattr(item, "uuid")
+                               else item for item in arg])
+            else:
+                result.append(arg)
+        return result
+
+    def _release_item(self, item_id, memory):
+        try:
+            if memory is None:
+                os.remove(item_id.location)
+            else:
+                memory.close()
+                memory.unlink()
+        except (IOError, OSError) as exc:
+            log.debug("Failed to release data of worker processes: %s", exc)
+
+    def release(self):
+        with self._lock:
+            for item_id, memory in self._items.values():
+                self._release_item(item_id, memory)
+            self._items.clear()
+            self._references.clear()
+
+    def length(self):
+        return len(self._items)
 
 
 class OneProcess(object):
@@ -672,6 +1066,11 @@ class OneProcess(object):
         self.transfer_count = 0
         self.process_time = 0
         self.process_count = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.transferred_bytes = 0
+        self.scan_line_hits = 0
+        self.scan_line_misses = 0
 
     def __str__(self):
         try:
@@ -704,6 +1103,9 @@ class ProcessStatistics(object):
                                 for item in self.processes.values() + self.queues.values()])
 
     def _refresh_workers(self):
+        if self.timeout is None:
+            # never forget workers (e.g. the local pool)
+            return
         oldest_valid = time.time() - self.timeout
         # be careful: the workers dictionary can be changed within the loop
         for key, timestamp in list(self.workers.items()):
@@ -722,10 +1124,11 @@ class ProcessStatistics(object):
         self.processes[name].transfer_count += 1
         self.processes[name].transfer_time += amount
 
-    def add_process_time(self, name, amount):
+    def add_process_time(self, name, amount, count=1):
+        """ add the processing time of "count" tasks """
         if name not in self.processes.keys():
             self.processes[name] = OneProcess(name)
-        self.processes[name].process_count += 1
+        self.processes[name].process_count += count
         self.processes[name].process_time += amount
 
     def add_queueing_time(self, name, amount):
@@ -734,6 +1137,44 @@ class ProcessStatistics(object):
         self.queues[name].transfer_count += 1
         self.queues[name].transfer_time += amount
 
+    def add_cache_statistics(self, name, hits, misses, transferred_bytes, scan_line_hits=0,
+                             scan_line_misses=0):
+        """ add the counters of the shared data cache and of the scan line caches (see
+        ScanLineCache) of a worker
+        """
+        if name not in self.processes.keys():
+            self.processes[name] = OneProcess(name)
+        self.processes[name].cache_hits += hits
+        self.processes[name].cache_misses += misses
+        self.processes[name].transferred_bytes += transferred_bytes
+        self.processes[name].scan_line_hits += scan_line_hits
+        self.processes[name].scan_line_misses += scan_line_misses
+
+    def get_task_timing(self):
+        """ return the average processing time of a task and the average overhead (queueing
+        and transfer) of sending a chunk of tasks to a worker - or (None, None)
+        """
+        processes = list(self.processes.values())
+        process_count = sum(process.process_count for process in processes)
+        transfer_count = sum(process.transfer_count for process in processes)
+        if not process_count or not transfer_count:
+            return None, None
+        process_time = sum(process.process_time for process in processes) / process_count
+        overhead_time = sum(process.transfer_time for process in processes) / transfer_count
+        queues = list(self.queues.values())
+        queue_count = sum(one_queue.transfer_count for one_queue in queues)
+        if queue_count:
+            overhead_time += sum(one_queue.transfer_time for one_queue in queues) / queue_count
+        return process_time, overhead_time
+
+    def get_cache_totals(self):
+        processes = list(self.processes.values())
+        return {"cache hits": sum(process.cache_hits for process in processes),
+                "cache misses": sum(process.cache_misses for process in processes),
+                "transferred bytes": sum(process.transferred_bytes for process in processes),
+                "scan line hits": sum(process.scan_line_hits for process in processes),
+                "scan line misses": sum(process.scan_line_misses for process in processes)}
+
     def worker_notification(self, name):
         timestamp = time.time()
         self.workers[name] = timestamp
@@ -757,7 +1198,8 @@ class ProcessStatistics(object):
             avg_process_time = process_time / max(1, num_of_tasks)
             avg_transfer_time = one_process.transfer_time / max(1, num_of_tasks)
             result.append((key, last_notification, num_of_tasks, process_time, avg_process_time,
-                           avg_transfer_time))
+                           avg_transfer_time, one_process.cache_hits, one_process.cache_misses,
+                           one_process.transferred_bytes))
         return result
 
 
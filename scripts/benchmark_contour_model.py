@@ -0,0 +1,71 @@
+""" Measure the time for linking line segments into polygons (ContourModel.append)
+
+The segments of many small polygons (e.g. the outlines of text in a DXF or
+SVG file) are appended in a random order. Some segments are reversed - these
+are connected only with "allow_reverse". The time per segment should not
+depend on the number of segments.
+
+usage: benchmark_contour_model.py [SEGMENTS [SEGMENTS ...]]
+"""
+
+import logging
+import math
+import random
+import sys
+from time import time
+
+from pycam.Geometry.Line import Line
+from pycam.Geometry.Model import ContourModel
+import pycam.Utils.log
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+SEGMENTS_PER_POLYGON = 20
+
+
+def get_segments(count, reverse_ratio=0.2):
+    """ return the shuffled segments of closed polygons (the given number of segments) """
+    rnd = random.Random(42)
+    segments = []
+    polygon_count = max(1, count // SEGMENTS_PER_POLYGON)
+    columns = int(math.ceil(math.sqrt(polygon_count)))
+    for index in range(polygon_count):
+        center_x = 20 * (index % columns)
+        center_y = 20 * (index // columns)
+        points = [(center_x + 5 * math.cos(2 * math.pi * step / SEGMENTS_PER_POLYGON),
+                   center_y + 5 * math.sin(2 * math.pi * step / SEGMENTS_PER_POLYGON), 0)
+                  for step in range(SEGMENTS_PER_POLYGON)]
+        for p1, p2 in zip(points, points[1:] + points[:1]):
+            if rnd.random() < reverse_ratio:
+                p1, p2 = p2, p1
+            segments.append(Line(p1, p2))
+    rnd.shuffle(segments)
+    return segments
+
+
+def measure(count):
+    segments = get_segments(count)
+    results = []
+    for allow_reverse in (False, True):
+        model = ContourModel()
+        start_time = time()
+        for line in segments:
+            model.append(line, allow_reverse=allow_reverse)
+        duration = time() - start_time
+        closed = len([polygon for polygon in model.get_polygons() if polygon.is_closed])
+        results.extend((duration, closed))
+    print("%9d %9d  %9.3f %9d  %9.3f %9d" % ((len(segments), len(segments) // SEGMENTS_PER_POLYGON)
+                                             + tuple(results)))
+
+
+def main(sizes):
+    pycam.Utils.log.get_logger().setLevel(logging.WARNING)
+    print("times in seconds (closed: number of closed polygons)")
+    print("%9s %9s  %9s %9s  %9s %9s" % ("segments", "polygons", "directed", "closed",
+                                         "reversed", "closed"))
+    for count in (sizes or DEFAULT_SIZES):
+        measure(count)
+
+
+if __name__ == "__main__":
+    main([int(value) for value in sys.argv[1:]])
@@ -0,0 +1,81 @@
+""" Measure the throughput of the GCode export (LinuxCNC exporter)
+
+A surfacing toolpath (parallel lines with small steps and a wavy height) is
+exported together with the usual machine settings and the minimum step width
+filter. The resulting number of lines per second should not depend on the
+size of the toolpath. The MD5 sum of the output allows to compare the output
+of different versions of the exporter.
+
+usage: benchmark_gcode_export.py [STEPS [STEPS ...]]
+"""
+
+import hashlib
+import logging
+import math
+import os
+import sys
+import tempfile
+from time import time
+
+from pycam.Exporters.GCode.LinuxCNC import LinuxCNC
+import pycam.Toolpath.Filters as Filters
+from pycam.Toolpath.Steps import MoveStraight, MoveStraightRapid, MoveSafety, Comment
+import pycam.Utils.log
+
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+STEPS_PER_LINE = 1000
+
+
+def get_moves(count):
+    """ return the steps of a surfacing toolpath (the given number of moves) """
+    moves = [Comment("surfacing")]
+    for index in range(count):
+        line, column = divmod(index, STEPS_PER_LINE)
+        if column == 0:
+            moves.append(MoveSafety())
+            moves.append(MoveStraightRapid((0.0, 0.1 * line, 5.0)))
+        x = 0.01 * (column if line % 2 == 0 else STEPS_PER_LINE - column - 1)
+        y = 0.1 * line
+        z = round(math.sin(x) * math.cos(y / 3.0), 3)
+        moves.append(MoveStraight((x, y, z)))
+    return moves
+
+
+def get_filters():
+    return [Filters.SelectTool(1), Filters.MachineSetting("feedrate", 300),
+            Filters.MachineSetting("spindle_speed", 1000), Filters.TriggerSpindle(3),
+            Filters.SafetyHeight(5.0),
+            Filters.StepWidth(step_width_x=0.001, step_width_y=0.001, step_width_z=0.001)]
+
+
+def measure(count):
+    moves = get_moves(count)
+    handle, filename = tempfile.mkstemp(prefix="pycam-benchmark-", suffix=".ngc")
+    os.close(handle)
+    try:
+        start_time = time()
+        generator = LinuxCNC(filename)
+        generator.add_filters(get_filters())
+        generator.add_moves(moves)
+        generator.finish()
+        duration = time() - start_time
+        with open(filename, "rb") as gcode_file:
+            content = gcode_file.read()
+    finally:
+        os.remove(filename)
+    lines = content.count(b"\n")
+    print("%9d %9d  %9.3f %11.0f  %s" % (count, lines, duration, lines / duration,
+                                         hashlib.md5(content).hexdigest()))
+
+
+def main(sizes):
+    pycam.Utils.log.get_logger().setLevel(logging.WARNING)
+    print("times in seconds")
+    print("%9s %9s  %9s %11s  %s" % ("steps", "lines", "export", "lines/s", "md5"))
+    for count in (sizes or DEFAULT_SIZES):
+        measure(count)
+
+
+if __name__ == "__main__":
+    main([int(value) for value in sys.argv[1:]])
@@ -0,0 +1,79 @@
+""" Compare the import time of binary STL files: facet-by-facet vs. bulk decoding
+
+The binary STL files are generated (a wavy surface with the given number of
+facets). The facet-by-facet import is quite slow - thus it is measured only
+for the smaller sizes.
+
+usage: benchmark_stl_import.py [FACETS [FACETS ...]]
+"""
+
+import logging
+import math
+import os
+import sys
+import tempfile
+from time import time
+
+import numpy
+
+import pycam.Importers.STLImporter
+import pycam.Utils.log
+
+
+# the facet-by-facet import is skipped for bigger models
+MAX_FACETS_SLOW_IMPORT = 20000
+
+
+def write_binary_stl(filename, facet_count):
+    """ write a wavy surface with (at least) the given number of facets """
+    cells = int(math.ceil(math.sqrt(facet_count / 2.0)))
+    xs, ys = numpy.meshgrid(numpy.linspace(0, 100, cells + 1), numpy.linspace(0, 100, cells + 1))
+    zs = 5 * numpy.sin(xs / 7.0) * numpy.cos(ys / 11.0)
+    grid = numpy.stack((xs, ys, zs), axis=-1)
+    corners = (grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1])
+    # two counter-clockwise triangles per cell
+    triangles = numpy.concatenate((
+        numpy.stack((corners[0], corners[1], corners[2]), axis=-2).reshape((-1, 3, 3)),
+        numpy.stack((corners[0], corners[2], corners[3]), axis=-2).reshape((-1, 3, 3))))
+    normals = numpy.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals /= numpy.linalg.norm(normals, axis=1)[:, None]
+    facets = numpy.zeros(len(triangles), dtype=pycam.Importers.STLImporter.BINARY_FACET_DTYPE)
+    facets["normal"] = normals
+    facets["vertices"] = triangles
+    with open(filename, "wb") as out_file:
+        out_file.write(b"binary STL benchmark".ljust(80, b" "))
+        out_file.write(numpy.uint32(len(facets)).tobytes())
+        out_file.write(facets.tobytes())
+    return len(facets)
+
+
+def measure_import(filename, use_bulk_decoding):
+    pycam.Importers.STLImporter.numpy_enabled = use_bulk_decoding
+    start_time = time()
+    model = pycam.Importers.STLImporter.ImportModel(filename)
+    return time() - start_time, len(model)
+
+
+def main(sizes):
+    # hide the "Imported STL model" messages
+    pycam.Utils.log.get_logger().setLevel(logging.WARNING)
+    print("%10s  %12s  %12s  %8s" % ("facets", "bulk [s]", "per facet [s]", "speedup"))
+    for size in sizes:
+        handle, filename = tempfile.mkstemp(suffix=".stl")
+        os.close(handle)
+        try:
+            facet_count = write_binary_stl(filename, size)
+            bulk_time, bulk_count = measure_import(filename, True)
+            if facet_count <= MAX_FACETS_SLOW_IMPORT:
+                slow_time, slow_count = measure_import(filename, False)
+                assert slow_count == bulk_count
+                print("%10d  %12.2f  %12.2f  %8.1f"
+                      % (facet_count, bulk_time, slow_time, slow_time / bulk_time))
+            else:
+                print("%10d  %12.2f  %12s  %8s" % (facet_count, bulk_time, "-", "-"))
+        finally:
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    main([int(value) for value in sys.argv[1:]] or [10000, 100000, 1000000])
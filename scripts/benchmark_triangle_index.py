@@ -0,0 +1,99 @@
+""" Compare the spatial indexes of triangles: TriangleKdtree vs. TriangleBVH
+
+The build time and the time for random box queries are measured for the
+given models (default: the sample models and a generated wavy surface).
+The batched query of the TriangleBVH handles all boxes at once.
+
+usage: benchmark_triangle_index.py [STL_FILE [STL_FILE ...]]
+"""
+
+import logging
+import os
+import random
+import sys
+from time import time
+
+import numpy
+
+from pycam.Geometry.Model import Model
+from pycam.Geometry.TriangleBVH import TriangleBVH
+from pycam.Geometry.TriangleKdtree import TriangleKdtree
+from pycam.Geometry.TriangleMesh import TriangleMesh
+import pycam.Importers.STLImporter
+import pycam.Utils.log
+
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "samples")
+DEFAULT_MODELS = ("TestModel.stl", "SampleScene.stl", "pycam-textbox.stl")
+QUERY_COUNT = 2000
+
+
+def get_wavy_surface(cells):
+    """ return a model with 2 * cells^2 triangles """
+    xs, ys = numpy.meshgrid(numpy.linspace(0, 100, cells + 1), numpy.linspace(0, 100, cells + 1))
+    zs = 5 * numpy.sin(xs / 7.0) * numpy.cos(ys / 11.0)
+    vertices = numpy.column_stack((xs.ravel(), ys.ravel(), zs.ravel()))
+    corners = numpy.arange((cells + 1) ** 2).reshape((cells + 1, cells + 1))
+    c1, c2, c3, c4 = (corners[:-1, :-1].ravel(), corners[:-1, 1:].ravel(),
+                      corners[1:, 1:].ravel(), corners[1:, :-1].ravel())
+    faces = numpy.concatenate((numpy.column_stack((c1, c3, c2)), numpy.column_stack((c1, c4, c3))))
+    return Model(mesh=TriangleMesh(vertices, faces))
+
+
+def get_query_boxes(model, count):
+    rnd = random.Random(42)
+    size = max(model.maxx - model.minx, model.maxy - model.miny) / 20
+    boxes = []
+    for _ in range(count):
+        x = rnd.uniform(model.minx, model.maxx)
+        y = rnd.uniform(model.miny, model.maxy)
+        boxes.append((x, x + rnd.uniform(0, size), y, y + rnd.uniform(0, size)))
+    return boxes
+
+
+def measure(name, model):
+    triangles = list(model.triangles())
+    bounds = [[getattr(t, attr) for t in triangles] for attr in ("minx", "maxx", "miny", "maxy")]
+    start_time = time()
+    kdtree = TriangleKdtree(triangles)
+    kdtree_build = time() - start_time
+    start_time = time()
+    bvh = TriangleBVH(*bounds)
+    bvh_build = time() - start_time
+    boxes = get_query_boxes(model, QUERY_COUNT)
+    start_time = time()
+    for box in boxes:
+        kdtree.Search(*box)
+    kdtree_query = time() - start_time
+    start_time = time()
+    for box in boxes:
+        bvh.search(*box)
+    bvh_query = time() - start_time
+    start_time = time()
+    bvh.search_many(*numpy.array(boxes).T)
+    bvh_batch = time() - start_time
+    print("%-20s %9d  %9.4f %9.4f  %9.4f %9.4f %9.4f"
+          % (name, len(triangles), kdtree_build, bvh_build, kdtree_query, bvh_query, bvh_batch))
+
+
+def main(filenames):
+    # hide the "Imported STL model" messages
+    pycam.Utils.log.get_logger().setLevel(logging.WARNING)
+    print("times in seconds (%d random box queries)" % QUERY_COUNT)
+    print("%-20s %9s  %9s %9s  %9s %9s %9s" % ("model", "triangles", "kd build", "bvh build",
+                                               "kd query", "bvh query", "bvh batch"))
+    if filenames:
+        for filename in filenames:
+            measure(os.path.basename(filename),
+                    pycam.Importers.STLImporter.ImportModel(filename))
+    else:
+        for filename in DEFAULT_MODELS:
+            measure(filename,
+                    pycam.Importers.STLImporter.ImportModel(os.path.join(SAMPLES_DIR, filename)))
+        for cells in (100, 300):
+            measure("wavy surface", get_wavy_surface(cells))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])